@@ -0,0 +1,942 @@
+# minimal stand-in for blender's bpy so the add-on can be imported and driven on a
+# plain python install (CI boxes without blender). it mimics the data layout the
+# add-on touches, not blender itself: timings against it only measure the add-on's
+# own python overhead, e.g. how many objects/nodes a call walks and writes.
+import itertools
+import math
+import os
+import sys
+import tempfile
+import types
+
+from mathutils import Matrix, Vector
+
+
+# bpy.props
+
+class _PropertyDeferred:
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+
+    def default(self):
+        keywords = self.keywords
+        if self.function == "PointerProperty":
+            kind = keywords.get("type")
+            if isinstance(kind, type) and issubclass(kind, types_module.PropertyGroup):
+                return kind()
+            return None
+        if "default" in keywords:
+            return keywords["default"]
+        if self.function == "EnumProperty":
+            items = keywords.get("items", ())
+            if callable(items):
+                items = items(None, None)
+            if keywords.get("options") and "ENUM_FLAG" in keywords["options"]:
+                return set()
+            return items[0][0] if items else ""
+        return {
+            "BoolProperty": False,
+            "FloatProperty": 0.0,
+            "IntProperty": 0,
+            "StringProperty": "",
+            "CollectionProperty": [],
+        }.get(self.function)
+
+    # properties assigned to ID classes at runtime (Scene.placeholder = ...)
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        key = ("_prop", id(self))
+        if key not in instance.__dict__:
+            instance.__dict__[key] = self.default()
+        return instance.__dict__[key]
+
+    def __set__(self, instance, value):
+        instance.__dict__[("_prop", id(self))] = value
+
+
+def _property(function):
+    def make(**keywords):
+        return _PropertyDeferred(function, keywords)
+    make.__name__ = function
+    return make
+
+props = types.ModuleType("bpy.props")
+for _name in ("BoolProperty", "BoolVectorProperty", "CollectionProperty", "EnumProperty", "FloatProperty",
+              "FloatVectorProperty", "IntProperty", "PointerProperty", "StringProperty"):
+    setattr(props, _name, _property(_name))
+
+
+# custom properties, the dict-like part of ID and bpy_struct
+
+class _IDProps:
+    def _idprops(self):
+        return self.__dict__.setdefault("_custom", {})
+
+    def __contains__(self, key):
+        return key in self._idprops()
+
+    def __getitem__(self, key):
+        return self._idprops()[key]
+
+    def __setitem__(self, key, value):
+        self._idprops()[key] = value
+
+    def __delitem__(self, key):
+        del self._idprops()[key]
+
+    def get(self, key, default=None):
+        return self._idprops().get(key, default)
+
+    def keys(self):
+        return self._idprops().keys()
+
+
+class _Namespace(_IDProps):
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+# collections
+
+class _Collection:
+    def __init__(self, factory=None, owner=None):
+        self._items = []
+        self._factory = factory
+        self._owner = owner
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return True
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return self.get(item) is not None
+        return item in self._items
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return self._items[key]
+
+    def get(self, name, default=None):
+        for item in self._items:
+            if item.name == name:
+                return item
+        return default
+
+    def unique_name(self, name):
+        if self.get(name) is None:
+            return name
+        i = 1
+        while self.get("%s.%03d" % (name, i)) is not None:
+            i += 1
+        return "%s.%03d" % (name, i)
+
+    def _add(self, item):
+        if hasattr(item, "name"):
+            item.name = self.unique_name(item.name)
+        self._items.append(item)
+        return item
+
+    def new(self, *args, **kwargs):
+        return self._add(self._factory(*args, **kwargs))
+
+    def remove(self, item, **kwargs):
+        self._items.remove(item)
+        on_remove = getattr(item, "_on_remove", None)
+        if on_remove:
+            on_remove()
+
+    def link(self, item):
+        if item not in self._items:
+            self._items.append(item)
+
+    def unlink(self, item):
+        self._items.remove(item)
+
+    def clear(self):
+        self._items.clear()
+
+    def foreach_get(self, attr, seq):
+        i = 0
+        for item in self._items:
+            value = getattr(item, attr)
+            for v in (value if hasattr(value, "__len__") else (value,)):
+                seq[i] = v
+                i += 1
+
+    def foreach_set(self, attr, seq):
+        i = 0
+        for item in self._items:
+            value = getattr(item, attr)
+            if hasattr(value, "__len__"):
+                size = len(value)
+                setattr(item, attr, tuple(seq[i:i + size]))
+                i += size
+            else:
+                setattr(item, attr, seq[i])
+                i += 1
+
+
+# bpy.types
+
+types_module = types.ModuleType("bpy.types")
+
+
+class bpy_struct(_IDProps):
+    pass
+
+
+class ID(bpy_struct):
+    library = None
+    use_fake_user = False
+    users = 1
+    _session_uids = itertools.count(1)
+
+    def __init__(self, name=""):
+        self.name = name
+        self.session_uid = next(ID._session_uids)
+
+
+class PropertyGroup(bpy_struct):
+    def __init__(self):
+        for cls in reversed(type(self).__mro__):
+            for name, value in getattr(cls, "__annotations__", {}).items():
+                if isinstance(value, _PropertyDeferred):
+                    object.__setattr__(self, name, value.default())
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        for cls in type(self).__mro__:
+            deferred = getattr(cls, "__annotations__", {}).get(name)
+            if isinstance(deferred, _PropertyDeferred):
+                update = deferred.keywords.get("update")
+                if update is not None:
+                    update(self, context)
+                break
+
+
+class Operator(bpy_struct):
+    def report(self, level, message):
+        print("%s: %s" % (", ".join(sorted(level)), message))
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
+
+
+# nodes
+
+class NodeLink:
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+        self.is_muted = False
+
+
+class FCurve:
+    def __init__(self):
+        self.driver = _Namespace(expression="", type='SCRIPTED', variables=_Collection())
+
+
+class NodeSocket(bpy_struct):
+    def __init__(self, node, name, identifier, is_output):
+        self.node = node
+        self.name = name
+        self.identifier = identifier
+        self.is_output = is_output
+        self.default_value = 0.0
+        self.links = []
+        self.enabled = True
+        self.hide = False
+
+    @property
+    def is_linked(self):
+        return bool(self.links)
+
+    def driver_add(self, path, index=-1):
+        fcurve = FCurve()
+        tree = self.node.id_data
+        if tree.animation_data is None:
+            tree.animation_data = _Namespace(drivers=[])
+        tree.animation_data.drivers.append(fcurve)
+        return fcurve
+
+    def driver_remove(self, path, index=-1):
+        return True
+
+
+# socket names per node type, anything else gets generic sockets
+NODE_SOCKETS = {
+    "CompositorNodeRLayers": ((), ("Image", "Alpha", "Depth")),
+    "CompositorNodeComposite": (("Image", "Alpha"), ()),
+    "CompositorNodeViewer": (("Image", "Alpha"), ()),
+    "CompositorNodeOutputFile": (("Image",), ()),
+    "CompositorNodeScale": (("Image", "X", "Y"), ("Image",)),
+    "CompositorNodePixelate": (("Color",), ("Color",)),
+    "CompositorNodePosterize": (("Image", "Steps"), ("Image",)),
+    "CompositorNodeMixRGB": (("Fac", "Image", "Image"), ("Image",)),
+    "CompositorNodeImage": ((), ("Image", "Alpha")),
+    "ShaderNodeMath": (("Value", "Value", "Value"), ("Value",)),
+    "ShaderNodeVectorMath": (("Vector", "Vector", "Vector", "Scale"), ("Vector", "Value")),
+    "ShaderNodeTexNoise": (("Vector", "W", "Scale", "Detail", "Roughness", "Lacunarity", "Distortion"), ("Fac", "Color")),
+    "ShaderNodeValue": ((), ("Value",)),
+    "ShaderNodeOutputMaterial": (("Surface", "Volume", "Displacement"), ()),
+    "ShaderNodeBsdfPrincipled": (("Base Color", "Metallic", "Roughness", "Alpha"), ("BSDF",)),
+    "ShaderNodeEmission": (("Color", "Strength"), ("Emission",)),
+    "ShaderNodeTexImage": (("Vector",), ("Color", "Alpha")),
+    "ShaderNodeVertexColor": ((), ("Color", "Alpha")),
+    "GeometryNodeSetPosition": (("Geometry", "Selection", "Position", "Offset"), ("Geometry",)),
+    "NodeGroupInput": ((), ("Geometry",)),
+    "GeometryNodeInputSceneTime": ((), ("Seconds", "Frame")),
+    "GeometryNodeSelfObject": ((), ("Self Object",)),
+    "GeometryNodeInputActiveCamera": ((), ("Active Camera",)),
+    "GeometryNodeObjectInfo": (("Object", "As Instance"), ("Transform", "Location", "Rotation", "Scale", "Geometry")),
+    "GeometryNodeSwitch": (("Switch", "False", "True"), ("Output",)),
+    "GeometryNodeBoundBox": (("Geometry",), ("Bounding Box", "Min", "Max")),
+    "ShaderNodeVectorRotate": (("Vector", "Center", "Axis", "Angle", "Rotation"), ("Vector",)),
+    "ShaderNodeSeparateXYZ": (("Vector",), ("X", "Y", "Z")),
+    "NodeGroupOutput": (("Geometry",), ()),
+}
+
+# type specific node settings
+NODE_ATTRIBUTES = {
+    "CompositorNodeMixRGB": {"blend_type": 'MIX', "use_clamp": False, "use_alpha": False},
+    "CompositorNodeImage": {"image": None},
+    "CompositorNodeRLayers": {"layer": "ViewLayer"},
+    "CompositorNodeScale": {"space": 'RELATIVE', "frame_method": 'STRETCH'},
+    "ShaderNodeMath": {"operation": 'ADD', "use_clamp": False},
+    "ShaderNodeVectorMath": {"operation": 'ADD'},
+    "ShaderNodeTexNoise": {"noise_dimensions": '3D'},
+    "ShaderNodeOutputMaterial": {"is_active_output": True, "target": 'ALL'},
+    "ShaderNodeTexImage": {"image": None, "interpolation": 'Linear'},
+    "ShaderNodeVertexColor": {"layer_name": ""},
+    "GeometryNodeObjectInfo": {"transform_space": 'ORIGINAL'},
+    "GeometryNodeSwitch": {"input_type": 'GEOMETRY'},
+    "ShaderNodeVectorRotate": {"rotation_type": 'AXIS_ANGLE', "invert": False},
+}
+
+# default node names blender gives new nodes
+NODE_NAMES = {
+    "CompositorNodeRLayers": "Render Layers",
+    "CompositorNodeComposite": "Composite",
+    "NodeGroupInput": "Group Input",
+    "NodeGroupOutput": "Group Output",
+}
+
+
+class _Sockets(_Collection):
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self._items:
+                if item.identifier == key or item.name == key:
+                    return item
+            raise KeyError(key)
+        return self._items[key]
+
+
+class Node(bpy_struct):
+    def __init__(self, bl_idname):
+        self.bl_idname = bl_idname
+        self.type = bl_idname
+        self.name = NODE_NAMES.get(bl_idname, bl_idname.replace("CompositorNode", "").replace("ShaderNode", "").replace("GeometryNode", ""))
+        self.label = ""
+        self.location = Vector((0.0, 0.0))
+        self.width = 140.0
+        self.mute = False
+        self.hide = False
+        self.parent = None
+        for attr, value in NODE_ATTRIBUTES.get(bl_idname, {}).items():
+            setattr(self, attr, value)
+        if bl_idname == "CompositorNodeOutputFile":
+            self.base_path = ""
+            self.format = _Namespace(
+                file_format='PNG', color_mode='RGBA', color_depth='8', color_management='FOLLOW_SCENE',
+                view_settings=_Namespace(view_transform='Standard', look='None'),
+            )
+        inputs, outputs = NODE_SOCKETS.get(bl_idname, (("Input",) * 4, ("Output",) * 2))
+        self.inputs = _Sockets()
+        self.outputs = _Sockets()
+        for i, name in enumerate(inputs):
+            self.inputs._items.append(NodeSocket(self, name, name if i == 0 else "%s_%03d" % (name, i), False))
+        for name in outputs:
+            self.outputs._items.append(NodeSocket(self, name, name, True))
+
+    @property
+    def location(self):
+        return self._location
+
+    @location.setter
+    def location(self, value):
+        self._location = Vector(value)
+
+
+class _Nodes(_Collection):
+    def __init__(self, tree):
+        super().__init__()
+        self._tree = tree
+
+    def new(self, type):
+        node = self._add(Node(type))
+        node.id_data = self._tree
+        return node
+
+    def remove(self, node):
+        for socket in list(node.inputs) + list(node.outputs):
+            for link in list(socket.links):
+                self._tree.links.remove(link)
+        self._items.remove(node)
+
+
+class _Links(_Collection):
+    def new(self, from_socket, to_socket, verify_limits=True):
+        if not from_socket.is_output:
+            from_socket, to_socket = to_socket, from_socket
+        for link in list(to_socket.links):
+            self.remove(link)
+        link = NodeLink(from_socket, to_socket)
+        from_socket.links.append(link)
+        to_socket.links.append(link)
+        self._items.append(link)
+        return link
+
+    def remove(self, link):
+        link.from_socket.links.remove(link)
+        link.to_socket.links.remove(link)
+        self._items.remove(link)
+
+
+class NodeTreeInterface:
+    def __init__(self):
+        self.items_tree = []
+
+    def new_socket(self, name, in_out='INPUT', socket_type='NodeSocketFloat', description="", parent=None):
+        item = _Namespace(name=name, in_out=in_out, socket_type=socket_type, description=description, default_value=0.0)
+        self.items_tree.append(item)
+        return item
+
+
+class NodeTree(ID):
+    def __init__(self, name="", type='CompositorNodeTree'):
+        super().__init__(name)
+        self.bl_idname = type
+        self.nodes = _Nodes(self)
+        self.links = _Links()
+        self.interface = NodeTreeInterface()
+        self.is_modifier = False
+        self.use_fake_user = False
+        self.animation_data = None
+        # compositor only
+        self.precision = 'AUTO'
+        self.render_quality = 'HIGH'
+        self.edit_quality = 'HIGH'
+        self.use_groupnode_buffer = True
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+
+# scenes, objects, meshes, images
+
+class Image(ID):
+    def __init__(self, name="", width=1, height=1, alpha=False, float_buffer=False, **kwargs):
+        super().__init__(name)
+        self.size = (width, height)
+        self.is_float = float_buffer
+        self.filepath = ""
+        self.filepath_raw = ""
+        self.source = 'GENERATED'
+        self.packed_file = None
+        self.file_format = 'PNG'
+        self.colorspace_settings = _Namespace(name='sRGB', is_data=False)
+        self.alpha_mode = 'STRAIGHT'
+        self.pixels = _Pixels(width * height * 4)
+        self.generated_width = width
+        self.generated_height = height
+        self.use_generated_float = float_buffer
+        self.has_data = True
+
+    def update(self):
+        pass
+
+    def reload(self):
+        pass
+
+    def pack(self, data=None, data_len=0):
+        self.packed_file = _Namespace(size=len(self.pixels) * 4)
+
+    def scale(self, width, height):
+        self.size = (width, height)
+        self.pixels = _Pixels(width * height * 4)
+
+    def save(self, filepath=None, quality=None):
+        pass
+
+    def save_render(self, filepath, scene=None):
+        pass
+
+
+class _Pixels(list):
+    def __init__(self, size):
+        super().__init__([0.0] * size)
+
+    def foreach_get(self, seq):
+        seq[:] = self
+
+    def foreach_set(self, seq):
+        self[:] = list(seq)
+
+
+class MeshVertex(bpy_struct):
+    def __init__(self, co):
+        self.co = Vector(co)
+        self.normal = Vector((0.0, 0.0, 1.0))
+
+
+class Mesh(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.vertices = _Collection()
+        self.polygons = _Collection()
+        self.loops = _Collection()
+        self.materials = _Collection()
+        self.attributes = _Collection(factory=lambda name, type, domain: _Namespace(name=name, data_type=type, domain=domain, data=_Collection()))
+        self.color_attributes = _ColorAttributes(self)
+        self.shape_keys = None
+
+    @property
+    def vertex_normals(self):
+        normals = _Collection()
+        normals._items = [_Namespace(vector=vertex.normal) for vertex in self.vertices]
+        return normals
+
+    def from_pydata(self, vertices, edges, faces):
+        for co in vertices:
+            self.vertices._items.append(MeshVertex(co))
+        for face in faces:
+            self.polygons._items.append(_Namespace(vertices=tuple(face), loop_total=len(face), normal=Vector((0.0, 0.0, 1.0))))
+
+    def update(self):
+        pass
+
+
+class _ColorAttributes(_Collection):
+    def __init__(self, mesh):
+        super().__init__()
+        self._mesh = mesh
+        self.render_color_index = -1
+        self.active_color_index = -1
+
+    def new(self, name, type, domain):
+        count = len(self._mesh.vertices) if domain == 'POINT' else len(self._mesh.loops)
+        attribute = _Namespace(name=name, data_type=type, domain=domain, data=_Collection())
+        attribute.data._items = [_Namespace(color=(0.0, 0.0, 0.0, 1.0)) for _ in range(count)]
+        return self._add(attribute)
+
+    def find(self, name):
+        for i, item in enumerate(self._items):
+            if item.name == name:
+                return i
+        return -1
+
+
+class Light(ID):
+    _object_type = 'LIGHT'
+
+    def __init__(self, name="", type='POINT'):
+        super().__init__(name)
+        self.type = type
+        self.color = (1.0, 1.0, 1.0)
+        self.energy = 1000.0 if type != 'SUN' else 1.0
+        self.spot_size = math.radians(45.0)
+        self.spot_blend = 0.15
+
+
+class Material(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.diffuse_color = (0.8, 0.8, 0.8, 1.0)
+        self.node_tree = None
+        self._use_nodes = False
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self._use_nodes = value
+        if value and self.node_tree is None:
+            # principled bsdf -> material output, like a new material in blender
+            tree = NodeTree("Shader Nodetree", 'ShaderNodeTree')
+            bsdf = tree.nodes.new("ShaderNodeBsdfPrincipled")
+            bsdf.inputs["Base Color"].default_value = self.diffuse_color
+            output = tree.nodes.new("ShaderNodeOutputMaterial")
+            tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
+            self.node_tree = tree
+
+
+class Modifier(bpy_struct):
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.node_group = None
+        self.show_viewport = True
+        self.show_render = True
+        self.ratio = 1.0
+        self.decimate_type = 'COLLAPSE'
+
+
+class _Modifiers(_Collection):
+    def new(self, name, type):
+        return self._add(Modifier(name, type))
+
+
+class Object(ID):
+    def __init__(self, name="", object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        if isinstance(object_data, Mesh):
+            self.type = 'MESH'
+        elif object_data is None:
+            self.type = 'EMPTY'
+        else:
+            self.type = getattr(object_data, "_object_type", 'EMPTY')
+        self.modifiers = _Modifiers()
+        self.material_slots = _Collection()
+        self.hide_render = False
+        self.hide_viewport = False
+        self.matrix_world = Matrix.Identity(4)
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.bound_box = [
+            (x, y, z) for x in (-1.0, 1.0) for y in (-1.0, 1.0) for z in (-1.0, 1.0)
+        ]
+        self.dimensions = Vector((2.0, 2.0, 2.0))
+        self._selected = False
+
+    def visible_get(self, view_layer=None, viewport=None):
+        return not self.hide_viewport
+
+    def select_get(self, view_layer=None):
+        return self._selected
+
+    def select_set(self, state, view_layer=None):
+        self._selected = state
+
+    def evaluated_get(self, depsgraph):
+        return self
+
+    def to_mesh(self, **kwargs):
+        return self.data
+
+    def to_mesh_clear(self):
+        pass
+
+
+class SceneCollection(ID):
+    def __init__(self, name="", scene=None):
+        super().__init__(name)
+        self.objects = _Collection()
+        self.children = _Collection()
+
+    @property
+    def all_objects(self):
+        found = list(self.objects)
+        seen = set(map(id, found))
+        for child in self.children:
+            for obj in child.all_objects:
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    found.append(obj)
+        return found
+
+
+class ViewLayer(_Namespace):
+    pass
+
+
+class Scene(ID):
+    def __init__(self, name="Scene"):
+        super().__init__(name)
+        self.render = _Namespace(
+            engine='BLENDER_EEVEE_NEXT', resolution_x=1920, resolution_y=1080, resolution_percentage=100,
+            use_border=False, filter_size=1.5, filepath="/tmp/", fps=24, fps_base=1.0, threads_mode='AUTO',
+            threads=os.cpu_count() or 1, use_persistent_data=False, use_simplify=False, is_movie_format=False, use_compositing=True,
+            image_settings=_Namespace(file_format='PNG', color_mode='RGBA', color_depth='8', compression=15),
+        )
+        self.render.frame_path = lambda frame=None, preview=False, view="": "%s%04d.png" % (self.render.filepath, frame if frame is not None else self.frame_current)
+        self.eevee = _Namespace(
+            taa_render_samples=64, taa_samples=16, use_taa_reprojection=True, use_gtao=False, gtao_distance=0.2,
+            use_shadows=True, use_raytracing=False, shadow_pool_size='512',
+        )
+        self.cycles = _Namespace(
+            device='CPU', samples=4096, preview_samples=1024, use_denoising=True, use_preview_denoising=False,
+            use_adaptive_sampling=True, adaptive_threshold=0.01, adaptive_min_samples=0, denoiser='OPENIMAGEDENOISE',
+            max_bounces=12, diffuse_bounces=4, glossy_bounces=4, transmission_bounces=12, volume_bounces=0,
+            transparent_max_bounces=8, caustics_reflective=True, caustics_refractive=True, use_auto_tile=True,
+            tile_size=2048,
+        )
+        self.view_settings = _Namespace(view_transform='AgX', look='None', exposure=0.0, gamma=1.0)
+        self.display_settings = _Namespace(display_device='sRGB')
+        self.collection = SceneCollection("Scene Collection")
+        self.view_layers = _Collection()
+        self.view_layers._items.append(ViewLayer(
+            name="ViewLayer", use_pass_combined=True, use_pass_z=True, use_pass_mist=False, use_pass_normal=False,
+            use_pass_diffuse_color=False, use_pass_position=False, use_pass_vector=False,
+            use_pass_ambient_occlusion=False, use_pass_emit=False, use_pass_environment=False,
+            use_pass_shadow=False, use_pass_cryptomatte_object=False, use_pass_cryptomatte_material=False,
+            use_pass_cryptomatte_asset=False, pass_cryptomatte_depth=6, use=True, objects=self.collection.objects,
+        ))
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.frame_step = 1
+        self.camera = None
+        self.world = None
+        self.node_tree = None
+        self._use_nodes = False
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        self._use_nodes = value
+        if value and self.node_tree is None:
+            # blender starts new compositor trees with render layers -> composite
+            tree = NodeTree("Compositing Nodetree", 'CompositorNodeTree')
+            render_layers = tree.nodes.new("CompositorNodeRLayers")
+            composite = tree.nodes.new("CompositorNodeComposite")
+            tree.links.new(render_layers.outputs["Image"], composite.inputs["Image"])
+            self.node_tree = tree
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = frame
+        for handler in list(app.handlers.frame_change_pre):
+            handler(self, None)
+        for handler in list(app.handlers.frame_change_post):
+            handler(self, None)
+
+
+class _Objects(_Collection):
+    def _on_remove_object(self, obj):
+        for scene in data.scenes:
+            _unlink_everywhere(scene.collection, obj)
+
+    def remove(self, item, **kwargs):
+        self._items.remove(item)
+        self._on_remove_object(item)
+
+
+class _Meshes(_Collection):
+    # only the decimate modifier is "evaluated", it keeps a share of the faces
+    def new_from_object(self, obj, preserve_all_data_layers=False, depsgraph=None):
+        ratio = 1.0
+        for modifier in obj.modifiers:
+            if modifier.show_viewport and modifier.type == 'DECIMATE':
+                ratio *= modifier.ratio
+        mesh = self.new(obj.data.name)
+        mesh.vertices._items = list(obj.data.vertices._items)
+        mesh.polygons._items = obj.data.polygons._items[:max(1, int(len(obj.data.polygons) * ratio))]
+        return mesh
+
+
+def _unlink_everywhere(collection, obj):
+    if obj in collection.objects._items:
+        collection.objects._items.remove(obj)
+    for child in collection.children:
+        _unlink_everywhere(child, obj)
+
+
+for _cls in (bpy_struct, ID, PropertyGroup, Operator, Panel, UIList, AddonPreferences, Node, NodeSocket,
+             NodeTree, Image, Mesh, Modifier, Object, Scene, SceneCollection, ViewLayer):
+    setattr(types_module, _cls.__name__, _cls)
+types_module.Collection = SceneCollection
+types_module.GeometryNodeTree = NodeTree
+types_module.CompositorNodeTree = NodeTree
+types_module.Material = Material
+types_module.Light = Light
+types_module.Camera = ID
+
+
+# bpy.data
+
+data = _Namespace(
+    scenes=_Collection(Scene),
+    objects=_Objects(Object),
+    meshes=_Meshes(Mesh),
+    node_groups=_Collection(NodeTree),
+    images=_Collection(Image),
+    collections=_Collection(SceneCollection),
+    materials=_Collection(Material),
+    lights=_Collection(Light),
+    cameras=_Collection(ID),
+    texts=_Collection(ID),
+    filepath="",
+)
+data.scenes._items.append(Scene("Scene"))
+
+
+# bpy.context
+
+class _Depsgraph:
+    def __init__(self, scene):
+        self.scene = scene
+        self.view_layer = scene.view_layers[0]
+
+
+class _Context:
+    def __init__(self):
+        self.space_data = None
+        self.area = None
+        self.region = None
+        self.screen = None
+        self.window_manager = _Namespace(windows=[])
+        self.workspace = None
+        self.preferences = _Namespace(addons={})
+
+    @property
+    def scene(self):
+        return data.scenes[0]
+
+    @property
+    def view_layer(self):
+        return self.scene.view_layers[0]
+
+    @property
+    def active_object(self):
+        return None
+
+    @property
+    def selected_objects(self):
+        return [obj for obj in self.scene.objects if obj.select_get()]
+
+    def evaluated_depsgraph_get(self):
+        return _Depsgraph(self.scene)
+
+context = _Context()
+
+
+# bpy.app
+
+app = types.ModuleType("bpy.app")
+app.version = (0, 0, 0)
+app.version_string = "stub"
+app.background = True
+app.binary_path = ""
+app.tempdir = tempfile.gettempdir() + os.sep
+handlers = types.ModuleType("bpy.app.handlers")
+for _name in ("load_pre", "load_post", "save_pre", "save_post", "undo_pre", "undo_post", "redo_pre", "redo_post",
+              "frame_change_pre", "frame_change_post", "depsgraph_update_pre", "depsgraph_update_post",
+              "render_init", "render_pre", "render_post", "render_write", "render_stats", "render_complete",
+              "render_cancel", "composite_pre", "composite_post", "composite_cancel"):
+    setattr(handlers, _name, [])
+
+def persistent(function):
+    function._bpy_persistent = True
+    return function
+
+handlers.persistent = persistent
+app.handlers = handlers
+
+timers = types.ModuleType("bpy.app.timers")
+_timers = []
+
+def _register_timer(function, first_interval=0.0, persistent=False):
+    if function not in _timers:
+        _timers.append(function)
+
+def _unregister_timer(function):
+    if function in _timers:
+        _timers.remove(function)
+
+timers.register = _register_timer
+timers.unregister = _unregister_timer
+timers.is_registered = lambda function: function in _timers
+app.timers = timers
+
+
+# bpy.utils / bpy.path / bpy.ops
+
+utils = types.ModuleType("bpy.utils")
+_registered = []
+
+def register_class(cls):
+    _registered.append(cls)
+
+def unregister_class(cls):
+    if cls in _registered:
+        _registered.remove(cls)
+
+def user_resource(resource_type, path="", create=False):
+    folder = os.path.join(tempfile.gettempdir(), "bpy_stub", resource_type.lower(), path)
+    if create:
+        os.makedirs(folder, exist_ok=True)
+    return folder
+
+utils.register_class = register_class
+utils.unregister_class = unregister_class
+utils.user_resource = user_resource
+
+path = types.ModuleType("bpy.path")
+
+def abspath(filepath, start=None, library=None):
+    if filepath.startswith("//"):
+        base = os.path.dirname(data.filepath)
+        return os.path.join(base, filepath[2:]) if base else ""
+    return filepath
+
+def clean_name(name, replace="_"):
+    return "".join(c if c.isalnum() or c in "-." else replace for c in name)
+
+path.abspath = abspath
+path.clean_name = clean_name
+
+
+class _OpsModule:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        def op(*args, **kwargs):
+            raise RuntimeError("bpy.ops.%s.%s is not available in the bpy stub" % (self._name, attr))
+        return op
+
+
+class _Ops:
+    def __getattr__(self, attr):
+        return _OpsModule(attr)
+
+ops = _Ops()
+
+
+for _name, _module in (("bpy.props", props), ("bpy.types", types_module), ("bpy.app", app),
+                       ("bpy.app.handlers", handlers), ("bpy.app.timers", timers), ("bpy.utils", utils),
+                       ("bpy.path", path)):
+    sys.modules[_name] = _module
+types = types_module
@@ -0,0 +1 @@
+from bpy_extras import object_utils
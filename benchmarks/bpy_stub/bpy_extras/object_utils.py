@@ -0,0 +1,6 @@
+# stand-in for bpy_extras.object_utils: everything lands in the middle of the frame
+from mathutils import Vector
+
+
+def world_to_camera_view(scene, obj, coord):
+    return Vector((0.5, 0.5, 1.0))
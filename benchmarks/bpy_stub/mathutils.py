@@ -0,0 +1,99 @@
+# stand-in for blender's mathutils, just the parts the bpy stub and the add-on use
+import math
+
+
+class Vector(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return super().__new__(cls, (float(v) for v in values))
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+    w = property(lambda self: self[3])
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __mul__(self, other):
+        return Vector(a * other for a in self)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        return Vector(a / other for a in self)
+
+    def __neg__(self):
+        return Vector(-a for a in self)
+
+    def dot(self, other):
+        return sum(a * b for a, b in zip(self, other))
+
+    @property
+    def length(self):
+        return math.sqrt(self.dot(self))
+
+    def normalized(self):
+        length = self.length
+        return Vector(a / length for a in self) if length else Vector(self)
+
+    def to_3d(self):
+        return Vector((tuple(self) + (0.0, 0.0, 0.0))[:3])
+
+    def to_4d(self):
+        return Vector(tuple(self.to_3d()) + (1.0,))
+
+    def copy(self):
+        return Vector(self)
+
+
+class Matrix:
+    def __init__(self, rows=None):
+        self.rows = [list(map(float, row)) for row in rows] if rows else [[0.0] * 4 for _ in range(4)]
+
+    @classmethod
+    def Identity(cls, size):
+        return cls([[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)])
+
+    def __getitem__(self, index):
+        return Vector(self.rows[index])
+
+    def __iter__(self):
+        return (Vector(row) for row in self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            cols = list(zip(*other.rows))
+            return Matrix([[sum(a * b for a, b in zip(row, col)) for col in cols] for row in self.rows])
+        size = len(self.rows)
+        values = list(other) + [1.0] * (size - len(other))
+        result = [sum(a * b for a, b in zip(row, values)) for row in self.rows]
+        return Vector(result[:len(other)])
+
+    def inverted(self):
+        # only used on the identity / pure translations in the stub
+        result = Matrix.Identity(len(self.rows))
+        for i in range(len(self.rows) - 1):
+            result.rows[i][-1] = -self.rows[i][-1]
+        return result
+
+    def to_translation(self):
+        return Vector(row[-1] for row in self.rows[:3])
+
+    def to_3x3(self):
+        return Matrix([row[:3] for row in self.rows[:3]])
+
+    def copy(self):
+        return Matrix(self.rows)
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and self.rows == other.rows
+
+    @property
+    def translation(self):
+        return self.to_translation()
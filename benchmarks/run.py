@@ -0,0 +1,217 @@
+# benchmark suite, prints a table and writes JSON results to track over time
+#   real blender:   blender -b --factory-startup --python benchmarks/run.py -- --output results.json --render
+#   plain python:   python benchmarks/run.py --stub --output results.json
+# --stub swaps in the bpy stand-in from benchmarks/bpy_stub, which measures the add-on's
+# own python overhead only. render timings need real blender and are skipped on the stub.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def parse_args():
+    # inside blender our arguments come after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(prog="benchmarks/run.py", description="PS1-ify benchmarks")
+    parser.add_argument("--stub", action="store_true", help="Use the in-repo bpy stub instead of blender")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (default: %(default)s)")
+    parser.add_argument("--counts", default="100,1000,10000,50000", help="Mesh counts for the wobble cases (default: %(default)s)")
+    parser.add_argument("--scenes", default="1,10", help="Scene counts for the preset cases (default: %(default)s)")
+    parser.add_argument("--ticks", type=int, default=100, help="Slider updates per wobble slider run (default: %(default)s)")
+    parser.add_argument("--render", action="store_true", help="Also time a render per preset (blender only)")
+    parser.add_argument("--render-percentage", type=int, default=25, help="Resolution percentage for render cases (default: %(default)s)")
+    return parser.parse_args(argv)
+
+def measure(function, repeat, setup=None):
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def result(name, params, runs):
+    return {
+        "name": name,
+        "params": params,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "runs": runs,
+    }
+
+
+class Suite:
+    def __init__(self, args, bpy, ps1_ify, presets, wobble):
+        self.args = args
+        self.bpy = bpy
+        self.ps1_ify = ps1_ify
+        self.presets = presets
+        self.wobble = wobble
+        self.results = []
+
+    def add(self, name, params, runs):
+        entry = result(name, params, runs)
+        self.results.append(entry)
+        print("%-16s %-48s min %10.6fs  median %10.6fs" % (
+            name, ", ".join("%s=%s" % item for item in params.items()), entry["min"], entry["median"]))
+        return entry
+
+    def make_scenes(self, count):
+        bpy = self.bpy
+        scenes = [bpy.context.scene]
+        for i in range(count - 1):
+            scenes.append(bpy.data.scenes.new("bench_scene_%d" % i))
+        return scenes
+
+    def remove_scenes(self, scenes):
+        for scene in scenes[1:]:
+            self.bpy.data.scenes.remove(scene)
+
+    def make_meshes(self, count):
+        bpy = self.bpy
+        mesh = bpy.data.meshes.new("bench_mesh")
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [], [(0, 1, 2, 3)])
+        collection = bpy.data.collections.new("bench")
+        bpy.context.scene.collection.children.link(collection)
+        for i in range(count):
+            obj = bpy.data.objects.new("bench_%d" % i, mesh)
+            collection.objects.link(obj)
+        return collection
+
+    def remove_meshes(self, collection):
+        bpy = self.bpy
+        for obj in list(collection.objects):
+            bpy.data.objects.remove(obj)
+        bpy.data.collections.remove(collection)
+
+    # preset application through the operators' code path, the first apply after
+    # switching presets (cold) and applying the same preset again (warm)
+    def bench_presets(self):
+        operators = {
+            "PS1": (self.ps1_ify.PS1_OT_op.ps1_ify, "dropdown_box"),
+            "XBOX": (self.ps1_ify.XBOX_OT_op.xbox_ify, "dropdown_xbox"),
+        }
+        context = self.bpy.context
+        for scene_count in (int(c) for c in self.args.scenes.split(",")):
+            scenes = self.make_scenes(scene_count)
+            for family, (operator, dropdown) in operators.items():
+                names = [item[0] for item in self.presets.enum_items(family)]
+                for i, name in enumerate(names):
+                    other = names[i - 1]
+
+                    def select(preset):
+                        for scene in scenes:
+                            setattr(scene.placeholder, dropdown, preset)
+
+                    def cold():
+                        select(other)
+                        operator(context)
+                        select(name)
+
+                    runs = measure(lambda: operator(context), self.args.repeat, setup=cold)
+                    self.add("preset_apply", {"preset": name, "scenes": scene_count, "state": "cold"}, runs)
+                    runs = measure(lambda: operator(context), self.args.repeat)
+                    self.add("preset_apply", {"preset": name, "scenes": scene_count, "state": "warm"}, runs)
+            self.remove_scenes(scenes)
+
+    def bench_wobble(self):
+        props = self.bpy.context.scene.placeholder
+        for count in (int(c) for c in self.args.counts.split(",")):
+            collection = self.make_meshes(count)
+
+            def enable():
+                props.enable_wobble = True
+
+            def disable():
+                props.enable_wobble = False
+
+            def ticks():
+                for i in range(self.args.ticks):
+                    props.speed = 1.0 + (i % 2)
+
+            self.add("wobble_enable", {"meshes": count}, measure(enable, self.args.repeat, setup=disable))
+            props.enable_wobble = True
+            self.add("wobble_slider", {"meshes": count, "ticks": self.args.ticks}, measure(ticks, self.args.repeat))
+            self.add("wobble_disable", {"meshes": count}, measure(disable, self.args.repeat, setup=enable))
+            props.enable_wobble = False
+            self.bench_wobble_bulk(collection, count)
+            self.remove_meshes(collection)
+
+    # the bulk attach/detach on their own, without the operator and scope lookup. time
+    # per object should stay flat as the count grows, i.e. total time scales linearly
+    def bench_wobble_bulk(self, collection, count):
+        wobble = self.wobble
+        group = wobble.ensure_group(self.bpy.context.scene.placeholder)
+        objects = list(collection.objects)
+        for name, function, setup in (
+            ("wobble_attach", wobble.attach, wobble.detach),
+            ("wobble_detach", wobble.detach, wobble.attach),
+        ):
+            entry = self.add(name, {"meshes": count}, measure(lambda: function(objects, group), self.args.repeat, setup=lambda: setup(objects, group)))
+            entry["per_object"] = entry["min"] / count
+            print("%-16s %-48s per object %8.2fus" % ("", "", entry["per_object"] * 1e6))
+        wobble.detach(objects, group)
+
+    def bench_render(self):
+        bpy = self.bpy
+        scene = bpy.context.scene
+        for name in self.presets.load():
+            self.ps1_ify.apply_preset(scene, name)
+            scene.render.resolution_percentage = self.args.render_percentage
+
+            def render():
+                bpy.ops.render.render(write_still=False)
+
+            self.add("render", {"preset": name, "percentage": self.args.render_percentage}, measure(render, self.args.repeat))
+
+
+def main():
+    args = parse_args()
+    if args.stub:
+        sys.path.insert(0, os.path.join(HERE, "bpy_stub"))
+    sys.path.insert(0, ROOT)
+
+    import bpy
+    from ps1_ify import presets, ps1_ify, wobble
+
+    # the add-on isn't enabled with --factory-startup
+    if not hasattr(bpy.types.Scene, "placeholder"):
+        ps1_ify.register()
+
+    suite = Suite(args, bpy, ps1_ify, presets, wobble)
+    suite.bench_presets()
+    suite.bench_wobble()
+    if args.render:
+        if args.stub:
+            print("render cases need blender, skipped")
+        else:
+            suite.bench_render()
+
+    report = {
+        "meta": {
+            "backend": "stub" if args.stub else "blender",
+            "blender": bpy.app.version_string,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+        },
+        "results": suite.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("wrote %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
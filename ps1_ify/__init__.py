@@ -1,5 +1,11 @@
-import bpy
-from ps1_ify import ps1_ify
+try:
+    import bpy
+except ImportError:
+    # outside blender only the bpy-free modules (image, presets) can be used
+    bpy = None
+
+if bpy is not None:
+    from ps1_ify import ps1_ify
 
 bl_info = {
     "name": "PS1-ify",
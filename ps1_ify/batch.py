@@ -0,0 +1,74 @@
+# command line entry point for render nodes, no GUI needed:
+#   blender -b file.blend --python ps1_ify/batch.py -- --preset PS1_max --frames 1-500
+#   blender -b file.blend --python-expr "from ps1_ify import batch; batch.main()" -- --preset PS1_max
+import argparse
+import os
+import sys
+
+import bpy
+
+try:
+    from ps1_ify import ps1_ify
+except ImportError:
+    # running as a plain script, make the add-on package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from ps1_ify import ps1_ify
+from ps1_ify.farm import parse_frames
+
+
+def parse_args(argv=None):
+    if argv is None:
+        argv = sys.argv
+    # blender passes everything after "--" through to the script
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+
+    parser = argparse.ArgumentParser(prog="ps1_ify.batch", description="Apply a PS1-ify preset and render headless")
+    parser.add_argument("--preset", required=True, help="Preset name, e.g. PS1_max or Xbox_360")
+    parser.add_argument("--frames", help="Frames to render, e.g. 1-500 or 1-10,20-30 (default: scene range)")
+    parser.add_argument("--scene", help="Scene to render (default: active scene)")
+    parser.add_argument("--output", help="Output path, overrides the scene's render filepath")
+    parser.add_argument("--overwrite", action="store_true", help="Replace frames that are already on disk")
+    parser.add_argument("--cpu", action="store_true", help="Use the presets' CPU settings without looking for a GPU")
+    parser.add_argument("--no-render", action="store_true", help="Only apply the preset")
+    parser.add_argument("--save", action="store_true", help="Save the .blend after applying the preset")
+    # unknown args (e.g. --cycles-device CPU) are meant for blender itself
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # the add-on isn't enabled with --factory-startup
+    if not hasattr(bpy.types.Scene, "placeholder"):
+        ps1_ify.register()
+
+    if args.scene:
+        scene = bpy.data.scenes[args.scene]
+    else:
+        scene = bpy.context.scene
+
+    ps1_ify.apply_preset(scene, args.preset, cpu=True if args.cpu else None)
+    print("PS1-ify: applied %s to scene %s" % (args.preset, scene.name))
+
+    if args.output:
+        scene.render.filepath = args.output
+    if args.overwrite:
+        scene.render.use_overwrite = True
+    if args.save:
+        bpy.ops.wm.save_mainfile()
+    if args.no_render:
+        return
+
+    if args.frames:
+        ranges = parse_frames(args.frames)
+    else:
+        ranges = [(scene.frame_start, scene.frame_end)]
+
+    for start, end in ranges:
+        scene.frame_start = start
+        scene.frame_end = end
+        bpy.ops.render.render(animation=True, scene=scene.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# compositor chain
+# the add-on's nodes are tagged with a custom property so the chain can be found again
+# and patched in place. user nodes are left alone: the chain is inserted between
+# whatever feeds the Composite node and the Composite node itself.
+import math
+
+import bpy
+import numpy as np
+
+from ps1_ify import image
+from ps1_ify import presets
+
+# custom property holding the node's role in the chain
+TAG = "ps1_ify"
+
+# role, node type, label, input socket the chain comes in on, output socket used for the next link
+CHAIN = (
+    ("scale_down", "CompositorNodeScale", "PS1 Scale Down", 0, "Image"),
+    ("pixelate", "CompositorNodePixelate", "PS1 Pixelate", 0, "Color"),
+    ("dither", "CompositorNodeMixRGB", "PS1 Dither", 1, "Image"),
+    ("posterize", "CompositorNodePosterize", "PS1 Posterize", 0, "Image"),
+    ("scale_up", "CompositorNodeScale", "PS1 Scale Up", 0, "Image"),
+)
+
+# chain nodes older versions of the add-on didn't create
+OPTIONAL = {"dither"}
+
+
+def find_chain(nodetree):
+    return {node[TAG]: node for node in nodetree.nodes if TAG in node}
+
+def find_node(nodetree, bl_idname):
+    for node in nodetree.nodes:
+        if node.bl_idname == bl_idname:
+            return node
+    return None
+
+def upstream(socket):
+    if not socket.is_linked:
+        return None
+    return socket.links[0].from_node
+
+# files PS1-ified before the nodes were tagged have the same chain without tags,
+# adopt it instead of stacking a second chain after it
+def adopt_legacy_chain(nodetree):
+    node = find_node(nodetree, "CompositorNodeComposite")
+    found = []
+    for role, bl_idname, label, index, output in reversed(CHAIN):
+        if role in OPTIONAL:
+            continue
+        node = upstream(node.inputs[0]) if node else None
+        if node is None or node.bl_idname != bl_idname:
+            return {}
+        found.append((role, node))
+    for role, node in found:
+        node[TAG] = role
+    return dict(found)
+
+def link(nodetree, from_socket, to_socket):
+    # linking an input replaces its old link, so only relink when it changed
+    if to_socket.is_linked and to_socket.links[0].from_socket == from_socket:
+        return
+    nodetree.links.new(from_socket, to_socket)
+
+def ensure_chain(scene):
+    if not scene.use_nodes:
+        scene.use_nodes = True
+    nodetree = scene.node_tree
+
+    nodes = find_chain(nodetree) or adopt_legacy_chain(nodetree)
+    composite = find_node(nodetree, "CompositorNodeComposite")
+    first = nodes.get(CHAIN[0][0])
+    last = nodes.get(CHAIN[-1][0])
+
+    # fast path, the chain is complete and still wired up
+    if all(role in nodes for role, *_ in CHAIN) and "dither_map" in nodes and composite and upstream(composite.inputs[0]) == last and first.inputs[0].is_linked:
+        return nodes
+
+    # work out what the chain reads from: what already fed it, else what feeds the
+    # Composite node (the user's own compositing), else the render layers
+    source = None
+    if first and first.inputs[0].is_linked:
+        source = first.inputs[0].links[0].from_socket
+    elif composite and composite.inputs[0].is_linked and TAG not in upstream(composite.inputs[0]):
+        source = composite.inputs[0].links[0].from_socket
+    if source is None:
+        render_layers = find_node(nodetree, "CompositorNodeRLayers")
+        if render_layers is None:
+            render_layers = nodetree.nodes.new("CompositorNodeRLayers")
+            render_layers.location = (-100, 0)
+        source = render_layers.outputs["Image"]
+
+    x, y = source.node.location
+    for i, (role, bl_idname, label, index, output) in enumerate(CHAIN):
+        node = nodes.get(role)
+        if node is None:
+            node = nodetree.nodes.new(bl_idname)
+            node[TAG] = role
+            node.label = label
+            node.location = (x + 300 + 200 * i, y)
+            nodes[role] = node
+
+    # the dither adds a tiled threshold map on top of the image
+    dither = nodes["dither"]
+    if dither.blend_type != 'ADD':
+        dither.blend_type = 'ADD'
+        dither.use_clamp = False
+        dither.inputs[0].default_value = 1.0
+    if "dither_map" not in nodes:
+        dither_map = nodetree.nodes.new("CompositorNodeImage")
+        dither_map[TAG] = "dither_map"
+        dither_map.label = "PS1 Dither Map"
+        dither_map.location = (dither.location.x - 200, dither.location.y - 250)
+        nodes["dither_map"] = dither_map
+    link(nodetree, nodes["dither_map"].outputs["Image"], dither.inputs[2])
+
+    if composite is None:
+        composite = nodetree.nodes.new("CompositorNodeComposite")
+        composite.location = (x + 300 + 200 * len(CHAIN), y)
+
+    # connecting nodes
+    previous = source
+    for role, bl_idname, label, index, output in CHAIN:
+        link(nodetree, previous, nodes[role].inputs[index])
+        previous = nodes[role].outputs[output]
+    link(nodetree, previous, composite.inputs[0])
+    return nodes
+
+def set_input(node, index, value):
+    socket = node.inputs[index]
+    if not presets.same_value(socket.default_value, value):
+        socket.default_value = value
+
+def set_mute(node, mute):
+    if node.mute != mute:
+        node.mute = mute
+
+# the dither offsets, threshold / levels, as an image the size of the image at the
+# dither node. built once per size and level count, then reused. the pixels of a
+# generated image aren't saved, it's packed so reopened files (and farm workers
+# rendering a saved copy) still have the map
+def dither_image(width, height, levels):
+    name = "PS1 Dither %dx%d %d" % (width, height, levels)
+    img = bpy.data.images.get(name)
+    if img is not None and tuple(img.size) == (width, height) and img.packed_file is not None:
+        return img
+    if img is None:
+        img = bpy.data.images.new(name, width, height, alpha=False, float_buffer=True)
+    img[TAG] = "dither_map"
+    img.colorspace_settings.is_data = True
+
+    # blender images start at the bottom row, flip so the pattern lines up with the offline kernel
+    plane = image.dither_plane(height, width)[::-1, :, 0] / np.float32(levels)
+    pixels = np.empty((height, width, 4), dtype=np.float32)
+    pixels[..., :3] = plane[..., np.newaxis]
+    pixels[..., 3] = 0.0
+    img.pixels.foreach_set(pixels.ravel())
+    img.update()
+    img.pack()
+    return img
+
+# dither maps of other sizes and level counts that no scene's chain uses any more,
+# each one is a packed float image in the file. maps from before the tag only have
+# the name to go by
+def is_dither_image(img):
+    return img.get(TAG) == "dither_map" or img.name.startswith("PS1 Dither ")
+
+def remove_stale_dither_images():
+    for img in [img for img in bpy.data.images if is_dither_image(img) and img.users == 0]:
+        bpy.data.images.remove(img)
+
+# size of the image when it reaches the dither node
+def dither_size(scene, compositor):
+    scale = 1.0 if "scale_down" in compositor["mute"] else compositor["scale"]
+    factor = scene.render.resolution_percentage / 100.0 * scale
+    return (
+        max(1, math.ceil(scene.render.resolution_x * factor)),
+        max(1, math.ceil(scene.render.resolution_y * factor)),
+    )
+
+# only touches parameters and mute states that differ from the preset
+def apply(scene, compositor, dither=False):
+    nodes = ensure_chain(scene)
+    muted = compositor["mute"]
+    scale = compositor["scale"]
+
+    dither = dither and compositor.get("dither", False) and "posterize" not in muted
+    if dither:
+        width, height = dither_size(scene, compositor)
+        img = dither_image(width, height, int(compositor["levels"]))
+        if nodes["dither_map"].image != img:
+            nodes["dither_map"].image = img
+            remove_stale_dither_images()
+
+    set_input(nodes["scale_down"], 1, scale)
+    set_input(nodes["scale_down"], 2, scale)
+    set_input(nodes["scale_up"], 1, 1.0 / scale)
+    set_input(nodes["scale_up"], 2, 1.0 / scale)
+    set_input(nodes["posterize"], 1, compositor["levels"])
+    for role, bl_idname, label, index, output in CHAIN:
+        if role not in OPTIONAL:
+            set_mute(nodes[role], role in muted)
+    set_mute(nodes["dither"], not dither)
+    set_mute(nodes["dither_map"], not dither)
+    return scene.node_tree
@@ -0,0 +1,201 @@
+# polygon budget
+# presets can give a triangle budget for the whole shot. it's shared out between the
+# visible meshes by how much of the camera view they cover, each mesh is reduced with
+# a Decimate modifier and the result is kept as its own mesh datablock, so rendering
+# again (or another object using the same mesh) doesn't decimate a second time.
+# the original meshes stay in the file and restore() swaps them back.
+import math
+
+import bpy
+import numpy as np
+from bpy_extras.object_utils import world_to_camera_view
+from mathutils import Vector
+
+MODIFIER = "PS1 Decimate"
+
+# object custom property, the original mesh while a reduced one is in use
+ORIGINAL = "ps1_mesh"
+
+# mesh custom property marking a reduced mesh, the name of the mesh it was made from
+REDUCED = "ps1_reduced_from"
+
+# mesh custom property on reduced meshes, the ratio in percent
+RATIO = "ps1_reduced_ratio"
+
+# ratios are rounded to this step, so small camera moves reuse the cached meshes
+STEP = 0.05
+
+# objects that only just touch the view still get some triangles
+MIN_WEIGHT = 0.001
+
+
+def source_mesh(obj):
+    name = obj.get(ORIGINAL)
+    return bpy.data.meshes.get(name) if name else obj.data
+
+def triangle_count(mesh):
+    loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    return int((loop_total - 2).sum())
+
+# share of the camera view covered by the object's bounding box
+def screen_weight(scene, camera, obj):
+    if camera is None:
+        return 1.0
+    xs = []
+    ys = []
+    for corner in obj.bound_box:
+        co = world_to_camera_view(scene, camera, obj.matrix_world @ Vector(corner))
+        if co.z <= 0.0:
+            # partly behind the camera, count it as filling the view
+            return 1.0
+        xs.append(min(max(co.x, 0.0), 1.0))
+        ys.append(min(max(co.y, 0.0), 1.0))
+    return max((max(xs) - min(xs)) * (max(ys) - min(ys)), MIN_WEIGHT)
+
+def targets(scene, view_layer):
+    return [
+        obj for obj in scene.objects
+        if obj.type == 'MESH' and obj.library is None and not obj.hide_render
+        and obj.visible_get(view_layer=view_layer)
+        # decimating drops shape keys, that includes the baked wobble
+        and source_mesh(obj) is not None and source_mesh(obj).shape_keys is None
+    ]
+
+# mesh -> ratio, meshes used by several objects get the biggest ratio any of them needs
+def ratios(scene, objects, budget):
+    counts = {}
+    weights = {}
+    for obj in objects:
+        mesh = source_mesh(obj)
+        if mesh not in counts:
+            counts[mesh] = triangle_count(mesh)
+        weights[obj] = screen_weight(scene, scene.camera, obj)
+
+    total = sum(counts[source_mesh(obj)] for obj in objects)
+    found = {}
+    if total <= budget:
+        return found
+    shares = share_out(budget, {obj: (weights[obj], counts[source_mesh(obj)]) for obj in objects})
+    for obj in objects:
+        mesh = source_mesh(obj)
+        if not counts[mesh]:
+            continue
+        ratio = min(1.0, math.ceil(shares[obj] / counts[mesh] / STEP) * STEP)
+        found[mesh] = max(found.get(mesh, 0.0), ratio)
+    return found
+
+# key -> triangles, the budget shared out by weight from key -> (weight, triangle count).
+# a key whose share is more than it has keeps all its triangles and what it doesn't
+# need goes back to the others, until every share fits
+def share_out(budget, items):
+    shares = {}
+    pending = dict(items)
+    while pending:
+        weight_sum = sum(weight for weight, count in pending.values())
+        full = [key for key, (weight, count) in pending.items() if budget * weight / weight_sum >= count]
+        if not full:
+            for key, (weight, count) in pending.items():
+                shares[key] = budget * weight / weight_sum
+            break
+        for key in full:
+            shares[key] = pending[key][1]
+            budget -= pending.pop(key)[1]
+    return shares
+
+def percent(ratio):
+    return round(ratio * 100)
+
+def reduced_name(mesh, ratio):
+    return "%s PS1 %d%%" % (mesh.name, percent(ratio))
+
+# (original mesh name, percent) -> reduced mesh. looked up by their custom properties,
+# blender cuts ID names at 63 bytes so long mesh names don't find them by name
+def reduced_meshes():
+    return {(mesh[REDUCED], mesh.get(RATIO)): mesh for mesh in bpy.data.meshes if REDUCED in mesh}
+
+# builds the missing reduced meshes: decimate modifiers on one object per mesh, a
+# single depsgraph evaluation for all of them, then new_from_object. new meshes are
+# added to cache
+def build(context, meshes, objects, cache):
+    pending = {}
+    for obj in objects:
+        mesh = source_mesh(obj)
+        ratio = meshes.get(mesh)
+        if ratio is None or ratio >= 1.0 or mesh in pending or (mesh.name, percent(ratio)) in cache:
+            continue
+        pending[mesh] = obj
+
+    added = []
+    muted = []
+    for mesh, obj in pending.items():
+        # decimate the original mesh, without the other modifiers (armatures, wobble, ...)
+        if obj.data != mesh:
+            obj.data = mesh
+        for modifier in obj.modifiers:
+            if modifier.show_viewport:
+                modifier.show_viewport = False
+                muted.append(modifier)
+        modifier = obj.modifiers.new(MODIFIER, 'DECIMATE')
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = meshes[mesh]
+        added.append((obj, modifier))
+
+    try:
+        depsgraph = context.evaluated_depsgraph_get()
+        for mesh, obj in pending.items():
+            reduced = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+            reduced.name = reduced_name(mesh, meshes[mesh])
+            reduced[REDUCED] = mesh.name
+            reduced[RATIO] = percent(meshes[mesh])
+            cache[(mesh.name, reduced[RATIO])] = reduced
+    finally:
+        for obj, modifier in added:
+            obj.modifiers.remove(modifier)
+        for modifier in muted:
+            modifier.show_viewport = True
+    return len(pending)
+
+def apply(context, budget):
+    scene = context.scene
+    objects = targets(scene, context.view_layer)
+    meshes = ratios(scene, objects, budget)
+    cache = reduced_meshes()
+    built = build(context, meshes, objects, cache)
+
+    reduced = 0
+    for obj in objects:
+        mesh = source_mesh(obj)
+        ratio = meshes.get(mesh, 1.0)
+        if ratio >= 1.0:
+            restore_object(obj)
+            continue
+        target = cache[(mesh.name, percent(ratio))]
+        if obj.data != target:
+            obj.data = target
+        if obj.get(ORIGINAL) != mesh.name:
+            obj[ORIGINAL] = mesh.name
+            # keep the original in the file while no object uses it
+            mesh.use_fake_user = True
+        reduced += 1
+    return reduced, built
+
+def restore_object(obj):
+    name = obj.get(ORIGINAL)
+    if name is None:
+        return
+    mesh = bpy.data.meshes.get(name)
+    if mesh is not None:
+        obj.data = mesh
+        mesh.use_fake_user = False
+    del obj[ORIGINAL]
+
+def restore(objects):
+    for obj in objects:
+        if obj.type == 'MESH':
+            restore_object(obj)
+
+# reduced meshes nothing uses any more
+def clear_cache():
+    for mesh in [mesh for mesh in bpy.data.meshes if REDUCED in mesh and mesh.users == 0]:
+        bpy.data.meshes.remove(mesh)
@@ -0,0 +1,27 @@
+# cycles device detection, for presets with a "cpu" block
+import bpy
+
+# None until asked, the preferences don't change during a session often enough to ask every time
+_gpu = None
+
+
+def detect():
+    addon = bpy.context.preferences.addons.get("cycles")
+    if addon is None:
+        return False
+    prefs = addon.preferences
+    if prefs.compute_device_type == 'NONE':
+        return False
+    # fills prefs.devices for the chosen backend
+    prefs.get_devices()
+    return any(device.use and device.type != 'CPU' for device in prefs.devices)
+
+def gpu_available(refresh=False):
+    global _gpu
+    if _gpu is None or refresh:
+        try:
+            _gpu = detect()
+        except (AttributeError, KeyError, RuntimeError) as e:
+            print("PS1-ify: could not query cycles devices, using the CPU settings: %s" % e)
+            _gpu = False
+    return _gpu
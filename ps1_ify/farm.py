@@ -0,0 +1,283 @@
+# parallel frame-range rendering
+# splits a frame range into chunks and renders them with several background blender
+# processes (ps1_ify/batch.py does the work in each one). frames that already exist in
+# the output (and decode) are skipped, so re-running a failed or cancelled job resumes it.
+# frames that don't decode are rendered again over the old file, nothing is deleted.
+#   python -m ps1_ify.farm shot.blend --preset PS1_max --frames 1-500 --output //render/shot_#### --workers 4
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ps1_ify import image
+
+BATCH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch.py")
+
+
+# "1-500", "7" or "1-10,20-30", batch.py uses the same format
+def parse_frames(text):
+    ranges = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            start, end = int(start), int(end)
+        else:
+            start = end = int(part)
+        if end < start:
+            raise ValueError("Invalid frame range: %s" % part)
+        ranges.append((start, end))
+    return ranges
+
+def expand(ranges):
+    return sorted({frame for start, end in ranges for frame in range(start, end + 1)})
+
+# same rules as blender: the last run of "#" becomes the zero padded frame number,
+# without any "#" four digits are appended
+def frame_path(output, frame):
+    head, tail = os.path.split(output)
+    end = tail.rfind("#")
+    if end == -1:
+        return os.path.join(head, "%s%04d" % (tail, frame))
+    start = end
+    while start > 0 and tail[start - 1] == "#":
+        start -= 1
+    digits = end - start + 1
+    return os.path.join(head, "%s%0*d%s" % (tail[:start], digits, frame, tail[end + 1:]))
+
+# the written file of a frame, or None. extension is what blender adds for the
+# scene's file format (render.file_extension, "" with use_file_extension off)
+def frame_file(output, frame, extension):
+    path = frame_path(output, frame) + extension
+    if os.path.isfile(path) and os.path.getsize(path) > 0:
+        return path
+    return None
+
+# a frame cut short by a cancel or a crash has a file, but not one that decodes
+def readable(filepath):
+    if image.oiio is None and image.iio is None:
+        # nothing to decode with, a non-empty file has to do
+        return True
+    try:
+        return image.read_image(filepath) is not None
+    except Exception:
+        return False
+
+def frame_done(output, frame, extension):
+    found = frame_file(output, frame, extension)
+    return found is not None and readable(found)
+
+# contiguous runs of at most size frames, as "start-end" for batch.py
+def chunks(frames, size):
+    found = []
+    run = []
+    for frame in frames:
+        if run and (frame != run[-1] + 1 or len(run) >= size):
+            found.append((run[0], run[-1]))
+            run = []
+        run.append(frame)
+    if run:
+        found.append((run[0], run[-1]))
+    return found
+
+
+class Job:
+    def __init__(self, blender, blend, preset, frames, output, workers=2, threads=0,
+                 chunk_size=10, retries=1, cpu_only=True, extension=".png"):
+        self.blender = blender
+        self.blend = blend
+        self.preset = preset
+        self.frames = frames
+        self.output = output
+        self.extension = extension
+        # "//" is relative to the .blend, same as in blender
+        if output.startswith("//"):
+            self.output_path = os.path.join(os.path.dirname(blend), output[2:])
+        else:
+            self.output_path = output
+        self.workers = max(1, workers)
+        # split the machine between the workers unless told otherwise
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.chunk_size = max(1, chunk_size)
+        self.retries = retries
+        self.cpu_only = cpu_only
+
+        self.total = len(frames)
+        self.done = 0
+        self.failed = []
+        # "frames a-b: message" per chunk that failed, missing frames or a crash
+        self.errors = []
+        self.error = None
+        self.finished = False
+        self.cancelled = False
+        self._processes = set()
+        self._lock = threading.Lock()
+        # frames whose file decoded, so they aren't decoded again
+        self._verified = set()
+        # frames a crashed worker may have been writing, rendered again even if they decode
+        self._suspect = set()
+
+    def command(self, start, end):
+        command = [
+            self.blender, "-b", self.blend,
+            "-t", str(self.threads),
+            # errors in batch.py exit non-zero instead of leaving blender with 0
+            "--python-exit-code", "1",
+            "--python", BATCH_SCRIPT,
+            "--",
+            "--preset", self.preset,
+            "--frames", "%d-%d" % (start, end),
+            "--output", self.output,
+            # pending frames can have a file that doesn't decode, it gets replaced
+            "--overwrite",
+        ]
+        if self.cpu_only:
+            command += ["--cpu", "--cycles-device", "CPU"]
+        return command
+
+    def frame_done(self, frame):
+        if frame in self._verified:
+            return True
+        if frame in self._suspect:
+            return False
+        found = frame_file(self.output_path, frame, self.extension)
+        if found is None or not readable(found):
+            return False
+        self._verified.add(frame)
+        return True
+
+    # the newest frame file written since started, the one a crash cut short
+    def suspect_newest(self, frames, started):
+        newest = None
+        newest_time = started
+        for frame in frames:
+            found = frame_file(self.output_path, frame, self.extension)
+            if found is not None and os.path.getmtime(found) >= newest_time:
+                newest, newest_time = frame, os.path.getmtime(found)
+        if newest is not None:
+            self._suspect.add(newest)
+            self._verified.discard(newest)
+
+    def pending(self, frames):
+        return [frame for frame in frames if not self.frame_done(frame)]
+
+    def render_chunk(self, start, end):
+        frames = list(range(start, end + 1))
+        chunk = (start, end)
+        stderr = None
+        returncode = 0
+        for attempt in range(self.retries + 1):
+            if self.cancelled:
+                break
+            started = time.time()
+            process = subprocess.Popen(self.command(frames[0], frames[-1]), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            with self._lock:
+                self._processes.add(process)
+            _, stderr = process.communicate()
+            with self._lock:
+                self._processes.discard(process)
+            returncode = process.returncode
+            if returncode != 0 and not self.cancelled:
+                # blender died, its last file may be cut short and still decode
+                self.suspect_newest(frames, started)
+            elif returncode == 0:
+                self._suspect.difference_update(frames)
+            # resume inside the chunk too, only retry frames that didn't get written
+            frames = self.pending(frames)
+            if not frames and returncode == 0:
+                return chunk, [], ""
+        error = stderr.decode(errors="replace")[-2000:] if stderr else ""
+        if returncode != 0 and not self.cancelled:
+            error = "blender exited with code %d\n%s" % (returncode, error)
+        return chunk, frames, error
+
+    def run(self, on_progress=None):
+        started = time.perf_counter()
+        try:
+            todo = self.pending(self.frames)
+            self.done = self.total - len(todo)
+            if on_progress:
+                on_progress(self, "%d of %d frames already rendered" % (self.done, self.total))
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self.render_chunk, start, end) for start, end in chunks(todo, self.chunk_size)]
+                for future in as_completed(futures):
+                    try:
+                        (start, end), missing, error = future.result()
+                    except Exception:
+                        # stop the other workers, the pool waits for them on the way out
+                        self.cancel()
+                        raise
+                    failed = bool(missing or error) and not self.cancelled
+                    with self._lock:
+                        self.done += (end - start + 1) - len(missing)
+                        self.failed.extend(missing)
+                        if failed:
+                            self.errors.append("frames %d-%d: %s" % (start, end, error.strip() or "no output"))
+                    if on_progress:
+                        if failed:
+                            on_progress(self, "frames %d-%d failed: %s" % (start, end, (error.strip().splitlines() or ["no output"])[-1]))
+                        else:
+                            on_progress(self, "frames %d-%d done" % (start, end))
+        except Exception as e:
+            # e.g. blender couldn't be started, the job still has to finish
+            self.error = "%s: %s" % (type(e).__name__, e)
+        finally:
+            self.finished = True
+
+        if on_progress:
+            if self.error:
+                on_progress(self, "failed: %s" % self.error)
+            else:
+                on_progress(self, "finished in %.1fs, %d failed frames, %d failed chunks" % (time.perf_counter() - started, len(self.failed), len(self.errors)))
+        return not self.failed and not self.errors and not self.cancelled and self.error is None
+
+    def start(self, on_progress=None):
+        thread = threading.Thread(target=self.run, args=(on_progress,), daemon=True)
+        thread.start()
+        return thread
+
+    def cancel(self):
+        self.cancelled = True
+        with self._lock:
+            for process in self._processes:
+                process.terminate()
+
+def find_blender():
+    return os.environ.get("BLENDER") or shutil.which("blender") or "blender"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ps1_ify.farm", description="Render a PS1-ify preset with parallel background Blender processes")
+    parser.add_argument("blend", help=".blend file to render")
+    parser.add_argument("--preset", required=True, help="Preset name, e.g. PS1_max or Xbox_360")
+    parser.add_argument("--frames", required=True, help="Frames to render, e.g. 1-500 or 1-10,20-30")
+    parser.add_argument("--output", required=True, help="Output path, '#' is replaced by the frame number")
+    parser.add_argument("--extension", default=".png", help="File extension of the .blend's output format, to find frames already rendered (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=2, help="Blender processes at once (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=0, help="Render threads per worker (default: split the CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=10, help="Frames per worker call (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=1, help="Retries per chunk (default: %(default)s)")
+    parser.add_argument("--gpu", action="store_true", help="Don't force Cycles onto the CPU")
+    parser.add_argument("--blender", default=find_blender(), help="Blender executable (default: $BLENDER or blender on PATH)")
+    args = parser.parse_args(argv)
+
+    job = Job(
+        args.blender, os.path.abspath(args.blend), args.preset, expand(parse_frames(args.frames)), args.output,
+        workers=args.workers, threads=args.threads, chunk_size=args.chunk_size, retries=args.retries,
+        cpu_only=not args.gpu, extension=args.extension,
+    )
+
+    def report(job, message):
+        print("[%d/%d] %s" % (job.done, job.total, message), flush=True)
+
+    return 0 if job.run(on_progress=report) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# render on N's
+# the scene renders every Nth frame (frame_step) and each written frame is hard linked
+# (or copied where links aren't possible) into the N-1 frames after it, for the
+# choppy frame rate of the era at a fraction of the render time. image sequences only,
+# a movie would just come out shorter.
+import os
+import shutil
+
+import bpy
+from bpy.app.handlers import persistent
+
+# scene custom property, the step set by the add-on (so a frame_step the user set is left alone)
+META = "ps1_render_on"
+
+
+def setup(scene, step):
+    if scene.render.is_movie_format:
+        step = 1
+    if step > 1:
+        if scene.frame_step != step:
+            scene.frame_step = step
+        if scene.get(META) != step:
+            scene[META] = step
+    elif META in scene:
+        scene.frame_step = 1
+        del scene[META]
+
+def fill(source, target):
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+@persistent
+def on_render_write(scene, *args):
+    step = scene.get(META)
+    if not step or step <= 1 or scene.render.is_movie_format:
+        return
+    render = scene.render
+    source = bpy.path.abspath(render.frame_path(frame=scene.frame_current))
+    for frame in range(scene.frame_current + 1, min(scene.frame_current + step, scene.frame_end + 1)):
+        target = bpy.path.abspath(render.frame_path(frame=frame))
+        try:
+            fill(source, target)
+        except OSError as e:
+            print("PS1-ify: could not fill frame %d: %s" % (frame, e))
+
+def register():
+    # last, after anything that rewrites the written frame
+    if on_render_write not in bpy.app.handlers.render_write:
+        bpy.app.handlers.render_write.append(on_render_write)
+
+def unregister():
+    if on_render_write in bpy.app.handlers.render_write:
+        bpy.app.handlers.render_write.remove(on_render_write)
@@ -0,0 +1,301 @@
+# the PS1 compositor chain on NumPy arrays, for re-grading frames that are already rendered.
+# needs no blender, just numpy plus OpenImageIO or imageio for reading/writing files:
+#   python -m ps1_ify.image renders/ regraded/ --preset PS1_max --workers 8
+#
+# same steps as the compositor chain: scale down (box filter), pixelate (keeps the low
+# resolution pixels), posterize, nearest-neighbour scale up. everything is float32 and
+# deterministic so outputs can be compared bit-for-bit with golden frames.
+import argparse
+import os
+import sys
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+try:
+    import OpenImageIO as oiio
+except ImportError:
+    oiio = None
+
+try:
+    import imageio.v3 as iio
+except ImportError:
+    iio = None
+
+EXTENSIONS = (".exr", ".png", ".tif", ".tiff", ".jpg", ".jpeg")
+
+# 4x4 ordered dither as on the PS1 GPU, as thresholds in [0, 1)
+BAYER4 = np.array((
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+), dtype=np.float32)
+DITHER_THRESHOLDS = (BAYER4 + 0.5) / 16
+
+
+def to_float(pixels):
+    if pixels.dtype == np.uint8:
+        return pixels.astype(np.float32) / np.float32(255)
+    if pixels.dtype == np.uint16:
+        return pixels.astype(np.float32) / np.float32(65535)
+    return pixels.astype(np.float32, copy=False)
+
+def from_float(pixels, dtype):
+    if dtype == np.uint8:
+        return np.rint(np.clip(pixels, 0.0, 1.0) * 255).astype(np.uint8)
+    if dtype == np.uint16:
+        return np.rint(np.clip(pixels, 0.0, 1.0) * 65535).astype(np.uint16)
+    return pixels.astype(dtype, copy=False)
+
+# box filter by an integer factor, e.g. 0.5 averages 2x2 blocks
+def downscale(pixels, scale):
+    factor = int(round(1.0 / scale))
+    if factor <= 1:
+        return pixels
+    height = pixels.shape[0] // factor * factor
+    width = pixels.shape[1] // factor * factor
+    blocks = pixels[:height, :width].reshape(height // factor, factor, width // factor, factor, -1)
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+def upscale(pixels, scale):
+    factor = int(round(scale))
+    if factor <= 1:
+        return pixels
+    return pixels.repeat(factor, axis=0).repeat(factor, axis=1)
+
+# same as the Posterize node: floor(color * steps) / steps, alpha untouched
+def posterize(pixels, levels):
+    steps = np.float32(min(max(levels, 2.0), 1024.0))
+    out = pixels.copy()
+    out[..., :3] = np.floor(pixels[..., :3] * steps) / steps
+    return out
+
+# the dither matrix tiled over a frame, built once per frame size
+@lru_cache(maxsize=8)
+def dither_plane(height, width):
+    reps = (height // 4 + 1, width // 4 + 1)
+    plane = np.tile(DITHER_THRESHOLDS, reps)[:height, :width, np.newaxis]
+    plane.flags.writeable = False
+    return plane
+
+# ordered dither fused with posterize: floor(color * steps + threshold) / steps
+def dither(pixels, levels):
+    steps = np.float32(min(max(levels, 2.0), 1024.0))
+    plane = dither_plane(pixels.shape[0], pixels.shape[1])
+    out = pixels.copy()
+    out[..., :3] = np.floor(pixels[..., :3] * steps + plane) / steps
+    return out
+
+# 8 bit -> dithered 5 bit -> 8 bit for every (threshold, value) pair, indexed per pixel
+@lru_cache(maxsize=1)
+def rgb555_table():
+    values = np.arange(256, dtype=np.float32) / 255
+    quantized = np.floor(values[np.newaxis, :] * 31 + DITHER_THRESHOLDS.reshape(16, 1))
+    quantized = np.clip(quantized, 0, 31).astype(np.uint8)
+    # expand 5 bits back to 8 like the hardware does
+    table = (quantized << 3) | (quantized >> 2)
+    table.flags.writeable = False
+    return table
+
+@lru_cache(maxsize=8)
+def threshold_index(height, width):
+    index = np.tile(np.arange(16, dtype=np.intp).reshape(4, 4), (height // 4 + 1, width // 4 + 1))
+    index = index[:height, :width, np.newaxis]
+    index.flags.writeable = False
+    return index
+
+# real PS1 framebuffer output, 15 bit RGB with the 4x4 dither. 8 bit frames only,
+# the whole thing is one table lookup per channel
+def quantize_rgb555(pixels):
+    if pixels.dtype != np.uint8:
+        raise ValueError("quantize_rgb555 needs 8 bit pixels, got %s" % pixels.dtype)
+    out = pixels.copy()
+    index = threshold_index(pixels.shape[0], pixels.shape[1])
+    out[..., :3] = rgb555_table()[index, pixels[..., :3]]
+    return out
+
+# crop or edge-pad back to the input size, odd sizes lose a pixel when scaled down
+def fit(pixels, height, width):
+    pixels = pixels[:height, :width]
+    pad_y = height - pixels.shape[0]
+    pad_x = width - pixels.shape[1]
+    if pad_y or pad_x:
+        pixels = np.pad(pixels, ((0, pad_y), (0, pad_x), (0, 0)), mode="edge")
+    return pixels
+
+# compositor is a compiled preset's "compositor" dict, see presets.py
+def process(pixels, compositor):
+    dtype = pixels.dtype
+    squeeze = pixels.ndim == 2
+    if squeeze:
+        pixels = pixels[..., np.newaxis]
+    height, width = pixels.shape[:2]
+    muted = compositor["mute"]
+    scale = compositor["scale"]
+
+    out = to_float(pixels)
+    if "scale_down" not in muted:
+        out = downscale(out, scale)
+    # pixelate keeps the pixels it gets, at this point the image already is low resolution
+    if "posterize" not in muted:
+        if compositor.get("dither"):
+            out = dither(out, compositor["levels"])
+        else:
+            out = posterize(out, compositor["levels"])
+    if "scale_up" not in muted:
+        out = upscale(out, 1.0 / scale)
+    out = fit(out, height, width)
+
+    out = from_float(out, dtype)
+    return out[..., 0] if squeeze else out
+
+def read_image(filepath):
+    if oiio is not None:
+        inp = oiio.ImageInput.open(filepath)
+        if inp is None:
+            raise OSError("Could not open %s: %s" % (filepath, oiio.geterror()))
+        try:
+            return inp.read_image()
+        finally:
+            inp.close()
+    if iio is not None:
+        return iio.imread(filepath)
+    raise RuntimeError("Reading images needs OpenImageIO or imageio")
+
+# (width, height, channels, is_float) from the file header, the pixels aren't read
+def image_info(filepath):
+    if oiio is not None:
+        inp = oiio.ImageInput.open(filepath)
+        if inp is None:
+            raise OSError("Could not open %s: %s" % (filepath, oiio.geterror()))
+        try:
+            spec = inp.spec()
+            return spec.width, spec.height, spec.nchannels, spec.format.basetype in (oiio.HALF, oiio.FLOAT, oiio.DOUBLE)
+        finally:
+            inp.close()
+    if iio is not None:
+        props = iio.improps(filepath)
+        shape = props.shape[-3:] if props.n_images else props.shape
+        return shape[1], shape[0], shape[2] if len(shape) > 2 else 1, props.dtype.kind == "f"
+    raise RuntimeError("Reading images needs OpenImageIO or imageio")
+
+# the file's header (bit depth, compression, metadata) for write_image to reuse, None
+# when only imageio is there
+def read_spec(filepath):
+    if oiio is None:
+        return None
+    inp = oiio.ImageInput.open(filepath)
+    if inp is None:
+        raise OSError("Could not open %s: %s" % (filepath, oiio.geterror()))
+    try:
+        return oiio.ImageSpec(inp.spec())
+    finally:
+        inp.close()
+
+def write_image(filepath, pixels, like=None):
+    if oiio is not None:
+        height, width = pixels.shape[:2]
+        channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+        if like is not None and like.nchannels == channels:
+            # same header as the file that was read, only the size changes
+            spec = oiio.ImageSpec(like)
+            spec.width = spec.full_width = width
+            spec.height = spec.full_height = height
+        else:
+            spec = oiio.ImageSpec(width, height, channels, pixels.dtype)
+        out = oiio.ImageOutput.create(filepath)
+        if out is None:
+            raise OSError("Could not write %s: %s" % (filepath, oiio.geterror()))
+        out.open(filepath, spec)
+        out.write_image(pixels)
+        out.close()
+        return
+    if iio is not None:
+        iio.imwrite(filepath, pixels)
+        return
+    raise RuntimeError("Writing images needs OpenImageIO or imageio")
+
+def process_file(source, target, compositor, rgb555=False):
+    pixels = process(read_image(source), compositor)
+    if rgb555:
+        pixels = quantize_rgb555(pixels)
+    write_image(target, pixels)
+    return target
+
+def list_frames(source):
+    if os.path.isfile(source):
+        return [source]
+    return sorted(
+        os.path.join(source, filename)
+        for filename in os.listdir(source)
+        if filename.lower().endswith(EXTENSIONS)
+    )
+
+# process pool with a bounded number of frames in flight, workers read and
+# write the files themselves so only paths go through the pool
+def process_sequence(frames, output_dir, compositor, workers=None, on_done=None, rgb555=False):
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    done_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for source in frames:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    done_count += 1
+                    if on_done:
+                        on_done(future.result(), done_count, len(frames))
+            target = os.path.join(output_dir, os.path.basename(source))
+            pending.add(pool.submit(process_file, source, target, compositor, rgb555))
+        for future in pending:
+            done_count += 1
+            if on_done:
+                on_done(future.result(), done_count, len(frames))
+    return done_count
+
+# exact comparison against golden frames with the same file names
+def verify(output_dir, golden_dir):
+    mismatched = []
+    for golden in list_frames(golden_dir):
+        output = os.path.join(output_dir, os.path.basename(golden))
+        if not os.path.isfile(output) or not np.array_equal(read_image(output), read_image(golden)):
+            mismatched.append(os.path.basename(golden))
+    return mismatched
+
+def main(argv=None):
+    from ps1_ify import presets
+
+    parser = argparse.ArgumentParser(prog="ps1_ify.image", description="Apply a PS1-ify preset to rendered frames")
+    parser.add_argument("source", help="Image file or folder with an image sequence")
+    parser.add_argument("output", help="Folder to write the processed frames to")
+    parser.add_argument("--preset", default="PS1_max", help="Preset name, e.g. PS1_max (default: %(default)s)")
+    parser.add_argument("--dither", action="store_true", help="Add the 4x4 ordered dither (presets that support it)")
+    parser.add_argument("--rgb555", action="store_true", help="Quantize 8 bit frames to dithered 15 bit RGB")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--verify", metavar="GOLDEN_DIR", help="Compare the output bit-for-bit with golden frames")
+    args = parser.parse_args(argv)
+
+    # same as the use_dither toggle in blender, off unless asked for
+    compositor = presets.get(args.preset)["compositor"]
+    compositor = dict(compositor, dither=args.dither and compositor["dither"])
+    frames = list_frames(args.source)
+
+    def report(target, done, total):
+        print("[%d/%d] %s" % (done, total, target))
+
+    process_sequence(frames, args.output, compositor, args.workers, on_done=report, rgb555=args.rgb555)
+
+    if args.verify:
+        mismatched = verify(args.output, args.verify)
+        if mismatched:
+            print("%d frame(s) differ from %s: %s" % (len(mismatched), args.verify, ", ".join(mismatched)))
+            return 1
+        print("All frames match %s" % args.verify)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
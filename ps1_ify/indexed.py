@@ -0,0 +1,54 @@
+# indexed PNG output
+# rewrites each frame blender writes as a palette PNG (see palette.py). with the shot
+# palette all frames of one render share their palette, it starts over with every render.
+# a frame with more colours than still fit in the palette stays a full colour PNG
+# rather than losing colours, those frames are listed in the panel.
+import bpy
+from bpy.app.handlers import persistent
+
+from ps1_ify import image
+from ps1_ify import palette
+
+# the palette of the render in progress, for the SHOT mode
+_shot = {}
+
+# frames of the last render that were left as they were, (filepath, reason)
+skipped = []
+
+
+def enabled(scene):
+    return scene.placeholder.indexed_png != 'OFF' and scene.render.image_settings.file_format == 'PNG'
+
+@persistent
+def on_render_init(scene, *args):
+    _shot.clear()
+    skipped.clear()
+
+@persistent
+def on_render_write(scene, *args):
+    if not hasattr(scene, "placeholder") or not enabled(scene):
+        return
+    filepath = bpy.path.abspath(scene.render.frame_path(frame=scene.frame_current))
+    if scene.placeholder.indexed_png == 'SHOT':
+        shared = _shot.setdefault(scene.name, palette.Palette())
+    else:
+        shared = None
+    try:
+        if palette.write_indexed(filepath, image.read_image(filepath), shared, exact=True) is None:
+            skipped.append((filepath, "more than %d colours" % palette.MAX_COLORS))
+    except (OSError, RuntimeError) as e:
+        skipped.append((filepath, str(e)))
+
+def register():
+    if on_render_init not in bpy.app.handlers.render_init:
+        bpy.app.handlers.render_init.append(on_render_init)
+    # after the native resolution scale up, which is registered first
+    if on_render_write not in bpy.app.handlers.render_write:
+        bpy.app.handlers.render_write.append(on_render_write)
+
+def unregister():
+    if on_render_write in bpy.app.handlers.render_write:
+        bpy.app.handlers.render_write.remove(on_render_write)
+    if on_render_init in bpy.app.handlers.render_init:
+        bpy.app.handlers.render_init.remove(on_render_init)
+    _shot.clear()
@@ -0,0 +1,169 @@
+# baked vertex lighting
+# the PS1 lit once per vertex and interpolated the colour across the polygon. this
+# evaluates the scene's lights per vertex with numpy and stores the result in a
+# "PS1 Light" colour attribute, which the vertex lit simple materials (materials.py)
+# multiply their texture with. with baked lighting on, renders hide the lights and
+# turn GTAO off, so eevee has no lights or shadow maps left to render.
+# diffuse only and no shadows, like the real thing.
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ps1_ify import presets
+
+ATTRIBUTE = "PS1 Light"
+
+# object custom property on lights baked lighting hid from renders
+HIDDEN = "ps1_light_hidden"
+
+# the PS1 treats vertex colour 128 as 1.0, so lit colours can brighten a texture up to 2x
+MAX_VALUE = 2.0
+
+
+def targets(scene):
+    return [
+        obj for obj in scene.objects
+        if obj.type == 'MESH' and obj.library is None and obj.data.library is None and not obj.hide_render
+    ]
+
+# plain data per light, so the numpy part doesn't touch bpy
+def scene_lights(scene):
+    found = []
+    for obj in scene.objects:
+        if obj.type != 'LIGHT' or (obj.hide_render and HIDDEN not in obj):
+            continue
+        light = obj.data
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        # lights shine down their local -Z
+        axis = -matrix[:3, 2]
+        found.append({
+            "type": light.type,
+            "color": np.array(light.color[:3], dtype=np.float64) * light.energy,
+            "position": matrix[:3, 3],
+            "axis": axis / max(np.linalg.norm(axis), 1e-12),
+            "spot_cos": math.cos(light.spot_size / 2) if light.type == 'SPOT' else -1.0,
+            "spot_blend": light.spot_blend if light.type == 'SPOT' else 0.0,
+        })
+    return found
+
+# the world's colour as flat ambient light, an HDRI counts as its viewport colour
+def ambient(scene):
+    world = scene.world
+    if world is None:
+        return np.zeros(3)
+    if world.use_nodes and world.node_tree is not None:
+        for node in world.node_tree.nodes:
+            if node.bl_idname == 'ShaderNodeBackground':
+                color = node.inputs["Color"]
+                if not color.is_linked:
+                    return np.array(color.default_value[:3], dtype=np.float64) * node.inputs["Strength"].default_value
+                break
+    return np.array(world.color[:3], dtype=np.float64)
+
+def read_mesh(obj):
+    mesh = obj.data
+    count = len(mesh.vertices)
+    co = np.empty(count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    normals = np.empty(count * 3, dtype=np.float32)
+    mesh.vertex_normals.foreach_get("vector", normals)
+    return co.reshape(-1, 3), normals.reshape(-1, 3), np.array(obj.matrix_world, dtype=np.float64)
+
+def smoothstep(x):
+    x = np.clip(x, 0.0, 1.0)
+    return x * x * (3.0 - 2.0 * x)
+
+# lambert on a white surface, in blender's light units: sun strength is irradiance,
+# point and spot power spreads over the sphere, area power over the hemisphere
+def shade(co, normals, matrix, lights, world):
+    positions = co @ matrix[:3, :3].T + matrix[:3, 3]
+    # inverse transpose, so non-uniform scale doesn't bend the normals
+    normals = normals @ np.linalg.inv(matrix[:3, :3])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-12)[:, np.newaxis]
+
+    irradiance = np.zeros((len(positions), 3))
+    for light in lights:
+        if light["type"] == 'SUN':
+            cos = np.maximum(normals @ -light["axis"], 0.0)
+            irradiance += np.outer(cos, light["color"])
+            continue
+        offset = light["position"] - positions
+        distance2 = np.maximum((offset * offset).sum(axis=1), 1e-8)
+        direction = offset / np.sqrt(distance2)[:, np.newaxis]
+        cos = np.maximum((normals * direction).sum(axis=1), 0.0)
+        # angle off the light's axis, seen from the light
+        facing = -direction @ light["axis"]
+        if light["type"] == 'AREA':
+            intensity = np.maximum(facing, 0.0) / math.pi
+        else:
+            intensity = np.full(len(positions), 1.0 / (4.0 * math.pi))
+            if light["type"] == 'SPOT':
+                spread = max(light["spot_blend"] * (1.0 - light["spot_cos"]), 1e-6)
+                intensity *= smoothstep((facing - light["spot_cos"]) / spread)
+        irradiance += np.outer(intensity * cos / distance2, light["color"])
+
+    colors = np.empty((len(positions), 4), dtype=np.float32)
+    colors[:, :3] = np.clip(irradiance / math.pi + world, 0.0, MAX_VALUE)
+    colors[:, 3] = 1.0
+    return colors
+
+def write(mesh, colors):
+    attributes = mesh.color_attributes
+    attribute = attributes.get(ATTRIBUTE)
+    if attribute is not None and (attribute.domain != 'POINT' or attribute.data_type != 'FLOAT_COLOR'):
+        attributes.remove(attribute)
+        attribute = None
+    if attribute is None:
+        attribute = attributes.new(ATTRIBUTE, 'FLOAT_COLOR', 'POINT')
+    attribute.data.foreach_set("color", colors.ravel())
+    # the simple materials read the default colour attribute
+    index = attributes.find(ATTRIBUTE)
+    if attributes.render_color_index != index:
+        attributes.render_color_index = index
+    mesh.update()
+
+# meshes are read and written on the main thread, the shading runs on a thread per
+# mesh (numpy lets go of the GIL). instanced meshes are lit as their first object
+def bake(scene, threads=0):
+    lights = scene_lights(scene)
+    world = ambient(scene)
+    meshes = {}
+    for obj in targets(scene):
+        if obj.data not in meshes and len(obj.data.vertices):
+            meshes[obj.data] = read_mesh(obj)
+
+    def run(job):
+        return shade(*job, lights, world)
+
+    workers = threads or os.cpu_count() or 1
+    if workers > 1 and len(meshes) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, meshes.values()))
+    else:
+        results = [run(job) for job in meshes.values()]
+
+    for mesh, colors in zip(meshes, results):
+        write(mesh, colors)
+    return len(meshes), len(lights)
+
+def hide_lights(scene):
+    for obj in scene.objects:
+        if obj.type == 'LIGHT' and not obj.hide_render:
+            obj.hide_render = True
+            obj[HIDDEN] = True
+
+def show_lights(scene):
+    for obj in scene.objects:
+        if HIDDEN in obj:
+            obj.hide_render = False
+            del obj[HIDDEN]
+
+# the preset as rendered with baked lighting: no GTAO, lights hidden
+def setup(scene, preset):
+    hide_lights(scene)
+    return presets.override(preset, {"eevee.use_gtao": False})
+
+def teardown(scene):
+    show_lights(scene)
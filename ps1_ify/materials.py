@@ -0,0 +1,187 @@
+# simple materials
+# the PS1 had no per-pixel shading, a polygon was its texture, tinted per vertex or
+# not at all. this swaps the scene's materials for minimal ones: the base colour
+# texture (or colour) as emission, times the vertex colour in VERTEX mode. materials
+# are keyed by what they look like flat, so every material with the same texture ends
+# up sharing one simple material and eevee only compiles those few. simple materials
+# stay in the file for the next time, the originals are kept and restore() puts them back.
+import bpy
+
+# object custom property, slot index -> original material while simple ones are used,
+# plus FAKE_USER: the originals that had a fake user before the swap
+ORIGINAL = "ps1_materials"
+FAKE_USER = "fake_user"
+
+# material custom property marking a simple material, its key
+KEY = "ps1_material_key"
+
+SHADING = ('UNLIT', 'VERTEX')
+
+# shader inputs holding the surface colour, first one found is used
+COLOR_INPUTS = ("Base Color", "Color")
+
+
+def simple(material):
+    return material is not None and KEY in material
+
+def source_materials(obj):
+    names = obj.get(ORIGINAL)
+    if names is not None:
+        return [bpy.data.materials.get(names.get(str(i), "")) for i in range(len(obj.material_slots))]
+    return [slot.material for slot in obj.material_slots]
+
+# original material name -> its fake user flag from before any swap. originals
+# already swapped on some object have the add-on's fake user, their flag is the
+# recorded one
+def fake_user_flags(materials):
+    recorded = {}
+    for obj in bpy.data.objects:
+        names = obj.get(ORIGINAL)
+        if names is None:
+            continue
+        had = set(names.get(FAKE_USER, ()))
+        for key, name in names.items():
+            if key != FAKE_USER:
+                recorded.setdefault(name, name in had)
+    return {material.name: recorded.get(material.name, material.use_fake_user) for material in materials}
+
+def targets(scene):
+    return [obj for obj in scene.objects if obj.library is None and len(obj.material_slots)]
+
+# the shader plugged into the active material output
+def surface_shader(material):
+    if not material.use_nodes or material.node_tree is None:
+        return None
+    for node in material.node_tree.nodes:
+        if node.bl_idname == 'ShaderNodeOutputMaterial' and node.is_active_output:
+            surface = node.inputs["Surface"]
+            return surface.links[0].from_node if surface.is_linked else None
+    return None
+
+# (image, colour) the material shows without lighting
+def flat_look(material):
+    shader = surface_shader(material)
+    if shader is not None:
+        for name in COLOR_INPUTS:
+            socket = shader.inputs.get(name)
+            if socket is None:
+                continue
+            if not socket.is_linked:
+                return None, tuple(socket.default_value)
+            source = socket.links[0].from_node
+            if source.bl_idname == 'ShaderNodeTexImage' and source.image is not None:
+                return source.image, None
+            break
+    # anything fancier than a texture or a colour falls back to the viewport colour
+    return None, tuple(material.diffuse_color)
+
+def material_key(shading, img, color):
+    if img is not None:
+        return "%s|image|%s" % (shading, img.name)
+    return "%s|color|%s" % (shading, ",".join("%.3f" % c for c in color))
+
+def material_name(shading, img, color):
+    if img is not None:
+        return "PS1 %s %s" % (shading.title(), img.name)
+    return "PS1 %s #%02x%02x%02x" % ((shading.title(),) + tuple(round(min(max(c, 0.0), 1.0) * 255) for c in color[:3]))
+
+def build(shading, img, color):
+    material = bpy.data.materials.new(material_name(shading, img, color))
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    links = material.node_tree.links
+    nodes.clear()
+
+    output = nodes.new('ShaderNodeOutputMaterial')
+    output.location = (400, 0)
+    emission = nodes.new('ShaderNodeEmission')
+    emission.location = (200, 0)
+    links.new(emission.outputs[0], output.inputs["Surface"])
+
+    if img is not None:
+        texture = nodes.new('ShaderNodeTexImage')
+        texture.image = img
+        # no filtering on the PS1
+        texture.interpolation = 'Closest'
+        texture.location = (-300, 100)
+        color_socket = texture.outputs["Color"]
+    else:
+        color_socket = None
+        emission.inputs["Color"].default_value = tuple(color[:3]) + (1.0,)
+
+    if shading == 'VERTEX':
+        # "" is the mesh's default colour attribute
+        vertex = nodes.new('ShaderNodeVertexColor')
+        vertex.layer_name = ""
+        vertex.location = (-300, -150)
+        multiply = nodes.new('ShaderNodeVectorMath')
+        multiply.operation = 'MULTIPLY'
+        multiply.location = (0, 0)
+        if color_socket is not None:
+            links.new(color_socket, multiply.inputs[0])
+        else:
+            multiply.inputs[0].default_value = tuple(color[:3])
+        links.new(vertex.outputs["Color"], multiply.inputs[1])
+        color_socket = multiply.outputs[0]
+
+    if color_socket is not None:
+        links.new(color_socket, emission.inputs["Color"])
+    material[KEY] = material_key(shading, img, color)
+    return material
+
+# only meshes have vertex colours, everything else is lit flat
+def shading_for(obj, shading):
+    if shading == 'VERTEX' and not (obj.type == 'MESH' and len(obj.data.color_attributes)):
+        return 'UNLIT'
+    return shading
+
+def apply(scene, shading):
+    cache = {material[KEY]: material for material in bpy.data.materials if simple(material)}
+    built = 0
+    objects = targets(scene)
+    # originals first, objects sharing a mesh share its slots
+    originals = {obj: source_materials(obj) for obj in objects}
+    flags = fake_user_flags({original for found in originals.values() for original in found if original is not None})
+    for obj in objects:
+        mode = shading_for(obj, shading)
+        for slot, original in zip(obj.material_slots, originals[obj]):
+            if original is None or simple(original):
+                continue
+            img, color = flat_look(original)
+            key = material_key(mode, img, color)
+            material = cache.get(key)
+            if material is None:
+                material = cache[key] = build(mode, img, color)
+                built += 1
+            if slot.material != material:
+                slot.material = material
+            # keep the originals in the file while nothing uses them
+            original.use_fake_user = True
+        if ORIGINAL not in obj:
+            names = {str(i): original.name for i, original in enumerate(originals[obj]) if original is not None}
+            names[FAKE_USER] = sorted(name for name in set(names.values()) if flags[name])
+            obj[ORIGINAL] = names
+    return len(objects), built
+
+def restore_object(obj):
+    names = obj.get(ORIGINAL)
+    if names is None:
+        return
+    # files from before the flag was recorded had no fake user on the originals
+    had = set(names.get(FAKE_USER, ()))
+    for i, slot in enumerate(obj.material_slots):
+        material = bpy.data.materials.get(names.get(str(i), ""))
+        if slot.material != material:
+            slot.material = material
+        if material is not None:
+            material.use_fake_user = material.name in had
+    del obj[ORIGINAL]
+
+def restore(objects):
+    for obj in objects:
+        restore_object(obj)
+
+# simple materials nothing uses any more
+def clear_cache():
+    for material in [material for material in bpy.data.materials if simple(material) and material.users == 0]:
+        bpy.data.materials.remove(material)
@@ -0,0 +1,234 @@
+# memory-lean renders
+# at 4K every enabled render pass is a full float frame and the compositor keeps a
+# buffer per node. lean mode turns off the view layer passes nothing reads, keeps the
+# compositor off Full precision when the preset's colour levels survive half floats
+# (Auto only uses them for the viewport compositor, final renders stay full float) and
+# writes the preset's "memory" settings (smaller shadow pool, cycles tiling).
+# estimate() adds up what a frame needs, for the panel and the preset buttons.
+import math
+
+import bpy
+
+from ps1_ify import compositor
+from ps1_ify import presets
+from ps1_ify import textures
+
+# view layer custom property, the passes lean mode turned off
+PRUNED = "ps1_pruned_passes"
+
+# compositor tree custom property, the precision before lean mode changed it
+PRECISION = "ps1_precision"
+
+# scene custom property, values of the memory settings from before lean mode wrote them
+SETTINGS = "ps1_memory_settings"
+
+# view layer pass, Render Layers output name (prefix for cryptomatte), float channels
+PASSES = (
+    ("use_pass_combined", "Image", 4),
+    ("use_pass_z", "Depth", 1),
+    ("use_pass_mist", "Mist", 1),
+    ("use_pass_normal", "Normal", 3),
+    ("use_pass_position", "Position", 3),
+    ("use_pass_vector", "Vector", 4),
+    ("use_pass_diffuse_color", "DiffCol", 3),
+    ("use_pass_ambient_occlusion", "AO", 3),
+    ("use_pass_emit", "Emit", 3),
+    ("use_pass_environment", "Env", 3),
+    ("use_pass_shadow", "Shadow", 3),
+    ("use_pass_cryptomatte_object", "CryptoObject", 4),
+    ("use_pass_cryptomatte_material", "CryptoMaterial", 4),
+    ("use_pass_cryptomatte_asset", "CryptoAsset", 4),
+)
+
+# half floats have 11 bits of precision, enough to posterize to this many levels.
+# Auto precision only uses them in the viewport, it's the memory the add-on's viewport
+# compositor preview needs that this saves
+HALF_LEVELS = 1024
+
+# chain nodes that work on the scaled down image
+SCALED = {"scale_down", "pixelate", "dither", "dither_map", "posterize"}
+
+MB = 1024.0 * 1024.0
+
+# scene name -> last estimate, the panel shows this instead of estimating on every redraw
+_estimates = {}
+
+
+# Render Layers outputs the compositor reads, per view layer
+def used_outputs(scene):
+    found = {}
+    if not scene.use_nodes or scene.node_tree is None or not scene.render.use_compositing:
+        return found
+    for node in scene.node_tree.nodes:
+        if node.bl_idname != "CompositorNodeRLayers" or node.mute:
+            continue
+        layer = found.setdefault(node.layer, set())
+        layer.update(output.name for output in node.outputs if output.is_linked)
+    return found
+
+def prune_passes(scene):
+    # multilayer EXRs write every pass, nothing to prune
+    if scene.render.image_settings.file_format == 'OPEN_EXR_MULTILAYER':
+        return 0
+    used = used_outputs(scene)
+    pruned = 0
+    for view_layer in scene.view_layers:
+        outputs = used.get(view_layer.name, set())
+        turned_off = dict(view_layer.get(PRUNED, {}))
+        for prop, output, channels in PASSES[1:]:
+            if getattr(view_layer, prop, False) and not any(name.startswith(output) for name in outputs):
+                setattr(view_layer, prop, False)
+                turned_off[prop] = True
+                pruned += 1
+        if turned_off:
+            view_layer[PRUNED] = turned_off
+    return pruned
+
+def restore_passes(scene):
+    for view_layer in scene.view_layers:
+        turned_off = view_layer.get(PRUNED)
+        if turned_off is None:
+            continue
+        for prop in turned_off.keys():
+            setattr(view_layer, prop, True)
+        del view_layer[PRUNED]
+
+def set_precision(nodetree, levels):
+    precision = 'AUTO' if levels <= HALF_LEVELS else 'FULL'
+    if nodetree.precision != precision:
+        if PRECISION not in nodetree:
+            nodetree[PRECISION] = nodetree.precision
+        nodetree.precision = precision
+
+def restore_precision(nodetree):
+    if nodetree is not None and PRECISION in nodetree:
+        nodetree.precision = nodetree[PRECISION]
+        del nodetree[PRECISION]
+
+def owner_of(scene, path):
+    owner = scene
+    *names, attr = path.split(".")
+    for name in names:
+        owner = getattr(owner, name)
+    return owner, attr
+
+# the preset with its memory settings added, the values they replace are kept
+def adjust(scene, preset):
+    saved = dict(scene.get(SETTINGS, {}))
+    for path in preset["memory"]:
+        if path not in saved:
+            owner, attr = owner_of(scene, path)
+            saved[path] = getattr(owner, attr)
+    if saved:
+        scene[SETTINGS] = saved
+    return presets.extend(preset, preset["memory"])
+
+# before the preset is written, so its own settings win over the saved ones
+def restore_settings(scene):
+    saved = scene.get(SETTINGS)
+    if saved is None:
+        return
+    for path, value in saved.items():
+        owner, attr = owner_of(scene, path)
+        setattr(owner, attr, value)
+    del scene[SETTINGS]
+
+# after the compositor chain is set up, the passes it reads are known by then
+def setup(scene, preset):
+    if scene.node_tree is not None:
+        set_precision(scene.node_tree, preset["compositor"]["levels"])
+    return prune_passes(scene)
+
+def teardown(scene):
+    restore_passes(scene)
+    restore_precision(scene.node_tree)
+
+def render_size(scene):
+    render = scene.render
+    factor = render.resolution_percentage / 100.0
+    return max(1, round(render.resolution_x * factor)), max(1, round(render.resolution_y * factor))
+
+def pass_channels(view_layer):
+    channels = 0
+    for prop, output, count in PASSES:
+        if getattr(view_layer, prop, False):
+            if prop.startswith("use_pass_cryptomatte"):
+                # two levels per RGBA pass
+                count *= math.ceil(getattr(view_layer, "pass_cryptomatte_depth", 6) / 2)
+            channels += count
+    return channels
+
+def compositor_buffers(scene, pixels):
+    nodetree = scene.node_tree
+    if not scene.use_nodes or nodetree is None or not scene.render.use_compositing:
+        return 0.0
+    chain = compositor.find_chain(nodetree)
+    scale_down = chain.get("scale_down")
+    scale = 1.0
+    if scale_down is not None and not scale_down.mute:
+        scale = scale_down.inputs[1].default_value
+    size = 0.0
+    for node in nodetree.nodes:
+        # the render layers hand over the render result, it's counted there
+        if node.mute or node.bl_idname == "CompositorNodeRLayers":
+            continue
+        if not any(output.is_linked for output in node.outputs):
+            continue
+        # final renders composite in full float RGBA
+        size += (pixels * scale * scale if node.get(compositor.TAG) in SCALED else pixels) * 16
+    return size
+
+# size and float-ness without loading anything: loaded images know theirs, files
+# have a header, generated images their settings. packed images that aren't loaded
+# yet can't tell without being loaded, they're left out
+def texture_info(img):
+    if img.has_data:
+        return tuple(img.size), img.is_float
+    if img.source == 'FILE' and img.packed_file is None:
+        try:
+            width, height, channels, is_float = textures.header(textures.source_path(img))
+        except (OSError, RuntimeError, ValueError):
+            return None
+        return (width, height), is_float
+    if img.source == 'GENERATED':
+        return (img.generated_width, img.generated_height), img.use_generated_float
+    return None
+
+def texture_bytes(scene):
+    budget = scene.get(textures.META, {}).get("budget", 0)
+    size = 0
+    for img in bpy.data.images:
+        if img.users == 0:
+            continue
+        info = texture_info(img)
+        if info is None:
+            continue
+        (width, height), is_float = info
+        # console textures swap these for smaller copies at render time
+        swappable = img.source == 'FILE' and img.packed_file is None and textures.SOURCE not in img
+        if budget and swappable and max(width, height) > budget:
+            factor = textures.factor_for((width, height), budget)
+            width, height = width // factor, height // factor
+        size += width * height * 4 * (4 if is_float else 1)
+    return size
+
+# megabytes a frame needs for the render result, compositor buffers and textures.
+# geometry and the engine's own memory are not in it
+def estimate(scene):
+    width, height = render_size(scene)
+    pixels = width * height
+    render = sum(pass_channels(view_layer) for view_layer in scene.view_layers if view_layer.use) * pixels * 4
+    found = {
+        "render": render / MB,
+        "compositor": compositor_buffers(scene, pixels) / MB,
+        "textures": texture_bytes(scene) / MB,
+    }
+    found["total"] = sum(found.values())
+    return found
+
+def update(scene):
+    found = _estimates[scene.name] = estimate(scene)
+    return found
+
+def last(scene):
+    return _estimates.get(scene.name)
@@ -0,0 +1,120 @@
+# render once, write every preset
+# the scene is rendered once with the biggest of the chosen presets and the render
+# layer is fanned out into one compositor branch per preset: crop to the preset's
+# aspect, scale to the preset's size, pixelate, posterize, scale back up, File Output
+# with the preset's view transform and look. N presets cost one render plus N
+# compositor passes.
+# the engine and sampling are the big preset's, the other presets only differ in
+# what their compositor branch does.
+import math
+import os
+
+from ps1_ify import compositor
+from ps1_ify import presets
+
+# TAG value prefix for branch nodes, followed by the preset name
+ROLE = "multi:"
+
+
+def setting(preset, path, default=None):
+    owner, _, attr = path.rpartition(".")
+    owner = tuple(owner.split("."))
+    for write_owner, values in preset["writes"]:
+        if write_owner == owner:
+            for write_attr, value in values:
+                if write_attr == attr:
+                    return value
+    return default
+
+def resolution(preset):
+    return setting(preset, "render.resolution_x", 1920), setting(preset, "render.resolution_y", 1080)
+
+def biggest(names):
+    return max(names, key=lambda name: math.prod(resolution(presets.get(name))))
+
+def remove_branches(nodetree):
+    for node in [node for node in nodetree.nodes if str(node.get(compositor.TAG, "")).startswith(ROLE)]:
+        nodetree.nodes.remove(node)
+
+# the centred part of a source_aspect image that has target_aspect, as relative
+# (min_x, max_x, min_y, max_y). cropping first keeps the scale uniform, a 4:3 preset
+# out of a 16:9 render loses the sides instead of getting squashed
+def crop_box(source_aspect, target_aspect):
+    width = min(1.0, target_aspect / source_aspect)
+    height = min(1.0, source_aspect / target_aspect)
+    return (0.5 - width / 2, 0.5 + width / 2, 0.5 - height / 2, 0.5 + height / 2)
+
+def branch_node(nodetree, bl_idname, role, label):
+    node = nodetree.nodes.new(bl_idname)
+    node[compositor.TAG] = role
+    node.label = label
+    return node
+
+def scale_node(nodetree, role, label, width, height):
+    node = branch_node(nodetree, "CompositorNodeScale", role, label)
+    node.space = 'ABSOLUTE'
+    node.inputs[1].default_value = width
+    node.inputs[2].default_value = height
+    return node
+
+def crop_node(nodetree, role, label, box):
+    node = branch_node(nodetree, "CompositorNodeCrop", role, label)
+    node.use_crop_size = True
+    node.relative = True
+    node.rel_min_x, node.rel_max_x, node.rel_min_y, node.rel_max_y = box
+    return node
+
+def branch(nodetree, source, name, output_dir, y, source_aspect):
+    preset = presets.get(name)
+    settings = preset["compositor"]
+    muted = settings["mute"]
+    role = ROLE + name
+    width, height = resolution(preset)
+
+    # every branch starts from the one render, cut to this preset's aspect and sized
+    # to this preset first
+    nodes = []
+    if not math.isclose(width / height, source_aspect, rel_tol=1e-3):
+        nodes.append(crop_node(nodetree, role, "%s Crop" % name, crop_box(source_aspect, width / height)))
+    scale = 1.0 if "scale_down" in muted else settings["scale"]
+    nodes.append(scale_node(nodetree, role, "%s Scale Down" % name, max(1, round(width * scale)), max(1, round(height * scale))))
+    if "pixelate" not in muted:
+        nodes.append(branch_node(nodetree, "CompositorNodePixelate", role, "%s Pixelate" % name))
+    if "posterize" not in muted:
+        posterize = branch_node(nodetree, "CompositorNodePosterize", role, "%s Posterize" % name)
+        posterize.inputs[1].default_value = settings["levels"]
+        nodes.append(posterize)
+    if "scale_up" not in muted and scale != 1.0:
+        nodes.append(scale_node(nodetree, role, "%s Scale Up" % name, width, height))
+
+    x = source.node.location.x + 300
+    previous = source
+    for i, node in enumerate(nodes):
+        node.location = (x + 200 * i, y)
+        compositor.link(nodetree, previous, node.inputs[0])
+        previous = node.outputs[0]
+
+    output = nodetree.nodes.new("CompositorNodeOutputFile")
+    output[compositor.TAG] = role
+    output.label = "%s Output" % name
+    output.location = (x + 200 * len(nodes), y)
+    output.base_path = os.path.join(output_dir, name, "")
+    output.format.file_format = 'PNG'
+    # each preset keeps its own look
+    output.format.color_management = 'OVERRIDE'
+    output.format.view_settings.view_transform = setting(preset, "view_settings.view_transform", 'Standard')
+    output.format.view_settings.look = setting(preset, "view_settings.look", 'None')
+    compositor.link(nodetree, previous, output.inputs[0])
+    return output
+
+def build(scene, names, output_dir):
+    if not scene.use_nodes:
+        scene.use_nodes = True
+    nodetree = scene.node_tree
+    remove_branches(nodetree)
+    render_layers = compositor.find_node(nodetree, "CompositorNodeRLayers")
+    if render_layers is None:
+        render_layers = nodetree.nodes.new("CompositorNodeRLayers")
+    source = render_layers.outputs["Image"]
+    aspect = scene.render.resolution_x / scene.render.resolution_y
+    return [branch(nodetree, source, name, output_dir, source.node.location.y - 300 * (i + 1), aspect) for i, name in enumerate(names)]
@@ -0,0 +1,101 @@
+# native resolution rendering
+# the presets normally render at full size and let the Scale node throw 3/4 of the
+# pixels away. in native mode the scene renders at the scaled down size right away
+# (resolution_percentage), both Scale nodes are muted and the written frames get the
+# nearest-neighbour scale up afterwards, same pixels for a quarter of the render cost.
+import bpy
+from bpy.app.handlers import persistent
+
+from ps1_ify import image
+from ps1_ify import presets
+
+# scene custom property, the factor written frames are scaled up by
+META = "ps1_native_upscale"
+
+
+# file formats whose frames survive being read and written again: lossless and one
+# image per file. JPEG/WebP would be compressed twice, multilayer EXR loses its
+# layer and pass names
+ROUND_TRIP = {'PNG', 'BMP', 'TARGA', 'TARGA_RAW', 'TIFF', 'OPEN_EXR'}
+
+# frames that couldn't be scaled up in the last render, (filepath, error)
+failed = []
+
+
+# why native mode can't be used for this scene, "" when it can
+def unsupported(scene, compositor):
+    if "scale_down" in compositor["mute"]:
+        return "the preset doesn't scale down"
+    # movies can't be scaled up after writing, they keep the full size render
+    if scene.render.is_movie_format:
+        return "movies can't be scaled up after writing"
+    if scene.render.image_settings.file_format not in ROUND_TRIP:
+        return "%s frames can't be written again without loss" % scene.render.image_settings.file_format
+    return ""
+
+def supported(scene, compositor):
+    return not unsupported(scene, compositor)
+
+# the preset as rendered natively: lower resolution percentage, no scale nodes
+def adjust(preset):
+    compositor = preset["compositor"]
+    scale = compositor["scale"]
+    preset = presets.override(preset, {"render.resolution_percentage": max(1, round(100 * scale))})
+    preset["compositor"] = dict(compositor, mute=compositor["mute"] | {"scale_down", "scale_up"})
+    return preset
+
+def setup(scene, preset):
+    factor = round(1.0 / preset["compositor"]["scale"])
+    if scene.get(META) != factor:
+        scene[META] = factor
+    return adjust(preset)
+
+def teardown(scene):
+    if META in scene:
+        del scene[META]
+
+def upscale_file(filepath, factor, width, height):
+    pixels = image.read_image(filepath)
+    if pixels.shape[0] == height and pixels.shape[1] == width:
+        return
+    like = image.read_spec(filepath)
+    pixels = image.fit(image.upscale(pixels, factor), height, width)
+    image.write_image(filepath, pixels, like=like)
+
+@persistent
+def on_render_init(scene, *args):
+    failed.clear()
+
+@persistent
+def on_render_write(scene, *args):
+    factor = scene.get(META)
+    if not factor:
+        return
+    render = scene.render
+    filepath = bpy.path.abspath(render.frame_path(frame=scene.frame_current))
+    # the output format may have changed since the preset was applied
+    if render.is_movie_format or render.image_settings.file_format not in ROUND_TRIP:
+        failed.append((filepath, "%s frames aren't scaled up, apply the preset again" % render.image_settings.file_format))
+        return
+    # the size the preset asked for, before native mode lowered the percentage
+    width = render.resolution_x * factor * render.resolution_percentage // 100
+    height = render.resolution_y * factor * render.resolution_percentage // 100
+    try:
+        upscale_file(filepath, factor, width, height)
+    except (OSError, RuntimeError) as e:
+        failed.append((filepath, str(e)))
+
+HANDLERS = (
+    (bpy.app.handlers.render_init, on_render_init),
+    (bpy.app.handlers.render_write, on_render_write),
+)
+
+def register():
+    for handlers, function in HANDLERS:
+        if function not in handlers:
+            handlers.append(function)
+
+def unregister():
+    for handlers, function in HANDLERS:
+        if function in handlers:
+            handlers.remove(function)
@@ -0,0 +1,126 @@
+# palette-indexed PNGs
+# posterized frames use few colours, as 8 bit palette PNGs they're a fraction of the
+# size of RGBA ones. the palette can be kept across frames (colours are only ever
+# appended, so an index means the same colour in every frame of a shot) or built per
+# frame. once 256 colours are in use, new colours map to the nearest palette entry,
+# or with exact=True the frame isn't indexed at all.
+# no blender needed, the PNG writer only uses numpy and zlib.
+import struct
+import zlib
+
+import numpy as np
+
+MAX_COLORS = 256
+
+
+def pack(pixels):
+    # (h, w, 4) uint8 -> one uint32 per pixel
+    return np.ascontiguousarray(pixels).view(np.uint32)[..., 0]
+
+def unpack(colors):
+    return colors.astype(np.uint32).view(np.uint8).reshape(-1, 4)
+
+def to_rgba8(pixels):
+    if pixels.dtype == np.uint16:
+        pixels = (pixels >> 8).astype(np.uint8)
+    elif pixels.dtype != np.uint8:
+        pixels = (np.clip(pixels, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+    if pixels.ndim == 2:
+        pixels = pixels[..., np.newaxis]
+    channels = pixels.shape[2]
+    if channels == 4:
+        return pixels
+    out = np.empty(pixels.shape[:2] + (4,), dtype=np.uint8)
+    # grey, grey + alpha or rgb
+    out[..., :3] = pixels[..., :3] if channels >= 3 else pixels[..., :1]
+    out[..., 3] = pixels[..., 1] if channels == 2 else 255
+    return out
+
+
+class Palette:
+    def __init__(self):
+        self.colors = np.empty(0, dtype=np.uint32)
+        self.lookup = {}
+
+    def __len__(self):
+        return len(self.colors)
+
+    # pixel indices for an RGBA8 image, adding its colours while there's room. with
+    # exact=True a frame whose new colours don't all fit gives None and the palette
+    # stays as it was
+    def index(self, pixels, exact=False):
+        unique, inverse = np.unique(pack(pixels), return_inverse=True)
+        indices = np.empty(len(unique), dtype=np.uint8)
+        missing = []
+        for i, color in enumerate(unique.tolist()):
+            index = self.lookup.get(color)
+            if index is None:
+                missing.append(i)
+            else:
+                indices[i] = index
+
+        if exact and len(missing) > MAX_COLORS - len(self.colors):
+            return None
+        # most used colours get the free entries
+        if missing:
+            counts = np.bincount(inverse.ravel(), minlength=len(unique))[missing]
+            missing = [missing[i] for i in np.argsort(-counts, kind="stable")]
+            room = MAX_COLORS - len(self.colors)
+            added = missing[:room]
+            if added:
+                start = len(self.colors)
+                self.colors = np.concatenate((self.colors, unique[added]))
+                for offset, i in enumerate(added):
+                    self.lookup[int(unique[i])] = indices[i] = start + offset
+            rest = missing[room:]
+            if rest:
+                indices[rest] = self.nearest(unique[rest])
+        return indices[inverse].reshape(pixels.shape[:2])
+
+    def nearest(self, colors):
+        source = unpack(colors).astype(np.int32)
+        palette = unpack(self.colors).astype(np.int32)
+        found = np.empty(len(source), dtype=np.uint8)
+        # in blocks so (colours x 256) distances stay small
+        for start in range(0, len(source), 4096):
+            block = source[start:start + 4096]
+            distance = ((block[:, np.newaxis, :] - palette[np.newaxis, :, :]) ** 2).sum(axis=2)
+            found[start:start + 4096] = distance.argmin(axis=1)
+        return found
+
+    def rgba(self):
+        return unpack(self.colors)
+
+
+def chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+def write_png(filepath, indices, palette, level=6):
+    height, width = indices.shape
+    rgba = palette.rgba()
+    # filter byte 0 in front of every row
+    rows = np.empty((height, width + 1), dtype=np.uint8)
+    rows[:, 0] = 0
+    rows[:, 1:] = indices
+    data = b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+        chunk(b"PLTE", rgba[:, :3].tobytes()),
+        # alpha per palette entry, only when something isn't opaque
+        chunk(b"tRNS", rgba[:, 3].tobytes()) if (rgba[:, 3] != 255).any() else b"",
+        chunk(b"IDAT", zlib.compress(rows.tobytes(), level)),
+        chunk(b"IEND", b""),
+    ))
+    with open(filepath, "wb") as f:
+        f.write(data)
+
+# None without writing anything when exact=True and the colours don't fit
+def write_indexed(filepath, pixels, palette=None, exact=False):
+    if palette is None:
+        palette = Palette()
+    indices = palette.index(to_rgba8(pixels), exact)
+    if indices is None:
+        return None
+    write_png(filepath, indices, palette)
+    return palette
@@ -0,0 +1,496 @@
+# preset registry
+# every preset is plain data: scene property writes plus compositor parameters.
+# built-in presets live in BUILTIN_PRESETS, studios can add their own consoles by
+# dropping .toml/.json files into a "presets" folder next to manifest.toml, e.g.
+#
+#   [Dreamcast]
+#   family = "XBOX"                 # which dropdown it shows up in (PS1 or XBOX)
+#   label = "Dreamcast: 640x480"
+#   inherits = "Xbox"               # optional, start from another preset
+#   [Dreamcast.settings]
+#   "render.resolution_x" = 640
+#   "view_settings.look" = "Low Contrast"
+#   [Dreamcast.compositor]
+#   levels = 64
+#   [Dreamcast.textures]            # optional, biggest texture size while rendering
+#   budget = 512
+#   [Dreamcast.geometry]            # optional, triangle budget for the Polygon Budget operator
+#   triangles = 500000
+#   [Dreamcast.materials]           # optional, shading for the Simple Materials operator
+#   shading = "VERTEX"              # UNLIT or VERTEX (texture x vertex colour)
+#   [Dreamcast.memory]              # optional, settings added in memory-lean mode
+#   "eevee.shadow_pool_size" = "128"
+#   [Dreamcast.cpu]                 # optional, settings used instead when cycles has no GPU
+#   "cycles.samples" = 32
+import json
+import math
+import os
+import tomllib
+
+FAMILIES = ("PS1", "XBOX")
+
+# compositor chain parts a preset can mute
+COMPOSITOR_NODES = ("scale_down", "pixelate", "posterize", "scale_up")
+
+# settings shared by every preset, written before the preset's own settings
+BASE_SETTINGS = {
+    "render.engine": 'BLENDER_EEVEE_NEXT',
+    "render.resolution_percentage": 100,
+    "render.use_border": False,
+    "render.filter_size": 0.0,
+    # eevee settings
+    "eevee.taa_render_samples": 1,
+    "eevee.taa_samples": 1,
+    "eevee.use_taa_reprojection": False,
+    "eevee.use_gtao": True,
+    "eevee.gtao_distance": 100.0,
+    # color management settings
+    "view_settings.view_transform": 'Standard',
+}
+
+BASE_COMPOSITOR = {
+    "scale": 0.5,
+    "levels": 256.0,
+    "mute": [],
+    # 4x4 ordered dither before posterize, only used when the scene has use_dither on
+    "dither": False,
+}
+
+# textures bigger than budget are rendered from downsampled copies (0 keeps them),
+# rgb555 also drops them to the PS1's 15 bit colour. only used with console textures on
+BASE_TEXTURES = {
+    "budget": 0,
+    "rgb555": False,
+}
+
+# triangles for the whole shot when the polygon budget is applied, 0 leaves meshes alone
+BASE_GEOMETRY = {
+    "triangles": 0,
+}
+
+# shading the Simple Materials operator uses, "" leaves materials alone
+BASE_MATERIALS = {
+    "shading": "",
+}
+
+# settings written on top of the preset's own in memory-lean mode: a smaller eevee
+# shadow pool. the cycles presets add tiling and drop persistent data
+BASE_MEMORY = {
+    "eevee.shadow_pool_size": '256',
+}
+
+CYCLES_MEMORY = {
+    "cycles.use_auto_tile": True,
+    "cycles.tile_size": 1024,
+    "render.use_persistent_data": False,
+}
+
+# cycles presets on machines without a GPU: adaptive sampling with a loose threshold,
+# OIDN instead of samples, capped light paths and persistent data between frames
+CYCLES_CPU = {
+    "cycles.device": 'CPU',
+    "cycles.samples": 64,
+    "cycles.preview_samples": 16,
+    "cycles.use_adaptive_sampling": True,
+    "cycles.adaptive_threshold": 0.05,
+    "cycles.adaptive_min_samples": 8,
+    "cycles.use_denoising": True,
+    "cycles.denoiser": 'OPENIMAGEDENOISE',
+    "cycles.max_bounces": 4,
+    "cycles.diffuse_bounces": 2,
+    "cycles.glossy_bounces": 2,
+    "cycles.transmission_bounces": 4,
+    "cycles.transparent_max_bounces": 4,
+    "cycles.volume_bounces": 0,
+    "cycles.caustics_reflective": False,
+    "cycles.caustics_refractive": False,
+    "render.use_persistent_data": True,
+    "render.threads_mode": 'AUTO',
+}
+
+# order matters, it's the dropdown order (and blender stores enums by index)
+BUILTIN_PRESETS = {
+    "PS1_min": {
+        "family": "PS1",
+        "label": "PS1: 256x224",
+        "description": "Min resolution for the PS Link Cable",
+        "settings": {
+            "render.resolution_x": 256,
+            "render.resolution_y": 224,
+            "view_settings.look": 'Very Low Contrast',
+        },
+        "compositor": {"levels": 32.0, "dither": True},
+        "textures": {"budget": 256, "rgb555": True},
+        "geometry": {"triangles": 20000},
+        "materials": {"shading": 'VERTEX'},
+    },
+    "PS1_max": {
+        "family": "PS1",
+        "label": "PS1: 640x480",
+        "description": "Max resolution for the PS Link Cable",
+        "settings": {
+            "render.resolution_x": 640,
+            "render.resolution_y": 480,
+            "view_settings.look": 'Very Low Contrast',
+        },
+        "compositor": {"levels": 32.0, "dither": True},
+        "textures": {"budget": 256, "rgb555": True},
+        "geometry": {"triangles": 50000},
+        "materials": {"shading": 'VERTEX'},
+    },
+    "PS2": {
+        "family": "PS1",
+        "label": "PS2: 720x480",
+        "description": "Released March 4th, 2000",
+        "settings": {
+            "render.resolution_x": 720,
+            "render.resolution_y": 480,
+            "view_settings.look": 'Low Contrast',
+        },
+        "compositor": {"levels": 256.0},
+        "textures": {"budget": 512},
+        "geometry": {"triangles": 250000},
+        "materials": {"shading": 'VERTEX'},
+    },
+    "PSP": {
+        "family": "PS1",
+        "label": "PSP: 480x272",
+        "description": "Released December 12th, 2004",
+        "settings": {
+            "render.resolution_x": 480,
+            "render.resolution_y": 272,
+            "view_settings.look": 'Low Contrast',
+        },
+        "compositor": {"levels": 64.0},
+        "textures": {"budget": 512},
+        "geometry": {"triangles": 100000},
+        "materials": {"shading": 'VERTEX'},
+    },
+    "PS3": {
+        "family": "PS1",
+        "label": "PS3: 1920x1080",
+        "description": "Released November 11th, 2006",
+        "settings": {
+            "render.resolution_x": 1920,
+            "render.resolution_y": 1080,
+            "render.filter_size": 1.5,
+            "eevee.taa_render_samples": 64,
+            "eevee.taa_samples": 64,
+            "view_settings.look": 'Medium Contrast',
+        },
+        "compositor": {"levels": 512.0},
+        "textures": {"budget": 1024},
+        "geometry": {"triangles": 1000000},
+    },
+    "PS_Vita": {
+        "family": "PS1",
+        "label": "PS Vita: 960x544",
+        "description": "Released December 17th, 2011",
+        "settings": {
+            "render.resolution_x": 960,
+            "render.resolution_y": 544,
+            "view_settings.look": 'Medium Contrast',
+        },
+        "compositor": {"levels": 64.0},
+        "textures": {"budget": 1024},
+        "geometry": {"triangles": 500000},
+    },
+    "PS4": {
+        "family": "PS1",
+        "label": "PS4: 1920x1080",
+        "description": "Released November 10th, 2016",
+        "settings": {
+            "render.resolution_x": 1920,
+            "render.resolution_y": 1080,
+            "render.filter_size": 1.5,
+            "eevee.taa_render_samples": 128,
+            "eevee.taa_samples": 128,
+            "view_settings.look": 'Medium High Contrast',
+            "view_settings.view_transform": 'AgX',
+        },
+        "compositor": {"levels": 1024.0, "mute": ["scale_down", "pixelate", "scale_up"]},
+    },
+    "PS5": {
+        "family": "PS1",
+        "label": "PS5: 3840x2160",
+        "description": "Released November 12th, 2020",
+        "settings": {
+            "render.resolution_x": 3840,
+            "render.resolution_y": 2160,
+            "render.filter_size": 2.0,
+            "render.engine": 'CYCLES',
+            "cycles.device": 'GPU',
+            "cycles.use_preview_denoising": True,
+            "cycles.use_denoising": True,
+            "cycles.preview_samples": 256,
+            "cycles.samples": 256,
+            "view_settings.look": 'Medium High Contrast',
+            "view_settings.view_transform": 'AgX',
+        },
+        "compositor": {"levels": 1024.0, "mute": list(COMPOSITOR_NODES)},
+        "cpu": CYCLES_CPU,
+        "memory": CYCLES_MEMORY,
+    },
+    "Xbox": {
+        "family": "XBOX",
+        "label": "Xbox: 640x480",
+        "description": "Released November 15th, 2001",
+        "settings": {
+            "render.resolution_x": 640,
+            "render.resolution_y": 480,
+            "view_settings.look": 'Very Low Contrast',
+        },
+        "compositor": {"levels": 32.0},
+        "textures": {"budget": 512},
+        "geometry": {"triangles": 250000},
+    },
+    "Xbox_360": {
+        "family": "XBOX",
+        "label": "Xbox 360: 1280x720",
+        "description": "Released November 22nd, 2005",
+        "settings": {
+            "render.resolution_x": 1280,
+            "render.resolution_y": 720,
+            "view_settings.look": 'Low Contrast',
+        },
+        "compositor": {"levels": 128.0},
+        "textures": {"budget": 1024},
+        "geometry": {"triangles": 1000000},
+    },
+    "Xbox_One": {
+        "family": "XBOX",
+        "label": "Xbox One: 1920x1080",
+        "description": "Released November 22nd, 2013",
+        "settings": {
+            "render.resolution_x": 1920,
+            "render.resolution_y": 1080,
+            "view_settings.view_transform": 'AgX',
+            "view_settings.look": 'AgX - Medium Low Contrast',
+        },
+        "compositor": {"levels": 256.0},
+    },
+    "Xbox_Series_S": {
+        "family": "XBOX",
+        "label": "Xbox Series S: 3840x2160",
+        "description": "Released November 10th, 2020",
+        "settings": {
+            "render.resolution_x": 1920,
+            "render.resolution_y": 1080,
+            "render.engine": 'CYCLES',
+            "cycles.device": 'GPU',
+            "cycles.preview_samples": 64,
+            "cycles.samples": 128,
+            "cycles.use_preview_denoising": True,
+            "cycles.use_denoising": True,
+            "view_settings.view_transform": 'AgX',
+            "view_settings.look": 'AgX - Medium High Contrast',
+        },
+        "compositor": {"mute": list(COMPOSITOR_NODES)},
+        "cpu": dict(CYCLES_CPU, **{"cycles.samples": 32}),
+        "memory": CYCLES_MEMORY,
+    },
+    "Xbox_Series_X": {
+        "family": "XBOX",
+        "label": "Xbox Series X: 3840x2160",
+        "description": "Released November 10th, 2020",
+        "settings": {
+            "render.resolution_x": 3840,
+            "render.resolution_y": 2160,
+            "render.engine": 'CYCLES',
+            "cycles.device": 'GPU',
+            "cycles.preview_samples": 256,
+            "cycles.samples": 256,
+            "cycles.use_preview_denoising": True,
+            "cycles.use_denoising": True,
+            "view_settings.view_transform": 'AgX',
+            "view_settings.look": 'AgX - Punchy',
+        },
+        "compositor": {"mute": list(COMPOSITOR_NODES)},
+        "cpu": CYCLES_CPU,
+        "memory": CYCLES_MEMORY,
+    },
+}
+
+# scene custom property holding the name of the last preset applied to the scene
+ACTIVE = "ps1_preset"
+
+# name -> compiled preset, filled by load()
+_registry = {}
+
+
+def user_preset_dir():
+    # the folder next to manifest.toml (the add-on folder for installed extensions)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for folder in (here, os.path.dirname(here)):
+        if os.path.isfile(os.path.join(folder, "manifest.toml")):
+            return os.path.join(folder, "presets")
+    return os.path.join(here, "presets")
+
+def read_preset_file(filepath):
+    if filepath.endswith(".toml"):
+        with open(filepath, "rb") as f:
+            return tomllib.load(f)
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_user_presets(folder=None):
+    if folder is None:
+        folder = user_preset_dir()
+    found = {}
+    if not os.path.isdir(folder):
+        return found
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith((".toml", ".json")):
+            continue
+        filepath = os.path.join(folder, filename)
+        try:
+            data = read_preset_file(filepath)
+        except (OSError, ValueError) as e:
+            print("PS1-ify: skipping preset file %s: %s" % (filepath, e))
+            continue
+        for name, preset in data.items():
+            if not isinstance(preset, dict):
+                print("PS1-ify: skipping preset %s in %s: not a table" % (name, filepath))
+                continue
+            found[name] = preset
+    return found
+
+def resolve(name, presets, seen=()):
+    preset = presets[name]
+    parent = preset.get("inherits")
+    if not parent:
+        return preset
+    if parent in seen or parent not in presets:
+        raise ValueError("Preset %s inherits unknown or circular preset %s" % (name, parent))
+    base = resolve(parent, presets, seen + (name,))
+    merged = dict(base)
+    merged.update(preset)
+    merged["settings"] = dict(base.get("settings", {}), **preset.get("settings", {}))
+    merged["compositor"] = dict(base.get("compositor", {}), **preset.get("compositor", {}))
+    merged["textures"] = dict(base.get("textures", {}), **preset.get("textures", {}))
+    merged["geometry"] = dict(base.get("geometry", {}), **preset.get("geometry", {}))
+    merged["materials"] = dict(base.get("materials", {}), **preset.get("materials", {}))
+    merged["memory"] = dict(base.get("memory", {}), **preset.get("memory", {}))
+    merged["cpu"] = dict(base.get("cpu", {}), **preset.get("cpu", {}))
+    return merged
+
+# settings as writes grouped per owner, so "render.resolution_x" and
+# "render.resolution_y" share one getattr chain
+def group_writes(settings):
+    owners = {}
+    for path, value in settings.items():
+        owner, _, attr = path.rpartition(".")
+        owners.setdefault(tuple(owner.split(".")) if owner else (), []).append((attr, value))
+    return tuple((owner, tuple(values)) for owner, values in owners.items())
+
+# turn a preset into a flat list of writes
+def compile_preset(name, preset):
+    family = preset.get("family", "PS1")
+    if family not in FAMILIES:
+        raise ValueError("Preset %s has unknown family %s" % (name, family))
+
+    # base first, preset values keep the base position (view_transform before look)
+    settings = dict(BASE_SETTINGS)
+    settings.update(preset.get("settings", {}))
+    writes = group_writes(settings)
+    # the cpu block replaces settings when there's no GPU, see apply_preset
+    cpu_writes = group_writes(dict(settings, **preset["cpu"])) if preset.get("cpu") else None
+
+    compositor = dict(BASE_COMPOSITOR)
+    compositor.update(preset.get("compositor", {}))
+    unknown = set(compositor["mute"]) - set(COMPOSITOR_NODES)
+    if unknown:
+        raise ValueError("Preset %s mutes unknown compositor nodes: %s" % (name, ", ".join(sorted(unknown))))
+    compositor["mute"] = frozenset(compositor["mute"])
+
+    materials = dict(BASE_MATERIALS, **preset.get("materials", {}))
+    if materials["shading"] not in ("", "UNLIT", "VERTEX"):
+        raise ValueError("Preset %s has unknown shading %s" % (name, materials["shading"]))
+
+    return {
+        "name": name,
+        "family": family,
+        "label": preset.get("label", name),
+        "description": preset.get("description", ""),
+        "writes": writes,
+        "cpu_writes": cpu_writes,
+        "compositor": compositor,
+        "textures": dict(BASE_TEXTURES, **preset.get("textures", {})),
+        "geometry": dict(BASE_GEOMETRY, **preset.get("geometry", {})),
+        "materials": materials,
+        "memory": dict(BASE_MEMORY, **preset.get("memory", {})),
+    }
+
+def load(folder=None):
+    presets = dict(BUILTIN_PRESETS)
+    presets.update(load_user_presets(folder))
+
+    _registry.clear()
+    for name in presets:
+        try:
+            _registry[name] = compile_preset(name, resolve(name, presets))
+        except (ValueError, TypeError, KeyError) as e:
+            print("PS1-ify: skipping preset %s: %s" % (name, e))
+    return _registry
+
+def get(name):
+    if not _registry:
+        load()
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError("Unknown preset: %s" % name) from None
+
+def enum_items(family):
+    # before load() only the built-ins are known, that's enough for the class definition
+    presets = _registry or {name: compile_preset(name, preset) for name, preset in BUILTIN_PRESETS.items()}
+    return tuple(
+        (name, preset["label"], preset["description"])
+        for name, preset in presets.items()
+        if preset["family"] == family
+    )
+
+# a compiled preset with some of its settings replaced, for render modes that
+# change what the preset writes. only settings the preset writes can be replaced
+def override(preset, settings):
+    writes = tuple(
+        (owner, tuple((attr, settings.get(".".join(owner + (attr,)), value)) for attr, value in values))
+        for owner, values in preset["writes"]
+    )
+    return dict(preset, writes=writes)
+
+# a compiled preset that also writes settings, added after the preset's own
+def extend(preset, settings):
+    merged = {".".join(owner + (attr,)): value for owner, values in preset["writes"] for attr, value in values}
+    merged.update(settings)
+    return dict(preset, writes=group_writes(merged))
+
+def same_value(current, value):
+    if isinstance(value, float):
+        return math.isclose(current, value, rel_tol=1e-6, abs_tol=1e-6)
+    return current == value
+
+# write a compiled preset as a diff, values already set are left alone so
+# nothing gets tagged for update. returns the number of writes
+def apply_settings(scene, preset):
+    changed = 0
+    for path, values in preset["writes"]:
+        owner = scene
+        for name in path:
+            owner = getattr(owner, name)
+        for attr, value in values:
+            if not same_value(getattr(owner, attr), value):
+                setattr(owner, attr, value)
+                changed += 1
+    return changed
+
+# the scene's current values of everything a compiled preset writes, as a preset of
+# their own. applying it puts the values back
+def snapshot(scene, preset):
+    writes = []
+    for path, values in preset["writes"]:
+        owner = scene
+        for name in path:
+            owner = getattr(owner, name)
+        writes.append((path, tuple((attr, getattr(owner, attr)) for attr, value in values)))
+    return dict(preset, writes=tuple(writes))
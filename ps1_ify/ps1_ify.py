@@ -1,8 +1,28 @@
+import os
+
 import bpy
-from bpy.props import EnumProperty, PointerProperty, BoolProperty
+from bpy.props import EnumProperty, PointerProperty, BoolProperty, IntProperty, StringProperty
 from bpy.types import Operator, Panel, PropertyGroup, Scene
 from bpy.utils import register_class, unregister_class
 
+from ps1_ify import presets
+from ps1_ify import compositor as ps1_compositor
+from ps1_ify import wobble
+from ps1_ify import wobble_bake
+from ps1_ify import farm
+from ps1_ify import native
+from ps1_ify import viewport
+from ps1_ify import devices
+from ps1_ify import textures
+from ps1_ify import decimate
+from ps1_ify import stats
+from ps1_ify import indexed
+from ps1_ify import hold
+from ps1_ify import multi
+from ps1_ify import materials
+from ps1_ify import lighting
+from ps1_ify import memory
+
 class PS1_Panel_Base:
     bl_space_type = "VIEW_3D"
     bl_region_type = "UI"
@@ -21,12 +41,26 @@ class PS1_PT_Panel_Main(PS1_Panel_Base, bpy.types.Panel):
         
         col = layout.column()
         col.prop(placeholder, "dropdown_box", text="Presets")
+        col.prop(placeholder, "use_dither")
         
         layout.operator('xbox.op', text='Xbox-Ify').action = 'XBOX'
         
         col = layout.column()
         col.prop(placeholder, "dropdown_xbox", text="Presets")
         
+        layout.prop(placeholder, "native_resolution")
+        if native.failed:
+            layout.label(text="%d frames not scaled up: %s" % (len(native.failed), native.failed[0][1]), icon='ERROR')
+        layout.prop(placeholder, "console_textures")
+        layout.prop(placeholder, "indexed_png", text="Indexed PNG")
+        if indexed.skipped:
+            layout.label(text="%d frames not indexed: %s" % (len(indexed.skipped), indexed.skipped[0][1]), icon='ERROR')
+        layout.prop(placeholder, "render_on", text="Render on N's")
+        layout.prop(placeholder, "memory_lean")
+        
+        col = layout.column()
+        col.prop(placeholder, "viewport_preview", text="Viewport")
+        col.prop(placeholder, "pause_navigation")
         layout.prop(placeholder, "enable_wobble", text="Enable Wobble")
 
 # Subpanel (grouping of child panels, appears only when enable_wobble is True)
@@ -40,54 +74,295 @@ class PS1_PT_Panel_Wobble(PS1_Panel_Base, bpy.types.Panel):
         placeholder = context.scene.placeholder
         
         layout.enabled = placeholder.enable_wobble
+        layout.prop(placeholder, "wobble_scope", text="Scope")
+        if placeholder.wobble_scope == 'COLLECTION':
+            layout.prop(placeholder, "wobble_collection", text="Collection")
+        layout.operator('wobble.op', text="Update Targets").action = 'WOBBLE'
+        
+        row = layout.row(align=True)
+        row.operator('wobble.bake', text="Bake Wobble").action = 'BAKE'
+        row.operator('wobble.bake', text="", icon='X').action = 'CLEAR'
+        if wobble_bake.is_baked(context.scene):
+            layout.label(text="Baked, playing back from cache")
         layout.prop(placeholder, "speed", text="Speed")
         layout.prop(placeholder, "strength", text="Strength")
         layout.prop(placeholder, "grid_size", text="Grid Size")
+        layout.prop(placeholder, "lod_distance", text="LOD Distance")
+        layout.prop(placeholder, "frustum_cull")
+
+class PS1_PT_Panel_Geometry(PS1_Panel_Base, bpy.types.Panel):
+    bl_parent_id = "PS1_PT_panel_main"
+    bl_label = "Polygon Budget"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        placeholder = context.scene.placeholder
 
+        layout.prop(placeholder, "polygon_budget", text="Triangles")
+        budget = polygon_budget(context.scene)
+        if budget:
+            layout.label(text="Budget: %d triangles" % budget)
+        else:
+            layout.label(text="Apply a preset with a budget first")
+        row = layout.row(align=True)
+        row.operator('ps1.decimate', text="Decimate").action = 'APPLY'
+        row.operator('ps1.decimate', text="Restore").action = 'RESTORE'
+
+class PS1_PT_Panel_Materials(PS1_Panel_Base, bpy.types.Panel):
+    bl_parent_id = "PS1_PT_panel_main"
+    bl_label = "Simple Materials"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        placeholder = context.scene.placeholder
+
+        layout.prop(placeholder, "material_shading", text="Shading")
+        shading = material_shading(context.scene)
+        layout.label(text="Shading: %s" % shading.title() if shading else "The applied preset keeps its materials")
+        row = layout.row(align=True)
+        row.operator('ps1.simplify_materials', text="Simplify").action = 'APPLY'
+        row.operator('ps1.simplify_materials', text="Restore").action = 'RESTORE'
+        layout.operator('ps1.bake_lighting', icon='LIGHT')
+        layout.prop(placeholder, "baked_lighting")
+
+# rows from the render log, see stats.py
+class PS1_PT_Panel_Stats(PS1_Panel_Base, bpy.types.Panel):
+    bl_parent_id = "PS1_PT_panel_main"
+    bl_label = "Render Stats"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        placeholder = context.scene.placeholder
+
+        layout.prop(placeholder, "frame_budget", text="Frame Budget")
+        rows = stats.summary(limit=500)
+        if not rows:
+            layout.label(text="No frames rendered yet")
+        col = layout.column(align=True)
+        for preset, row in rows.items():
+            box = col.box()
+            box.alert = bool(placeholder.frame_budget) and row["worst"] > placeholder.frame_budget
+            box.label(text="%s: %d frames" % (preset, row["frames"]))
+            box.label(text="Avg %.2fs, worst %.2fs, compositor %.2fs" % (row["mean"], row["worst"], row["composite"]))
+            if row["peak_mb"]:
+                box.label(text="Peak memory %.0f MB" % row["peak_mb"])
+        found = memory.last(context.scene)
+        row = layout.row()
+        row.label(text="Frame memory: %s" % memory_text(found) if found else "Frame memory: not estimated yet")
+        row.operator('ps1.estimate_memory', text="", icon='FILE_REFRESH')
+        layout.label(text="Log: %s" % stats.log_path())
+        layout.operator('ps1.clear_stats', text="Clear Log", icon='TRASH')
+
+class PS1_PT_Panel_Multi(PS1_Panel_Base, bpy.types.Panel):
+    bl_parent_id = "PS1_PT_panel_main"
+    bl_label = "All Presets"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        placeholder = context.scene.placeholder
+
+        layout.column(align=True).prop(placeholder, "multi_presets")
+        layout.prop(placeholder, "multi_output", text="Output")
+        row = layout.row(align=True)
+        row.operator('ps1.render_multi', text="Render Still", icon='RENDER_STILL').animation = False
+        row.operator('ps1.render_multi', text="Render Animation", icon='RENDER_ANIMATION').animation = True
+
+class PS1_PT_Panel_Farm(PS1_Panel_Base, bpy.types.Panel):
+    bl_parent_id = "PS1_PT_panel_main"
+    bl_label = "Parallel Render"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        placeholder = context.scene.placeholder
+
+        layout.prop(placeholder, "farm_family", text="Preset")
+        layout.prop(placeholder, "farm_workers", text="Workers")
+        layout.prop(placeholder, "farm_chunk_size", text="Chunk Size")
+        if PS1_OT_render_parallel.job is None:
+            layout.operator('ps1.render_parallel', text="Render Animation", icon='RENDER_ANIMATION')
+        else:
+            job = PS1_OT_render_parallel.job
+            layout.label(text="Rendering %d/%d frames" % (job.done, job.total))
+
+
+# dropdown items come from the preset registry, see presets.py
+def preset_dropdown(family, name, default):
+    return EnumProperty(
+        items=presets.enum_items(family),
+        name=name,
+        default=default,
+        description="Presets for game console resolutions",
+    )
+
+# every preset as toggles, for rendering several presets at once
+def preset_flags():
+    items = presets.enum_items("PS1") + presets.enum_items("XBOX")
+    return EnumProperty(
+        items=items[:32],
+        name="Presets",
+        options={'ENUM_FLAG'},
+        default={"PS1_max"},
+        description="Presets to write from a single render",
+    )
 
 # adding the dropdown with presets
 class PS1Properties(PropertyGroup):
-    dropdown_box: EnumProperty(
+    dropdown_box: preset_dropdown("PS1", "Presets", "PS1_max")
+
+    dropdown_xbox: preset_dropdown("XBOX", "Presets2", "Xbox")
+    
+    use_dither: BoolProperty(
+        name="15-bit Dither",
+        default=False,
+        description="Add the PS1's 4x4 ordered dither before posterizing (PS1 presets only, applied with the preset)",
+    )
+    
+    native_resolution: BoolProperty(
+        name="Native Resolution",
+        default=False,
+        description="Render at the console's low resolution and only scale the written frames up, "
+                    "instead of rendering full size and scaling down in the compositor (applied with the preset)",
+    )
+    
+    def update_viewport_preview(self, context):
+        use_viewport_compositor(context)
+    
+    viewport_preview: EnumProperty(
         items=(
-            ("PS1_min", "PS1: 256x224", "Min resolution for the PS Link Cable"),
-            ("PS1_max", "PS1: 640x480", "Max resolution for the PS Link Cable"),
-            ("PS2", "PS2: 720x480", "Released March 4th, 2000"),
-            ("PSP", "PSP: 480x272", "Released December 12th, 2004"),
-            ("PS3", "PS3: 1920x1080", "Released November 11th, 2006"),
-            ("PS_Vita", "PS Vita: 960x544", "Released December 17th, 2011"),
-            ("PS4", "PS4: 1920x1080", "Released November 10th, 2016"),
-            ("PS5", "PS5: 3840x2160", "Released November 12th, 2020"),
+            ('ALWAYS', "Always", "Run the PS1 compositor in every viewport redraw"),
+            ('CAMERA', "Camera View", "Only run the PS1 compositor when looking through the camera"),
+            ('DISABLED', "Off", "Don't preview the PS1 compositor in the viewport"),
         ),
-        name="Presets",
-        default="PS1_max",
-        description="Presets for game console resolutions",
+        name="Viewport Preview",
+        default='CAMERA',
+        description="When the viewport shows the compositor result",
+        update=update_viewport_preview
     )
-
-    dropdown_xbox: EnumProperty(
+    
+    pause_navigation: BoolProperty(
+        name="Pause While Navigating",
+        default=True,
+        description="Turn the viewport compositor off while the view is orbited, panned or zoomed",
+    )
+    
+    console_textures: BoolProperty(
+        name="Console Textures",
+        default=False,
+        description="Render with textures downsampled to the preset's texture budget, "
+                    "copies are cached on disk and the originals are back after rendering (applied with the preset)",
+    )
+    
+    def update_render_on(self, context):
+        if self.enable_wobble:
+            wobble.set_frame_step(self.render_on)
+            wobble_bake.invalidate(context.scene)
+    
+    render_on: IntProperty(
+        name="Render On",
+        default=1,
+        min=1,
+        max=8,
+        description="Render every Nth frame and hold it for the frames in between, "
+                    "2 gives 12 fps at 24 fps (image sequences only, applied with the preset)",
+        update=update_render_on
+    )
+    
+    indexed_png: EnumProperty(
         items=(
-            ("Xbox", "Xbox: 640x480", "Released November 15th, 2001"),
-            ("Xbox_360", "Xbox 360: 1280x720", "Released November 22nd, 2005"),
-            ("Xbox_One", "Xbox One: 1920x1080", "Released November 22nd, 2013"),
-            ("Xbox_Series_S", "Xbox Series S: 3840x2160", "Released November 10th, 2020"),
-            ("Xbox_Series_X", "Xbox Series X: 3840x2160", "Released November 10th, 2020"),
+            ('OFF', "Off", "Write frames as the output settings say"),
+            ('SHOT', "Shot Palette", "Palette PNGs, all frames of a render share one palette"),
+            ('FRAME', "Frame Palette", "Palette PNGs, each frame gets its own palette"),
         ),
-        name="Presets2",
-        default="Xbox",
-        description="Presets for game console resolutions",
+        name="Indexed PNG",
+        default='OFF',
+        description="Rewrite rendered PNG frames with at most 256 colours as palette PNGs, much smaller for posterized presets",
+    )
+    
+    multi_presets: preset_flags()
+    
+    multi_output: StringProperty(
+        name="Output Folder",
+        default="//ps1_presets/",
+        subtype='DIR_PATH',
+        description="Each preset writes into its own subfolder here",
+    )
+    
+    polygon_budget: IntProperty(
+        name="Polygon Budget",
+        default=0,
+        min=0,
+        description="Triangles for the whole shot, 0 uses the budget of the applied preset",
+    )
+    
+    material_shading: EnumProperty(
+        items=[
+            ('PRESET', 'Preset', 'Use the shading of the applied preset'),
+            ('UNLIT', 'Unlit', 'Texture or colour only'),
+            ('VERTEX', 'Vertex Lit', 'Texture times the vertex colour, bake lighting into it first'),
+        ],
+        name="Shading",
+        default='PRESET',
+        description="Shading of the simple materials",
+    )
+    
+    memory_lean: BoolProperty(
+        name="Memory Lean",
+        default=False,
+        description="Turn off render passes the compositor doesn't read, use half float compositing where the preset allows it and the preset's low memory settings",
+    )
+    
+    baked_lighting: BoolProperty(
+        name="Baked Lighting",
+        default=False,
+        description="Render with the baked PS1 Light vertex colours only: hides the lights and turns GTAO off when a preset is applied",
+    )
+    
+    frame_budget: bpy.props.FloatProperty(
+        name="Frame Budget",
+        default=0.0,
+        min=0.0,
+        unit='TIME_ABSOLUTE',
+        description="Seconds a frame may take, presets with slower frames are highlighted in Render Stats (0 = off)",
+    )
+    
+    farm_family: EnumProperty(
+        items=(
+            ('PS1', "PS1", "Render with the preset picked in the PS1 dropdown"),
+            ('XBOX', "Xbox", "Render with the preset picked in the Xbox dropdown"),
+        ),
+        name="Render Preset",
+        default='PS1',
+        description="Which dropdown's preset the parallel render applies",
+    )
+
+    farm_workers: IntProperty(
+        name="Workers",
+        default=2,
+        min=1,
+        max=64,
+        description="Background Blender processes rendering at once, the CPU threads are split between them",
+    )
+
+    farm_chunk_size: IntProperty(
+        name="Chunk Size",
+        default=10,
+        min=1,
+        description="Frames per background Blender process",
     )
     
     def update_wobble(self, context):
         if not self.enable_wobble:
-            # Remove the "Wobble" modifiers from all mesh objects
-            for obj in bpy.data.objects:
-                if obj.type == 'MESH':
-                    for modifier in obj.modifiers:
-                        if modifier.type == 'NODES' and modifier.node_group:
-                            if modifier.node_group.name == "Wobble":
-                                obj.modifiers.remove(modifier)
+            # Remove the "Wobble" modifiers from the scene's mesh objects, other scenes keep theirs
+            wobble_bake.clear(context.scene)
+            wobble.detach(context.scene.objects)
         elif self.enable_wobble:
             # Execute the wobble setup function
-            bpy.ops.wobble.op('INVOKE_DEFAULT', action='WOBBLE')
+            WOBBLE_OT_op.wobble(context)
 
     enable_wobble: bpy.props.BoolProperty(
         name="Enable Wobble",
@@ -96,23 +371,31 @@ class PS1Properties(PropertyGroup):
         update=update_wobble
     )
     
+    wobble_scope: EnumProperty(
+        items=(
+            ('SCENE', "Scene", "Visible meshes in the active scene"),
+            ('COLLECTION', "Collection", "Visible meshes in the chosen collection"),
+            ('SELECTED', "Selected", "Selected meshes"),
+            ('CAMERA', "Visible to Camera", "Meshes inside the active camera's view when wobble is applied"),
+        ),
+        name="Wobble Scope",
+        default='SCENE',
+        description="Which meshes get the wobble modifier",
+        update=update_wobble
+    )
+    
+    wobble_collection: PointerProperty(
+        type=bpy.types.Collection,
+        name="Wobble Collection",
+        description="Collection to wobble when the scope is Collection",
+        update=update_wobble
+    )
+    
     def update_wobble_settings(self, context):
+        # all objects share the one "Wobble" group, so this is a single datablock write
         if self.enable_wobble:
-            for obj in bpy.data.objects:
-                if obj.type == 'MESH':
-                    for modifier in obj.modifiers:
-                        if modifier.type == 'NODES' and modifier.node_group:
-                            if modifier.node_group.name == "Wobble":
-                                # Update the values in the wobble node group
-                                for node in modifier.node_group.nodes:
-                                    if node.type == 'VALUE':
-                                        if node.name == "Speed":
-                                            node.outputs[0].default_value = self.speed
-                                        elif node.name == "Strength":
-                                            node.outputs[0].default_value = self.strength
-                                        elif node.name == "Grid Size":
-                                            node.outputs[0].default_value = self.grid_size
-        
+            wobble.update_settings(self)
+            wobble_bake.invalidate(context.scene)
     
     speed: bpy.props.FloatProperty(
         name="Speed",
@@ -138,6 +421,26 @@ class PS1Properties(PropertyGroup):
         update=update_wobble_settings
     )
     
+    lod_distance: bpy.props.FloatProperty(
+        name="LOD Distance",
+        default=0.0,
+        min=0.0,
+        unit='LENGTH',
+        description="Objects further than this from the active camera don't wobble, 0 wobbles everything",
+        update=update_wobble_settings
+    )
+    
+    def update_frustum_cull(self, context):
+        if self.enable_wobble:
+            wobble.set_frustum(context.scene, self)
+    
+    frustum_cull: BoolProperty(
+        name="Skip Outside Camera",
+        default=False,
+        description="Skip the wobble for objects outside the camera view, the test runs in the node group against the scene camera's field of view",
+        update=update_frustum_cull
+    )
+    
 class WOBBLE_OT_op(Operator):
     bl_idname = 'wobble.op'
     bl_label = 'Use Wobble'
@@ -154,131 +457,353 @@ class WOBBLE_OT_op(Operator):
         self.wobble(context=context)
         return {'FINISHED'}
 
-    # geometry nodetree setup
     @staticmethod
     def wobble(context):
-        geonodetree = None
+        if context.scene.placeholder.enable_wobble:
+            # Add the modifier to the meshes in scope, remove it from the rest
+            wobble.sync(context.scene, context.view_layer, context.scene.placeholder)
+            # a bake of other objects or another scope doesn't hold any more
+            wobble_bake.invalidate(context.scene)
+
+class WOBBLE_OT_bake(Operator):
+    bl_idname = 'wobble.bake'
+    bl_label = 'Bake Wobble'
+    bl_description = 'Evaluate the wobble once over the frame range and play it back from a cache'
+    bl_options = {'REGISTER', 'UNDO'}
 
-        if bpy.context.scene.placeholder.enable_wobble:
-            all_node_groups = bpy.data.node_groups
+    action: EnumProperty(
+        items=[
+            ('BAKE', 'bake', 'bake wobble'),
+            ('CLEAR', 'clear', 'clear baked wobble'),
+        ]
+    )
 
-            # Check if any node group is a Geometry Nodes tree named "Wobble"
-            for node_group in all_node_groups:
-                if node_group.bl_idname == 'GeometryNodeTree' and node_group.name == "Wobble":
-                    geonodetree = node_group
-                    break
+    def execute(self, context):
+        scene = context.scene
+        if self.action == 'CLEAR':
+            wobble_bake.clear(scene)
+            return {'FINISHED'}
+        if not scene.placeholder.enable_wobble:
+            self.report({'WARNING'}, "Enable Wobble first")
+            return {'CANCELLED'}
+        count = wobble_bake.bake(context, scene.frame_start, scene.frame_end)
+        self.report({'INFO'}, "Baked wobble on %d objects" % count)
+        return {'FINISHED'}
+
+# renders the scene's frame range with background blender processes, see farm.py
+class PS1_OT_render_parallel(Operator):
+    bl_idname = 'ps1.render_parallel'
+    bl_label = 'Parallel Render'
+    bl_description = 'Render the frame range with several background Blender processes, frames already on disk are skipped'
+
+    # the running job, one at a time
+    job = None
+
+    @classmethod
+    def poll(cls, context):
+        return cls.job is None
+
+    def invoke(self, context, event):
+        if not bpy.data.filepath:
+            self.report({'ERROR'}, "Save the .blend first, the workers render from the file")
+            return {'CANCELLED'}
+        scene = context.scene
+        props = scene.placeholder
+        preset = props.dropdown_box if props.farm_family == 'PS1' else props.dropdown_xbox
+
+        # the workers read a copy so unsaved changes are rendered too, next to the
+        # original so relative paths still resolve
+        self.blend = os.path.splitext(bpy.data.filepath)[0] + ".ps1_render.blend"
+        bpy.ops.wm.save_as_mainfile(filepath=self.blend, copy=True)
+
+        job = farm.Job(
+            bpy.app.binary_path, self.blend, preset,
+            list(range(scene.frame_start, scene.frame_end + 1)), scene.render.filepath,
+            workers=props.farm_workers, chunk_size=props.farm_chunk_size,
+            extension=scene.render.file_extension if scene.render.use_file_extension else "",
+        )
+        self.message = ""
+        job.start(on_progress=self.progress)
+        PS1_OT_render_parallel.job = job
+
+        self.timer = context.window_manager.event_timer_add(0.5, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    # called from the job's thread, only keeps the text for the next timer tick
+    def progress(self, job, message):
+        self.message = message
+        print("PS1-ify: [%d/%d] %s" % (job.done, job.total, message))
+
+    def modal(self, context, event):
+        job = PS1_OT_render_parallel.job
+        if event.type == 'ESC':
+            job.cancel()
+        elif event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if not job.finished:
+            context.workspace.status_text_set("PS1-ify render: %d/%d frames, %s (Esc to cancel)" % (job.done, job.total, self.message))
+            for area in context.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+            return {'RUNNING_MODAL'}
+
+        context.window_manager.event_timer_remove(self.timer)
+        context.workspace.status_text_set(None)
+        PS1_OT_render_parallel.job = None
+        if os.path.isfile(self.blend):
+            os.remove(self.blend)
+        if job.error:
+            self.report({'ERROR'}, "Render stopped at %d/%d frames: %s" % (job.done, job.total, job.error))
+            return {'CANCELLED'}
+        if job.cancelled:
+            self.report({'WARNING'}, "Render cancelled at %d/%d frames, run again to resume" % (job.done, job.total))
+            return {'CANCELLED'}
+        if job.errors:
+            print("PS1-ify: " + "\n".join(job.errors))
+            self.report({'ERROR'}, "%d frames failed, run again to retry them. %s" % (len(job.failed), job.errors[0].splitlines()[0]))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Rendered %d frames" % job.total)
+        return {'FINISHED'}
+
+class PS1_OT_render_multi(Operator):
+    bl_idname = 'ps1.render_multi'
+    bl_label = 'Render All Presets'
+    bl_description = 'Render once with the biggest chosen preset and write every chosen preset from compositor branches'
+
+    animation: BoolProperty(default=False)
+
+    def execute(self, context):
+        scene = context.scene
+        names = [name for name in scene.placeholder.multi_presets]
+        if not names:
+            self.report({'WARNING'}, "Pick at least one preset")
+            return {'CANCELLED'}
+
+        big = multi.biggest(names)
+        # the biggest preset is only for this render, the scene gets back the preset it
+        # had (or its own settings when it had none) afterwards
+        previous = scene.get(presets.ACTIVE)
+        try:
+            family = presets.get(previous)["family"] if previous else None
+        except ValueError:
+            previous = None
+        saved = None if previous else preset_snapshot(scene, big)
+        apply_preset(scene, big, family=presets.get(big)["family"])
+        try:
+            multi.build(scene, names, bpy.path.abspath(scene.placeholder.multi_output))
+            bpy.ops.render.render(animation=self.animation)
+        finally:
+            multi.remove_branches(scene.node_tree)
+            if previous:
+                apply_preset(scene, previous, family=family)
             else:
-                # Add the modifier only if "Wobble" node group doesn't exist
-                bpy.ops.object.modifier_add(type='NODES')
-                bpy.context.area.ui_type = 'GeometryNodeTree'
-                bpy.ops.node.new_geometry_node_group_assign()
-
-                geonodetree = bpy.context.object.modifiers[-1].node_group
-                geonodetree.name = "Wobble"
-
-                for node in geonodetree.nodes:
-                    geonodetree.nodes.remove(node)
-                    
-                geonode0 = geonodetree.nodes.new(type='ShaderNodeMath')
-                geonode0.location = (-400, 0)
-                
-                geonode0.operation = 'MULTIPLY'
-                geonode0.inputs[1].default_value = 1.000
-                
-                driver = geonode0.inputs[0].driver_add("default_value")
-                driver.driver.expression = 'frame/10'
-
-                geonode1 = geonodetree.nodes.new(type='ShaderNodeTexNoise')
-                geonode1.location = (-200, 0)
-                geonode1.noise_dimensions = '4D'
-
-                geonode1.inputs[2].default_value = 0.100
-                geonode1.inputs[3].default_value = 15.000
-                geonode1.inputs[4].default_value = 0.000
-
-                geonode2 = geonodetree.nodes.new(type='ShaderNodeMath')
-                geonode2.location = (0, 0)
-
-                geonode2.operation = 'MULTIPLY'
-                geonode2.inputs[1].default_value = 0.010
-                
-                geonode3 = geonodetree.nodes.new(type='ShaderNodeMath')
-                geonode3.location = (200, 0)
-                
-                geonode3.operation = 'SNAP'
-                geonode3.inputs[1].default_value = 0.02
-                
-                geonode4 = geonodetree.nodes.new(type='ShaderNodeVectorMath')
-                geonode4.location = (400, 0)
-                
-                geonode4.operation = 'SUBTRACT'
-                
-                geonode5 = geonodetree.nodes.new(type='ShaderNodeMath')
-                geonode5.location = (0, -175)
-                geonode5.operation = 'MULTIPLY'
-                
-                geonode5.inputs[0].default_value = 0.5
-
-                geonode6 = geonodetree.nodes.new(type='GeometryNodeSetPosition')
-                geonode6.location = (600, 150)
-
-                geonode7 = geonodetree.nodes.new(type='NodeGroupOutput')
-                geonode7.location = (800, 150)
-
-                geonode8 = geonodetree.nodes.new(type='NodeGroupInput')
-                geonode8.location = (-600, 150)
-                
-                speed = geonodetree.nodes.new(type='ShaderNodeValue')
-                speed.name = "Speed"
-                speed.location = (-600, 50)
-                
-                speed.outputs[0].default_value = context.scene.placeholder.speed
-                
-                strength = geonodetree.nodes.new(type='ShaderNodeValue')
-                strength.name = "Strength"
-                strength.location = (-600, -50)
-                
-                strength.outputs[0].default_value = context.scene.placeholder.strength
-                
-                grid_size = geonodetree.nodes.new(type='ShaderNodeValue')
-                grid_size.name = "Grid Size"
-                grid_size.location = (-600, -150)
-                
-                grid_size.outputs[0].default_value = context.scene.placeholder.grid_size
-
-                # connecting nodes
-                geonodetree.links.new(geonode0.outputs[0], geonode1.inputs[1])
-                geonodetree.links.new(geonode1.outputs[0], geonode2.inputs[0])
-                geonodetree.links.new(geonode2.outputs[0], geonode3.inputs[0])
-                geonodetree.links.new(geonode3.outputs[0], geonode4.inputs[0])
-                geonodetree.links.new(geonode4.outputs[0], geonode6.inputs[3])
-                geonodetree.links.new(geonode5.outputs[0], geonode4.inputs[1])
-                geonodetree.links.new(geonode6.outputs[0], geonode7.inputs[0])
-                geonodetree.links.new(geonode8.outputs[0], geonode6.inputs[0])
-                
-                geonodetree.links.new(speed.outputs[0], geonode0.inputs[1])
-                geonodetree.links.new(strength.outputs[0], geonode2.inputs[1])
-                geonodetree.links.new(strength.outputs[0], geonode5.inputs[0])
-                geonodetree.links.new(grid_size.outputs[0], geonode3.inputs[1])
-                
-                bpy.context.area.ui_type = 'VIEW_3D'
-
-            # Add the modifier to objects that don't have it and set default values
-            for obj in bpy.data.objects:
-                if obj.type == 'MESH' and not any(mod.type == 'NODES' and mod.node_group.name == "Wobble" for mod in obj.modifiers):
-                    bpy.context.view_layer.objects.active = obj
-                    bpy.ops.object.modifier_add(type='NODES')
-                    
-                    if geonodetree:
-                        obj.modifiers[-1].node_group = geonodetree
-                    else:
-                        print("Error: 'Wobble' node group not found.")
-
-class PS1_OT_op(Operator):
+                restore_snapshot(scene, saved)
+        self.report({'INFO'}, "Rendered %s, wrote %d presets" % (big, len(names)))
+        return {'FINISHED'}
+
+class PS1_OT_estimate_memory(Operator):
+    bl_idname = 'ps1.estimate_memory'
+    bl_label = 'Estimate Frame Memory'
+    bl_description = 'Add up the render passes, compositor buffers and textures a frame needs'
+
+    def execute(self, context):
+        self.report({'INFO'}, "Estimated frame memory: %s" % memory_text(memory.update(context.scene)))
+        return {'FINISHED'}
+
+class PS1_OT_clear_stats(Operator):
+    bl_idname = 'ps1.clear_stats'
+    bl_label = 'Clear Render Log'
+    bl_description = 'Delete the recorded render timings'
+
+    def execute(self, context):
+        stats.clear()
+        return {'FINISHED'}
+
+# the scene's own budget, else the one of the preset applied last
+def polygon_budget(scene):
+    if scene.placeholder.polygon_budget:
+        return scene.placeholder.polygon_budget
+    name = scene.get(presets.ACTIVE)
+    try:
+        return presets.get(name)["geometry"]["triangles"] if name else 0
+    except ValueError:
+        return 0
+
+class PS1_OT_decimate(Operator):
+    bl_idname = 'ps1.decimate'
+    bl_label = 'Polygon Budget'
+    bl_description = 'Share the triangle budget between the visible meshes by screen size and decimate them, reduced meshes are cached'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    action: EnumProperty(
+        items=[
+            ('APPLY', 'apply', 'decimate to the budget'),
+            ('RESTORE', 'restore', 'put the original meshes back'),
+        ]
+    )
+
+    def execute(self, context):
+        if self.action == 'RESTORE':
+            decimate.restore(context.scene.objects)
+            decimate.clear_cache()
+            return {'FINISHED'}
+        budget = polygon_budget(context.scene)
+        if not budget:
+            self.report({'WARNING'}, "No polygon budget, apply a preset that has one or set Triangles")
+            return {'CANCELLED'}
+        reduced, built = decimate.apply(context, budget)
+        self.report({'INFO'}, "Decimated %d objects (%d new meshes)" % (reduced, built))
+        return {'FINISHED'}
+
+# the scene's own shading, else the one of the preset applied last
+def material_shading(scene):
+    if scene.placeholder.material_shading != 'PRESET':
+        return scene.placeholder.material_shading
+    name = scene.get(presets.ACTIVE)
+    try:
+        return presets.get(name)["materials"]["shading"] if name else ""
+    except ValueError:
+        return ""
+
+class PS1_OT_simplify_materials(Operator):
+    bl_idname = 'ps1.simplify_materials'
+    bl_label = 'Simple Materials'
+    bl_description = 'Swap materials for shared unlit or vertex lit ones, materials that look the same share one'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    action: EnumProperty(
+        items=[
+            ('APPLY', 'apply', 'use simple materials'),
+            ('RESTORE', 'restore', 'put the original materials back'),
+        ]
+    )
+
+    def execute(self, context):
+        if self.action == 'RESTORE':
+            materials.restore(context.scene.objects)
+            materials.clear_cache()
+            return {'FINISHED'}
+        shading = material_shading(context.scene)
+        if not shading:
+            self.report({'WARNING'}, "No shading, apply a preset that has one or pick Unlit / Vertex Lit")
+            return {'CANCELLED'}
+        count, built = materials.apply(context.scene, shading)
+        self.report({'INFO'}, "Simplified materials on %d objects (%d new materials)" % (count, built))
+        return {'FINISHED'}
+
+class PS1_OT_bake_lighting(Operator):
+    bl_idname = 'ps1.bake_lighting'
+    bl_label = 'Bake Lighting'
+    bl_description = 'Light every vertex once and store it in the PS1 Light colour attribute, for the vertex lit materials'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    threads: IntProperty(name="Threads", default=0, min=0, description="Meshes lit at once, 0 uses every core")
+
+    def execute(self, context):
+        meshes, lights = lighting.bake(context.scene, self.threads)
+        self.report({'INFO'}, "Baked %d lights into %d meshes" % (lights, meshes))
+        return {'FINISHED'}
+
+# pure data api: scene in, render settings and compositor tree out
+# preset defaults to the one picked in the scene's dropdown, cpu=None looks for a cycles GPU
+def apply_preset(scene, preset=None, compositor=True, family="PS1", cpu=None):
+    if preset is None:
+        preset = scene.placeholder.dropdown_box if family == "PS1" else scene.placeholder.dropdown_xbox
+    compiled = presets.get(preset)
+    if scene.get(presets.ACTIVE) != preset:
+        scene[presets.ACTIVE] = preset
+    if compiled["cpu_writes"] and (cpu if cpu is not None else not devices.gpu_available()):
+        compiled = dict(compiled, writes=compiled["cpu_writes"])
+    if scene.placeholder.native_resolution and native.supported(scene, compiled["compositor"]):
+        compiled = native.setup(scene, compiled)
+    else:
+        native.teardown(scene)
+    textures.setup(scene, compiled["textures"] if scene.placeholder.console_textures else None)
+    hold.setup(scene, scene.placeholder.render_on)
+    if scene.placeholder.baked_lighting:
+        compiled = lighting.setup(scene, compiled)
+    else:
+        lighting.teardown(scene)
+    if scene.placeholder.memory_lean:
+        compiled = memory.adjust(scene, compiled)
+    else:
+        memory.restore_settings(scene)
+    
+    # settings first, the dither map is sized from the render resolution
+    presets.apply_settings(scene, compiled)
+    if compositor:
+        ps1_compositor.apply(scene, compiled["compositor"], dither=scene.placeholder.use_dither)
+    # passes are pruned against the finished compositor tree
+    if scene.placeholder.memory_lean:
+        memory.setup(scene, compiled)
+    else:
+        memory.teardown(scene)
+    return scene.node_tree
+
+# what apply_preset changes in a scene that has no preset applied yet
+def preset_snapshot(scene, name):
+    compiled = presets.get(name)
+    writes = compiled["cpu_writes"] or compiled["writes"]
+    return {
+        "settings": presets.snapshot(scene, dict(compiled, writes=writes)),
+        "use_nodes": scene.use_nodes,
+        "chain": scene.node_tree is not None and bool(ps1_compositor.find_chain(scene.node_tree)),
+    }
+
+def restore_snapshot(scene, saved):
+    native.teardown(scene)
+    textures.setup(scene, None)
+    lighting.teardown(scene)
+    memory.teardown(scene)
+    memory.restore_settings(scene)
+    presets.apply_settings(scene, saved["settings"])
+    # a chain that wasn't there before is left in the tree, passing the image through
+    if not saved["chain"] and scene.node_tree is not None:
+        for node in ps1_compositor.find_chain(scene.node_tree).values():
+            ps1_compositor.set_mute(node, True)
+    if scene.use_nodes != saved["use_nodes"]:
+        scene.use_nodes = saved["use_nodes"]
+    if presets.ACTIVE in scene:
+        del scene[presets.ACTIVE]
+
+def memory_text(found):
+    return "%.0f MB (render %.0f, compositor %.0f, textures %.0f)" % (
+        found["total"], found["render"], found["compositor"], found["textures"])
+
+def use_viewport_compositor(context):
+    # only available when called from a 3d viewport, not in background mode
+    space = getattr(context, "space_data", None)
+    if space is not None and space.type == 'VIEW_3D':
+        viewport.apply(context.area, space, context.scene.placeholder.viewport_preview)
+
+# both buttons do the same thing, only the dropdown they read differs
+class PresetOperatorBase:
+    bl_options = {'REGISTER', 'UNDO'}
+    family = "PS1"
+
+    @classmethod
+    def apply(cls, context):
+        use_viewport_compositor(context)
+        # every scene gets its own preset in one pass, the active one also gets the compositor chain
+        for scene in bpy.data.scenes:
+            apply_preset(scene, compositor=scene == context.scene, family=cls.family)
+
+    def report_memory(self, context):
+        self.report({'INFO'}, "Estimated frame memory: %s" % memory_text(memory.update(context.scene)))
+
+    def report_native(self, context):
+        scene = context.scene
+        if scene.placeholder.native_resolution and native.META not in scene:
+            reason = native.unsupported(scene, presets.get(scene[presets.ACTIVE])["compositor"])
+            self.report({'WARNING'}, "Rendering full size, Native Resolution is off: %s" % reason)
+
+class PS1_OT_op(PresetOperatorBase, Operator):
     bl_idname = 'ps1.op'
     bl_label = 'PS1-ify'
     bl_description = 'PS1'
-    bl_options = {'REGISTER', 'UNDO'}
+    family = "PS1"
  
     action: EnumProperty(
         items=[
@@ -289,157 +814,19 @@ class PS1_OT_op(Operator):
     def execute(self, context):
         if self.action == 'PS1':
             self.ps1_ify(context=context)
+            self.report_memory(context)
+            self.report_native(context)
         return {'FINISHED'}
 
-    # composite nodetree setup
-    @staticmethod
-    def ps1_ify(context):
-        bpy.context.space_data.shading.use_compositor = 'ALWAYS'
-        bpy.context.area.ui_type = 'CompositorNodeTree'
-        bpy.context.scene.use_nodes = True
-        bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT'
-        nodetree = bpy.context.scene.node_tree
-        
-        # clear default nodes
-        for node in nodetree.nodes:
-            nodetree.nodes.remove(node)
-        
-        # adding image
-        node1 = nodetree.nodes.new("CompositorNodeRLayers")
-        node1.location = (-100,0)
-
-        # adding scale 1
-        node2 = nodetree.nodes.new("CompositorNodeScale")
-        node2.location = (200,0)
-        node2.inputs[1].default_value = 0.500
-        node2.inputs[2].default_value = 0.500
-
-        # adding pixelate
-        node3 = nodetree.nodes.new("CompositorNodePixelate")
-        node3.location = (400,0)
-        
-        # adding posterize
-        node4 = nodetree.nodes.new("CompositorNodePosterize")
-        node4.inputs[1].default_value = 256.000
-        node4.location = (600,0)
-
-        # adding scale 2
-        node5 = nodetree.nodes.new("CompositorNodeScale")
-        node5.location = (800,0)
-        node5.inputs[1].default_value = 2.000
-        node5.inputs[2].default_value = 2.000
-
-        # adding compositor node
-        node6 = nodetree.nodes.new("CompositorNodeComposite")
-        node6.location = (1000,0)
-
-        # connecting nodes
-        nodetree.links.new(node1.outputs["Image"],node2.inputs[0])
-        nodetree.links.new(node2.outputs["Image"],node3.inputs[0])
-        nodetree.links.new(node3.outputs["Color"],node4.inputs[0])
-        nodetree.links.new(node4.outputs["Image"],node5.inputs[0])
-        nodetree.links.new(node5.outputs["Image"],node6.inputs[0])
-        
-        # return to 3d viewport
-        bpy.context.area.ui_type = 'VIEW_3D'
-        
-        # set render settings
-        for scene in bpy.data.scenes:
-            scene.render.resolution_percentage = 100
-            scene.render.use_border = False
-            scene.render.filter_size = 0.0
-            # eevee settings
-            scene.eevee.taa_render_samples = 1
-            scene.eevee.taa_samples = 1
-            scene.eevee.use_taa_reprojection = False
-            scene.eevee.use_gtao = True
-            scene.eevee.gtao_distance = 100
-            # scene.eevee.use_gtao_bounce = False
-            # scene.eevee.use_bloom = True
-            # scene.eevee.use_ssr = True
-            # scene.eevee.use_ssr_refraction = True
-            # shadow settings
-            # scene.eevee.shadow_cascade_size = '128'
-            # color management settings
-            scene.view_settings.view_transform = 'Standard'
-            
-            # render settings depending on dropdown selection
-            # i have no idea if this is optimized
-            # it works so dont touch!!
-            if scene.placeholder.dropdown_box == 'PS1_min':
-                scene.render.resolution_x = 256
-                scene.render.resolution_y = 224
-                node4.inputs[1].default_value = 32.000
-                scene.view_settings.look = 'Very Low Contrast'
-            elif scene.placeholder.dropdown_box == 'PS1_max':
-                scene.render.resolution_x = 640
-                scene.render.resolution_y = 480
-                node4.inputs[1].default_value = 32.000
-                scene.view_settings.look = 'Very Low Contrast'
-            elif scene.placeholder.dropdown_box == 'PS2':
-                scene.render.resolution_x = 720
-                scene.render.resolution_y = 480
-                node4.inputs[1].default_value = 256.000
-                # scene.eevee.shadow_cascade_size = '128'
-                scene.view_settings.look = 'Low Contrast'
-            elif scene.placeholder.dropdown_box == 'PSP':
-                scene.render.resolution_x = 480
-                scene.render.resolution_y = 272
-                node4.inputs[1].default_value = 64
-                scene.view_settings.look = 'Low Contrast'
-            elif scene.placeholder.dropdown_box == 'PS_Vita':
-                scene.render.resolution_x = 960
-                scene.render.resolution_y = 544
-                node4.inputs[1].default_value = 64
-                scene.view_settings.look = 'Medium Contrast'
-            elif scene.placeholder.dropdown_box == 'PS3':
-                scene.render.resolution_x = 1920
-                scene.render.resolution_y = 1080
-                scene.render.filter_size = 1.50
-                scene.eevee.taa_render_samples = 64
-                scene.eevee.taa_samples = 64
-                node4.inputs[1].default_value = 512.000 # you can still access the composite nodes here!! cool!!
-                # scene.eevee.shadow_cascade_size = '512'
-                scene.view_settings.look = 'Medium Contrast'
-            elif scene.placeholder.dropdown_box == 'PS4':
-                scene.render.resolution_x = 1920
-                scene.render.resolution_y = 1080
-                scene.render.filter_size = 1.50
-                scene.eevee.taa_render_samples = 128
-                scene.eevee.taa_samples = 128
-                node4.inputs[1].default_value = 1024.000
-                node2.mute = True
-                node3.mute = True
-                node5.mute = True
-                # scene.eevee.shadow_cascade_size = '1024'
-                scene.view_settings.look = 'Medium High Contrast'
-                scene.view_settings.view_transform = 'AgX'
-            elif scene.placeholder.dropdown_box == 'PS5':
-                scene.render.resolution_x = 3840
-                scene.render.resolution_y = 2160
-                scene.render.filter_size = 2
-                node4.inputs[1].default_value = 1024.000
-                
-                scene.render.engine = 'CYCLES'
-                scene.cycles.device = 'GPU'
-                scene.cycles.use_preview_denoising = True
-                scene.cycles.use_denoising = True
-                scene.cycles.preview_samples = 256
-                scene.cycles.samples = 256
-                
-                node2.mute = True
-                node3.mute = True
-                node4.mute = True
-                node5.mute = True
-                # scene.eevee.shadow_cascade_size = '1024'
-                scene.view_settings.look = 'Medium High Contrast'
-                scene.view_settings.view_transform = 'AgX'
-
-class XBOX_OT_op(Operator):
+    @classmethod
+    def ps1_ify(cls, context):
+        cls.apply(context)
+
+class XBOX_OT_op(PresetOperatorBase, Operator):
     bl_idname = 'xbox.op'
     bl_label = 'XBOX-ify'
     bl_description = 'XBOX'
-    bl_options = {'REGISTER', 'UNDO'}
+    family = "XBOX"
  
     action: EnumProperty(
         items=[
@@ -450,148 +837,81 @@ class XBOX_OT_op(Operator):
     def execute(self, context):
         if self.action == 'XBOX':
             self.xbox_ify(context=context)
+            self.report_memory(context)
+            self.report_native(context)
         return {'FINISHED'}
 
-    # composite nodetree setup
-    @staticmethod
-    def xbox_ify(context):
-        bpy.context.space_data.shading.use_compositor = 'ALWAYS'
-        bpy.context.area.ui_type = 'CompositorNodeTree'
-        bpy.context.scene.use_nodes = True
-        bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT'
-        nodetree = bpy.context.scene.node_tree
-        
-        # clear default nodes
-        for node in nodetree.nodes:
-            nodetree.nodes.remove(node)
-        
-        # adding image
-        node1 = nodetree.nodes.new("CompositorNodeRLayers")
-        node1.location = (-100,0)
-
-        # adding scale 1
-        node2 = nodetree.nodes.new("CompositorNodeScale")
-        node2.location = (200,0)
-        node2.inputs[1].default_value = 0.500
-        node2.inputs[2].default_value = 0.500
-
-        # adding pixelate
-        node3 = nodetree.nodes.new("CompositorNodePixelate")
-        node3.location = (400,0)
-        
-        # adding posterize
-        node4 = nodetree.nodes.new("CompositorNodePosterize")
-        node4.inputs[1].default_value = 256.000
-        node4.location = (600,0)
-
-        # adding scale 2
-        node5 = nodetree.nodes.new("CompositorNodeScale")
-        node5.location = (800,0)
-        node5.inputs[1].default_value = 2.000
-        node5.inputs[2].default_value = 2.000
-
-        # adding compositor node
-        node6 = nodetree.nodes.new("CompositorNodeComposite")
-        node6.location = (1000,0)
-
-        # connecting nodes
-        nodetree.links.new(node1.outputs["Image"],node2.inputs[0])
-        nodetree.links.new(node2.outputs["Image"],node3.inputs[0])
-        nodetree.links.new(node3.outputs["Color"],node4.inputs[0])
-        nodetree.links.new(node4.outputs["Image"],node5.inputs[0])
-        nodetree.links.new(node5.outputs["Image"],node6.inputs[0])
-        
-        # return to 3d viewport
-        bpy.context.area.ui_type = 'VIEW_3D'
-        
-        # set render settings
-        for scene in bpy.data.scenes:
-            scene.render.resolution_percentage = 100
-            scene.render.use_border = False
-            scene.render.filter_size = 0.0
-            # eevee settings
-            scene.eevee.taa_render_samples = 1
-            scene.eevee.taa_samples = 1
-            scene.eevee.use_taa_reprojection = False
-            scene.eevee.use_gtao = True
-            scene.eevee.gtao_distance = 100
-            # scene.eevee.use_gtao_bounce = False
-            # scene.eevee.use_bloom = True
-            # scene.eevee.use_ssr = True
-            # scene.eevee.use_ssr_refraction = True
-            # shadow settings
-            # scene.eevee.shadow_cascade_size = '128'
-            # color management settings
-            scene.view_settings.view_transform = 'Standard'
-            
-            if scene.placeholder.dropdown_xbox == 'Xbox':
-                scene.render.resolution_x = 640
-                scene.render.resolution_y = 480
-                node4.inputs[1].default_value = 32.000
-                scene.view_settings.look = 'Very Low Contrast'
-            elif scene.placeholder.dropdown_xbox == 'Xbox_360':
-                scene.render.resolution_x = 1280
-                scene.render.resolution_y = 720
-                node4.inputs[1].default_value = 128
-                scene.view_settings.look = 'Low Contrast'
-            elif scene.placeholder.dropdown_xbox == 'Xbox_One':
-                scene.render.resolution_x = 1920
-                scene.render.resolution_y = 1080
-                node4.inputs[1].default_value = 256
-                
-                scene.view_settings.view_transform = 'AgX'
-                scene.view_settings.look = 'AgX - Medium Low Contrast'
-            elif scene.placeholder.dropdown_xbox == 'Xbox_Series_S':
-                scene.render.resolution_x = 1920
-                scene.render.resolution_y = 1080
-                scene.render.engine = 'CYCLES'
-                scene.cycles.device = 'GPU'
-                scene.cycles.preview_samples = 64
-                scene.cycles.samples = 128
-                scene.cycles.use_preview_denoising = True
-                scene.cycles.use_denoising = True
-                
-                node2.mute = True
-                node3.mute = True
-                node4.mute = True
-                node5.mute = True
-                
-                scene.view_settings.view_transform = 'AgX'
-                scene.view_settings.look = 'AgX - Medium High Contrast'
-            elif scene.placeholder.dropdown_xbox == 'Xbox_Series_X':
-                scene.render.resolution_x = 3840
-                scene.render.resolution_y = 2160
-                scene.render.engine = 'CYCLES'
-                scene.cycles.device = 'GPU'
-                scene.cycles.preview_samples = 256
-                scene.cycles.samples = 256
-                scene.cycles.use_preview_denoising = True
-                scene.cycles.use_denoising = True
-  
-                node2.mute = True
-                node3.mute = True
-                node4.mute = True
-                node5.mute = True
-                
-                scene.view_settings.view_transform = 'AgX'
-                scene.view_settings.look = 'AgX - Punchy'
+    @classmethod
+    def xbox_ify(cls, context):
+        cls.apply(context)
 
  
 def register():
+    # pick up user preset files, then rebuild the dropdowns so they list them too
+    presets.load()
+    PS1Properties.__annotations__["dropdown_box"] = preset_dropdown("PS1", "Presets", "PS1_max")
+    PS1Properties.__annotations__["dropdown_xbox"] = preset_dropdown("XBOX", "Presets2", "Xbox")
+    PS1Properties.__annotations__["multi_presets"] = preset_flags()
+    
     bpy.utils.register_class(PS1_PT_Panel_Main)
     bpy.utils.register_class(PS1_PT_Panel_Wobble)
+    bpy.utils.register_class(PS1_PT_Panel_Geometry)
+    bpy.utils.register_class(PS1_PT_Panel_Materials)
+    bpy.utils.register_class(PS1_PT_Panel_Stats)
+    bpy.utils.register_class(PS1_PT_Panel_Multi)
+    bpy.utils.register_class(PS1_PT_Panel_Farm)
     bpy.utils.register_class(PS1Properties)
     bpy.utils.register_class(WOBBLE_OT_op)
+    bpy.utils.register_class(WOBBLE_OT_bake)
     bpy.utils.register_class(PS1_OT_op)
     bpy.utils.register_class(XBOX_OT_op)
+    bpy.utils.register_class(PS1_OT_render_parallel)
+    bpy.utils.register_class(PS1_OT_decimate)
+    bpy.utils.register_class(PS1_OT_simplify_materials)
+    bpy.utils.register_class(PS1_OT_bake_lighting)
+    bpy.utils.register_class(PS1_OT_clear_stats)
+    bpy.utils.register_class(PS1_OT_estimate_memory)
+    bpy.utils.register_class(PS1_OT_render_multi)
     
     Scene.placeholder = PointerProperty(type=PS1Properties)
+    wobble.register()
+    wobble_bake.register()
+    native.register()
+    viewport.register()
+    textures.register()
+    stats.register()
+    indexed.register()
+    hold.register()
  
 def unregister():
+    if PS1_OT_render_parallel.job is not None:
+        PS1_OT_render_parallel.job.cancel()
+        PS1_OT_render_parallel.job = None
+    hold.unregister()
+    indexed.unregister()
+    stats.unregister()
+    textures.unregister()
+    viewport.unregister()
+    native.unregister()
+    wobble_bake.unregister()
+    wobble.unregister()
+    bpy.utils.unregister_class(PS1_OT_render_multi)
+    bpy.utils.unregister_class(PS1_OT_estimate_memory)
+    bpy.utils.unregister_class(PS1_OT_clear_stats)
+    bpy.utils.unregister_class(PS1_OT_bake_lighting)
+    bpy.utils.unregister_class(PS1_OT_simplify_materials)
+    bpy.utils.unregister_class(PS1_OT_decimate)
+    bpy.utils.unregister_class(PS1_OT_render_parallel)
     bpy.utils.unregister_class(XBOX_OT_op)
     bpy.utils.unregister_class(PS1_OT_op)
+    bpy.utils.unregister_class(WOBBLE_OT_bake)
     bpy.utils.unregister_class(WOBBLE_OT_op)
     bpy.utils.unregister_class(PS1Properties)
+    bpy.utils.unregister_class(PS1_PT_Panel_Farm)
+    bpy.utils.unregister_class(PS1_PT_Panel_Multi)
+    bpy.utils.unregister_class(PS1_PT_Panel_Stats)
+    bpy.utils.unregister_class(PS1_PT_Panel_Materials)
+    bpy.utils.unregister_class(PS1_PT_Panel_Geometry)
     bpy.utils.unregister_class(PS1_PT_Panel_Wobble)
     bpy.utils.unregister_class(PS1_PT_Panel_Main)
     
@@ -0,0 +1,161 @@
+# render timings
+# render and compositor handlers time every rendered frame and keep the peak memory
+# blender reports, with the preset that was applied. entries go into a rolling JSON
+# lines log in blender's config folder, the Render Stats panel summarizes them.
+import json
+import os
+import re
+import time
+from collections import deque
+
+import bpy
+from bpy.app.handlers import persistent
+
+from ps1_ify import presets
+
+LOG_NAME = "render_log.jsonl"
+
+# entries kept, the file is trimmed back to this once it has twice as many
+MAX_ENTRIES = 5000
+
+# "Mem:41.82M (Peak 51.12M)" in the eevee/cycles stats line
+PEAK = re.compile(r"Peak:?\s*([\d.]+)([KMG])")
+UNITS = {"K": 1.0 / 1024, "M": 1.0, "G": 1024.0}
+
+# the frame being rendered
+_current = {}
+
+# recent entries, filled from the log on first use
+_entries = deque(maxlen=MAX_ENTRIES)
+_loaded = False
+_lines = 0
+
+
+def log_path():
+    return os.path.join(bpy.utils.user_resource('CONFIG', path="ps1_ify", create=True), LOG_NAME)
+
+def load():
+    global _loaded, _lines
+    _loaded = True
+    _lines = 0
+    filepath = log_path()
+    if not os.path.isfile(filepath):
+        return
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            _lines += 1
+            try:
+                _entries.append(json.loads(line))
+            except ValueError:
+                continue
+
+def entries():
+    if not _loaded:
+        load()
+    return _entries
+
+def write(entry):
+    global _lines
+    entries().append(entry)
+    filepath = log_path()
+    with open(filepath, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    _lines += 1
+    if _lines > 2 * MAX_ENTRIES:
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in _entries)
+        _lines = len(_entries)
+
+def clear():
+    global _lines
+    _entries.clear()
+    _lines = 0
+    if os.path.isfile(log_path()):
+        os.remove(log_path())
+
+# per preset: frames, mean and worst frame time, mean compositor time, peak memory
+def summary(limit=None):
+    found = {}
+    recent = list(entries())[-limit:] if limit else entries()
+    for entry in recent:
+        preset = entry.get("preset") or "-"
+        row = found.setdefault(preset, {"frames": 0, "total": 0.0, "worst": 0.0, "composite": 0.0, "peak_mb": 0.0})
+        row["frames"] += 1
+        row["total"] += entry["total_s"]
+        row["worst"] = max(row["worst"], entry["total_s"])
+        row["composite"] += entry["composite_s"]
+        row["peak_mb"] = max(row["peak_mb"], entry.get("peak_mb") or 0.0)
+    for row in found.values():
+        row["mean"] = row["total"] / row["frames"]
+        row["composite"] = row["composite"] / row["frames"]
+    return found
+
+@persistent
+def on_render_pre(scene, *args):
+    _current.clear()
+    _current.update(start=time.perf_counter(), composite=0.0, peak_mb=None)
+
+@persistent
+def on_composite_pre(scene, *args):
+    _current["composite_start"] = time.perf_counter()
+
+@persistent
+def on_composite_post(scene, *args):
+    start = _current.pop("composite_start", None)
+    if start is not None:
+        _current["composite"] = _current.get("composite", 0.0) + time.perf_counter() - start
+
+@persistent
+def on_render_stats(text, *args):
+    match = PEAK.search(text)
+    if match and _current:
+        _current["peak_mb"] = max(_current["peak_mb"] or 0.0, float(match.group(1)) * UNITS[match.group(2)])
+
+@persistent
+def on_render_post(scene, *args):
+    if "start" not in _current:
+        return
+    total = time.perf_counter() - _current["start"]
+    render = scene.render
+    entry = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "file": os.path.basename(bpy.data.filepath),
+        "scene": scene.name,
+        "frame": scene.frame_current,
+        "preset": scene.get(presets.ACTIVE),
+        "engine": render.engine,
+        "resolution": [render.resolution_x, render.resolution_y, render.resolution_percentage],
+        "total_s": round(total, 4),
+        "render_s": round(total - _current["composite"], 4),
+        "composite_s": round(_current["composite"], 4),
+        "peak_mb": _current["peak_mb"],
+    }
+    _current.clear()
+    try:
+        write(entry)
+    except OSError as e:
+        print("PS1-ify: could not write the render log: %s" % e)
+
+@persistent
+def on_render_cancel(*args):
+    _current.clear()
+
+HANDLERS = (
+    (bpy.app.handlers.render_pre, on_render_pre),
+    (bpy.app.handlers.composite_pre, on_composite_pre),
+    (bpy.app.handlers.composite_post, on_composite_post),
+    (bpy.app.handlers.render_stats, on_render_stats),
+    (bpy.app.handlers.render_post, on_render_post),
+    (bpy.app.handlers.render_cancel, on_render_cancel),
+)
+
+def register():
+    for handlers, function in HANDLERS:
+        if function not in handlers:
+            handlers.append(function)
+
+def unregister():
+    for handlers, function in HANDLERS:
+        if function in handlers:
+            handlers.remove(function)
+    _current.clear()
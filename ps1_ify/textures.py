@@ -0,0 +1,147 @@
+# console texture sizes
+# presets can give a texture budget (e.g. 256 for PS1). while rendering, every image
+# texture bigger than that is swapped for a nearest-neighbour downsampled copy and
+# swapped back afterwards. sizes come from the file headers and images are swapped one
+# at a time, so the full size textures are never loaded. the copies are cached on disk,
+# keyed by the source file's path, mtime and size, so each texture is only shrunk once.
+import hashlib
+import math
+import os
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from ps1_ify import image
+
+# scene custom property with the preset's "textures" block while console textures are on
+META = "ps1_textures"
+
+# image custom property holding the original filepath while the small copy is in use
+SOURCE = "ps1_source"
+
+# (path, mtime, size) -> (width, height, channels, is_float) from the file header
+_headers = {}
+
+
+def cache_dir():
+    return bpy.utils.user_resource('DATAFILES', path=os.path.join("ps1_ify", "textures"), create=True)
+
+def setup(scene, textures):
+    if textures and textures["budget"]:
+        value = {"budget": textures["budget"], "rgb555": textures["rgb555"]}
+        if dict(scene.get(META, {})) != value:
+            scene[META] = value
+    elif META in scene:
+        del scene[META]
+
+def file_key(filepath):
+    stat = os.stat(filepath)
+    return filepath, stat.st_mtime_ns, stat.st_size
+
+def header(filepath):
+    key = file_key(filepath)
+    info = _headers.get(key)
+    if info is None:
+        info = _headers[key] = image.image_info(filepath)
+    return info
+
+def source_path(img):
+    return bpy.path.abspath(img.filepath, library=img.library)
+
+# (image, source file, size) for images over the budget. img.size would load the
+# whole image, the size is read from the file header instead
+def candidates(budget):
+    for img in bpy.data.images:
+        if img.source != 'FILE' or img.packed_file is not None or SOURCE in img or img.users == 0:
+            continue
+        source = source_path(img)
+        if not os.path.isfile(source):
+            continue
+        try:
+            size = header(source)[:2]
+        except (OSError, RuntimeError, ValueError) as e:
+            print("PS1-ify: keeping %s at full size: %s" % (img.name, e))
+            continue
+        if max(size) > budget:
+            yield img, source, size
+
+# power of two steps keep the texel grid of tiling textures intact
+def factor_for(size, budget):
+    return 2 ** math.ceil(math.log2(max(size) / budget))
+
+def shrink(source, target, factor, rgb555):
+    pixels = image.read_image(source)
+    pixels = pixels[::factor, ::factor]
+    if rgb555 and pixels.dtype == np.uint8 and pixels.ndim == 3:
+        pixels = image.quantize_rgb555(pixels)
+    image.write_image(target, np.ascontiguousarray(pixels))
+
+# the cache is keyed on the file's path, mtime and size: no need to read the whole
+# file, which every farm worker would otherwise do for every texture
+def cached_copy(source, size, budget, rgb555):
+    factor = factor_for(size, budget)
+    extension = os.path.splitext(source)[1].lower()
+    if extension not in image.EXTENSIONS:
+        extension = ".png"
+    digest = hashlib.sha1(("%s|%d|%d" % file_key(source)).encode("utf-8")).hexdigest()
+    name = "%s_%d%s%s" % (digest, factor, "_555" if rgb555 else "", extension)
+    target = os.path.join(cache_dir(), name)
+    if not os.path.isfile(target):
+        # written under a temporary name, other workers never see half a file
+        partial = os.path.join(cache_dir(), "%d_%s" % (os.getpid(), name))
+        shrink(source, partial, factor, rgb555)
+        os.replace(partial, target)
+    return target
+
+def swap_in(scene):
+    textures = scene.get(META)
+    if textures is None:
+        return 0
+    swapped = 0
+    # one image at a time, only one full size texture is ever in memory for shrinking
+    for img, source, size in candidates(textures["budget"]):
+        try:
+            target = cached_copy(source, size, textures["budget"], textures["rgb555"])
+        except (OSError, RuntimeError, ValueError) as e:
+            print("PS1-ify: keeping %s at full size: %s" % (img.name, e))
+            continue
+        img[SOURCE] = img.filepath
+        img.filepath = target
+        swapped += 1
+    return swapped
+
+def restore():
+    for img in bpy.data.images:
+        if SOURCE in img:
+            img.filepath = img[SOURCE]
+            del img[SOURCE]
+
+@persistent
+def on_render_init(scene, *args):
+    swapped = swap_in(scene)
+    if swapped:
+        print("PS1-ify: rendering %d textures at console size" % swapped)
+
+@persistent
+def on_render_done(*args):
+    restore()
+
+HANDLERS = (
+    (bpy.app.handlers.render_init, on_render_init),
+    (bpy.app.handlers.render_complete, on_render_done),
+    (bpy.app.handlers.render_cancel, on_render_done),
+    # a crash mid-render saves nothing, but an autosave might have the swapped paths
+    (bpy.app.handlers.load_post, on_render_done),
+)
+
+def register():
+    for handlers, function in HANDLERS:
+        if function not in handlers:
+            handlers.append(function)
+
+def unregister():
+    for handlers, function in HANDLERS:
+        if function in handlers:
+            handlers.remove(function)
+    restore()
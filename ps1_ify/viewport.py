@@ -0,0 +1,79 @@
+# viewport preview
+# the viewport compositor runs the whole PS1 chain on every redraw. the preview mode
+# picks when it runs at all (always, camera view only, never) and a timer turns it
+# off in viewports that are being orbited/panned/zoomed, back on once they settle.
+import time
+
+import bpy
+
+# seconds between polls, and how long a view has to stay still to get the compositor back
+POLL = 0.1
+IDLE_POLL = 0.5
+SETTLE = 0.3
+
+# area pointer -> compositor mode to restore when the view settles
+_paused = {}
+
+# area pointer -> (view matrix, last time it changed)
+_views = {}
+
+
+def viewports():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                yield area, area.spaces.active
+
+def set_mode(space, mode):
+    if space.shading.use_compositor != mode:
+        space.shading.use_compositor = mode
+
+# the viewport a preset was applied from gets the preview mode right away
+def apply(area, space, mode):
+    _paused.pop(area.as_pointer(), None)
+    set_mode(space, mode)
+
+def resume_all():
+    for area, space in viewports():
+        mode = _paused.pop(area.as_pointer(), None)
+        if mode is not None:
+            set_mode(space, mode)
+    _paused.clear()
+    _views.clear()
+
+def poll():
+    scene = bpy.context.scene
+    if scene is None or not hasattr(scene, "placeholder") or not scene.placeholder.pause_navigation:
+        if _paused:
+            resume_all()
+        return IDLE_POLL
+
+    now = time.monotonic()
+    seen = set()
+    for area, space in viewports():
+        key = area.as_pointer()
+        seen.add(key)
+        matrix = space.region_3d.view_matrix.copy()
+        previous = _views.get(key)
+        if previous is None or previous[0] != matrix:
+            _views[key] = (matrix, now)
+            if previous is not None and key not in _paused and space.shading.use_compositor != 'DISABLED':
+                _paused[key] = space.shading.use_compositor
+                set_mode(space, 'DISABLED')
+        elif key in _paused and now - previous[1] >= SETTLE:
+            set_mode(space, _paused.pop(key))
+
+    # forget closed areas
+    for key in set(_views) - seen:
+        del _views[key]
+        _paused.pop(key, None)
+    return POLL
+
+def register():
+    if not bpy.app.background and not bpy.app.timers.is_registered(poll):
+        bpy.app.timers.register(poll, first_interval=IDLE_POLL, persistent=True)
+
+def unregister():
+    if bpy.app.timers.is_registered(poll):
+        bpy.app.timers.unregister(poll)
+    resume_all()
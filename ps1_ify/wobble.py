@@ -0,0 +1,488 @@
+# wobble node group helpers
+# every mesh shares the one "Wobble" geometry node group, so its value nodes are
+# looked up once and cached. the cache is dropped on file load and undo/redo since
+# those free and reallocate the datablocks.
+import math
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy_extras.object_utils import world_to_camera_view
+from mathutils import Vector
+
+GROUP_NAME = "Wobble"
+
+# PS1Properties attribute -> value node in the group
+SETTINGS = {
+    "speed": "Speed",
+    "strength": "Strength",
+    "grid_size": "Grid Size",
+    "render_on": "Frame Step",
+    "lod_distance": "LOD Distance",
+}
+
+# value node with half the camera's diagonal field of view, 0 turns the frustum test off
+FRUSTUM_ANGLE = "Frustum Angle"
+
+_cache = {}
+
+
+def alive(struct):
+    try:
+        struct.name
+    except ReferenceError:
+        return False
+    return True
+
+def get_group():
+    group = _cache.get(GROUP_NAME)
+    if group is not None and alive(group):
+        return group
+    _cache.clear()
+    group = bpy.data.node_groups.get(GROUP_NAME)
+    if group is None or group.bl_idname != 'GeometryNodeTree':
+        return None
+    _cache[GROUP_NAME] = group
+    return group
+
+def get_value_node(name):
+    node = _cache.get(name)
+    if node is not None and alive(node):
+        return node
+    group = get_group()
+    if group is None:
+        return None
+    node = group.nodes.get(name)
+    if node is not None:
+        _cache[name] = node
+    return node
+
+# writes the slider values into the shared group, only the ones that changed
+def update_settings(props):
+    for attr, name in SETTINGS.items():
+        node = get_value_node(name)
+        if node is None:
+            continue
+        value = getattr(props, attr)
+        if abs(node.outputs[0].default_value - value) > 1e-6:
+            node.outputs[0].default_value = value
+
+# the group layout version, older groups are rebuilt in place (modifiers keep pointing at them)
+VERSION = 3
+VERSION_KEY = "ps1_wobble_version"
+
+# rendering on N's, the noise time only moves every step frames
+def set_frame_step(step):
+    node = get_value_node(SETTINGS["render_on"])
+    if node is not None and node.outputs[0].default_value != step:
+        node.outputs[0].default_value = step
+
+def math_node(nodetree, operation, location, value=None):
+    node = nodetree.nodes.new(type='ShaderNodeMath')
+    node.operation = operation
+    node.location = location
+    if value is not None:
+        node.inputs[1].default_value = value
+    return node
+
+def value_node(nodetree, name, value, location):
+    node = nodetree.nodes.new(type='ShaderNodeValue')
+    node.name = name
+    node.label = name
+    node.location = location
+    node.outputs[0].default_value = value
+    return node
+
+# geometry nodetree setup, data api only so it needs no editor or active object
+def build_group(props):
+    geonodetree = bpy.data.node_groups.new(GROUP_NAME, 'GeometryNodeTree')
+    geonodetree.is_modifier = True
+    geonodetree.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    geonodetree.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    fill_group(geonodetree, props)
+    _cache.clear()
+    _cache[GROUP_NAME] = geonodetree
+    return geonodetree
+
+def fill_group(geonodetree, props):
+    nodes = geonodetree.nodes
+    links = geonodetree.links
+
+    # time: floor(frame / step) * step / 10, from the Scene Time node instead of a
+    # python driver so playback doesn't go through the driver system every frame
+    scene_time = nodes.new(type='GeometryNodeInputSceneTime')
+    scene_time.location = (-1400, 0)
+    step_divide = math_node(geonodetree, 'DIVIDE', (-1200, 0))
+    step_floor = math_node(geonodetree, 'FLOOR', (-1000, 0))
+    step_multiply = math_node(geonodetree, 'MULTIPLY', (-800, 0))
+    time_scale = math_node(geonodetree, 'MULTIPLY', (-600, 0), 0.1)
+
+    geonode0 = math_node(geonodetree, 'MULTIPLY', (-400, 0), 1.0)
+
+    geonode1 = nodes.new(type='ShaderNodeTexNoise')
+    geonode1.location = (-200, 0)
+    geonode1.noise_dimensions = '4D'
+
+    geonode1.inputs[2].default_value = 0.100
+    geonode1.inputs[3].default_value = 15.000
+    geonode1.inputs[4].default_value = 0.000
+
+    geonode2 = math_node(geonodetree, 'MULTIPLY', (0, 0), 0.010)
+    geonode3 = math_node(geonodetree, 'SNAP', (200, 0), 0.02)
+
+    geonode4 = nodes.new(type='ShaderNodeVectorMath')
+    geonode4.location = (400, 0)
+    geonode4.operation = 'SUBTRACT'
+
+    geonode5 = math_node(geonodetree, 'MULTIPLY', (0, -175))
+    geonode5.inputs[0].default_value = 0.5
+
+    geonode6 = nodes.new(type='GeometryNodeSetPosition')
+    geonode6.location = (600, 150)
+
+    geonode7 = nodes.new(type='NodeGroupOutput')
+    geonode7.location = (1000, 150)
+
+    geonode8 = nodes.new(type='NodeGroupInput')
+    geonode8.location = (-600, 300)
+
+    speed = value_node(geonodetree, SETTINGS["speed"], props.speed, (-600, -150))
+    strength = value_node(geonodetree, SETTINGS["strength"], props.strength, (-600, -250))
+    grid_size = value_node(geonodetree, SETTINGS["grid_size"], props.grid_size, (-600, -350))
+    frame_step = value_node(geonodetree, SETTINGS["render_on"], props.render_on, (-1400, -150))
+    lod_distance = value_node(geonodetree, SETTINGS["lod_distance"], props.lod_distance, (0, 500))
+    frustum_angle = value_node(geonodetree, FRUSTUM_ANGLE, 0.0, (0, 1100))
+
+    # distance LOD: objects further from the active camera than LOD Distance skip the
+    # whole noise branch, the switch only evaluates the side it picks
+    self_object = nodes.new(type='GeometryNodeSelfObject')
+    self_object.location = (-400, 700)
+    self_info = nodes.new(type='GeometryNodeObjectInfo')
+    self_info.location = (-200, 700)
+    camera = nodes.new(type='GeometryNodeInputActiveCamera')
+    camera.location = (-400, 550)
+    camera_info = nodes.new(type='GeometryNodeObjectInfo')
+    camera_info.location = (-200, 550)
+    distance = nodes.new(type='ShaderNodeVectorMath')
+    distance.operation = 'DISTANCE'
+    distance.location = (0, 650)
+    near = math_node(geonodetree, 'LESS_THAN', (200, 650))
+    # LOD Distance 0 turns the LOD off
+    lod_off = math_node(geonodetree, 'LESS_THAN', (200, 500), 0.0001)
+    near_enough = math_node(geonodetree, 'MAXIMUM', (400, 600))
+
+    # frustum test: the bounding sphere against a cone around the camera's view
+    # direction, a bit loose in the frame corners. the object and camera transforms
+    # come from Object Info, so nothing needs updating on frame change
+    bounds = nodes.new(type='GeometryNodeBoundBox')
+    bounds.location = (-600, 1000)
+    scaled_min = nodes.new(type='ShaderNodeVectorMath')
+    scaled_min.operation = 'MULTIPLY'
+    scaled_min.location = (-400, 1050)
+    scaled_max = nodes.new(type='ShaderNodeVectorMath')
+    scaled_max.operation = 'MULTIPLY'
+    scaled_max.location = (-400, 950)
+    box_sum = nodes.new(type='ShaderNodeVectorMath')
+    box_sum.operation = 'ADD'
+    box_sum.location = (-200, 1050)
+    box_center = nodes.new(type='ShaderNodeVectorMath')
+    box_center.operation = 'SCALE'
+    box_center.inputs["Scale"].default_value = 0.5
+    box_center.location = (0, 1050)
+    rotate_center = nodes.new(type='ShaderNodeVectorRotate')
+    rotate_center.rotation_type = 'EULER_XYZ'
+    rotate_center.location = (200, 1050)
+    world_center = nodes.new(type='ShaderNodeVectorMath')
+    world_center.operation = 'ADD'
+    world_center.location = (400, 1050)
+    box_size = nodes.new(type='ShaderNodeVectorMath')
+    box_size.operation = 'DISTANCE'
+    box_size.location = (-200, 900)
+    radius = math_node(geonodetree, 'MULTIPLY', (0, 900), 0.5)
+    to_center = nodes.new(type='ShaderNodeVectorMath')
+    to_center.operation = 'SUBTRACT'
+    to_center.location = (600, 1050)
+    to_camera_space = nodes.new(type='ShaderNodeVectorRotate')
+    to_camera_space.rotation_type = 'EULER_XYZ'
+    to_camera_space.invert = True
+    to_camera_space.location = (800, 1050)
+    center_distance = nodes.new(type='ShaderNodeVectorMath')
+    center_distance.operation = 'LENGTH'
+    center_distance.location = (800, 900)
+    split = nodes.new(type='ShaderNodeSeparateXYZ')
+    split.location = (1000, 1050)
+    # cameras look down their local -Z
+    depth = math_node(geonodetree, 'MULTIPLY', (1200, 1050), -1.0)
+    view_cos = math_node(geonodetree, 'DIVIDE', (1400, 1050))
+    view_angle = math_node(geonodetree, 'ARCCOSINE', (1600, 1050))
+    sphere_sin = math_node(geonodetree, 'DIVIDE', (1000, 900))
+    sphere_angle = math_node(geonodetree, 'ARCSINE', (1200, 900))
+    edge_angle = math_node(geonodetree, 'SUBTRACT', (1800, 1000))
+    in_view = math_node(geonodetree, 'LESS_THAN', (2000, 1000))
+    # the camera inside the bounding sphere always sees the object
+    inside = math_node(geonodetree, 'LESS_THAN', (1000, 750))
+    # Frustum Angle 0 turns the test off
+    frustum_off = math_node(geonodetree, 'LESS_THAN', (2000, 1150), 0.0001)
+    visible = math_node(geonodetree, 'MAXIMUM', (2200, 1000))
+    visible_or_off = math_node(geonodetree, 'MAXIMUM', (2400, 1000))
+    use_wobble = math_node(geonodetree, 'MINIMUM', (2600, 700))
+    switch = nodes.new(type='GeometryNodeSwitch')
+    switch.input_type = 'GEOMETRY'
+    switch.location = (800, 150)
+
+    # connecting nodes
+    links.new(scene_time.outputs["Frame"], step_divide.inputs[0])
+    links.new(frame_step.outputs[0], step_divide.inputs[1])
+    links.new(step_divide.outputs[0], step_floor.inputs[0])
+    links.new(step_floor.outputs[0], step_multiply.inputs[0])
+    links.new(frame_step.outputs[0], step_multiply.inputs[1])
+    links.new(step_multiply.outputs[0], time_scale.inputs[0])
+    links.new(time_scale.outputs[0], geonode0.inputs[0])
+
+    links.new(geonode0.outputs[0], geonode1.inputs[1])
+    links.new(geonode1.outputs[0], geonode2.inputs[0])
+    links.new(geonode2.outputs[0], geonode3.inputs[0])
+    links.new(geonode3.outputs[0], geonode4.inputs[0])
+    links.new(geonode4.outputs[0], geonode6.inputs[3])
+    links.new(geonode5.outputs[0], geonode4.inputs[1])
+    links.new(geonode8.outputs[0], geonode6.inputs[0])
+
+    links.new(speed.outputs[0], geonode0.inputs[1])
+    links.new(strength.outputs[0], geonode2.inputs[1])
+    links.new(strength.outputs[0], geonode5.inputs[0])
+    links.new(grid_size.outputs[0], geonode3.inputs[1])
+
+    links.new(self_object.outputs[0], self_info.inputs[0])
+    links.new(camera.outputs[0], camera_info.inputs[0])
+    links.new(self_info.outputs["Location"], distance.inputs[0])
+    links.new(camera_info.outputs["Location"], distance.inputs[1])
+    links.new(distance.outputs["Value"], near.inputs[0])
+    links.new(lod_distance.outputs[0], near.inputs[1])
+    links.new(lod_distance.outputs[0], lod_off.inputs[0])
+    links.new(near.outputs[0], near_enough.inputs[0])
+    links.new(lod_off.outputs[0], near_enough.inputs[1])
+
+    links.new(geonode8.outputs[0], bounds.inputs["Geometry"])
+    links.new(bounds.outputs["Min"], scaled_min.inputs[0])
+    links.new(self_info.outputs["Scale"], scaled_min.inputs[1])
+    links.new(bounds.outputs["Max"], scaled_max.inputs[0])
+    links.new(self_info.outputs["Scale"], scaled_max.inputs[1])
+    links.new(scaled_min.outputs["Vector"], box_sum.inputs[0])
+    links.new(scaled_max.outputs["Vector"], box_sum.inputs[1])
+    links.new(box_sum.outputs["Vector"], box_center.inputs[0])
+    links.new(box_center.outputs["Vector"], rotate_center.inputs["Vector"])
+    links.new(self_info.outputs["Rotation"], rotate_center.inputs["Rotation"])
+    links.new(rotate_center.outputs["Vector"], world_center.inputs[0])
+    links.new(self_info.outputs["Location"], world_center.inputs[1])
+    links.new(scaled_min.outputs["Vector"], box_size.inputs[0])
+    links.new(scaled_max.outputs["Vector"], box_size.inputs[1])
+    links.new(box_size.outputs["Value"], radius.inputs[0])
+    links.new(world_center.outputs["Vector"], to_center.inputs[0])
+    links.new(camera_info.outputs["Location"], to_center.inputs[1])
+    links.new(to_center.outputs["Vector"], to_camera_space.inputs["Vector"])
+    links.new(camera_info.outputs["Rotation"], to_camera_space.inputs["Rotation"])
+    links.new(to_center.outputs["Vector"], center_distance.inputs[0])
+    links.new(to_camera_space.outputs["Vector"], split.inputs[0])
+    links.new(split.outputs["Z"], depth.inputs[0])
+    links.new(depth.outputs[0], view_cos.inputs[0])
+    links.new(center_distance.outputs["Value"], view_cos.inputs[1])
+    links.new(view_cos.outputs[0], view_angle.inputs[0])
+    links.new(radius.outputs[0], sphere_sin.inputs[0])
+    links.new(center_distance.outputs["Value"], sphere_sin.inputs[1])
+    links.new(sphere_sin.outputs[0], sphere_angle.inputs[0])
+    links.new(view_angle.outputs[0], edge_angle.inputs[0])
+    links.new(sphere_angle.outputs[0], edge_angle.inputs[1])
+    links.new(edge_angle.outputs[0], in_view.inputs[0])
+    links.new(frustum_angle.outputs[0], in_view.inputs[1])
+    links.new(center_distance.outputs["Value"], inside.inputs[0])
+    links.new(radius.outputs[0], inside.inputs[1])
+    links.new(frustum_angle.outputs[0], frustum_off.inputs[0])
+    links.new(in_view.outputs[0], visible.inputs[0])
+    links.new(inside.outputs[0], visible.inputs[1])
+    links.new(visible.outputs[0], visible_or_off.inputs[0])
+    links.new(frustum_off.outputs[0], visible_or_off.inputs[1])
+
+    links.new(near_enough.outputs[0], use_wobble.inputs[0])
+    links.new(visible_or_off.outputs[0], use_wobble.inputs[1])
+    links.new(use_wobble.outputs[0], switch.inputs["Switch"])
+    links.new(geonode8.outputs[0], switch.inputs["False"])
+    links.new(geonode6.outputs[0], switch.inputs["True"])
+    links.new(switch.outputs[0], geonode7.inputs[0])
+
+    geonodetree[VERSION_KEY] = VERSION
+
+# groups from older versions drove the time with a python driver or left the frustum
+# test to python, rebuild their nodes
+def upgrade_group(group, props):
+    group.animation_data_clear()
+    group.nodes.clear()
+    uncull(bpy.data.objects)
+    fill_group(group, props)
+    _cache.clear()
+    _cache[GROUP_NAME] = group
+
+def ensure_group(props):
+    group = get_group()
+    if group is None:
+        group = build_group(props)
+    elif group.get(VERSION_KEY, 1) < VERSION:
+        upgrade_group(group, props)
+    else:
+        update_settings(props)
+    return group
+
+def has_wobble(obj, group):
+    for modifier in obj.modifiers:
+        if modifier.type == 'NODES' and modifier.node_group == group:
+            return True
+    return False
+
+# bulk attach/detach, plain data api calls so thousands of objects
+# stay a single undo step without an operator call per object
+def attach(objects, group):
+    added = 0
+    for obj in objects:
+        if obj.type == 'MESH' and not has_wobble(obj, group):
+            modifier = obj.modifiers.new(GROUP_NAME, 'NODES')
+            modifier.node_group = group
+            added += 1
+    return added
+
+def detach(objects, group=None):
+    if group is None:
+        group = get_group()
+        if group is None:
+            return 0
+    removed = 0
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        # collect first, removing while iterating the collection skips modifiers
+        for modifier in [m for m in obj.modifiers if m.type == 'NODES' and m.node_group == group]:
+            obj.modifiers.remove(modifier)
+            removed += 1
+    return removed
+
+# rough frustum test on the bounding box, big objects with every corner outside
+# the frame but spanning it still count as visible
+def in_camera_view(scene, camera, obj):
+    xs = []
+    ys = []
+    behind = False
+    for corner in obj.bound_box:
+        co = world_to_camera_view(scene, camera, obj.matrix_world @ Vector(corner))
+        if co.z <= 0.0:
+            behind = True
+            continue
+        xs.append(co.x)
+        ys.append(co.y)
+    if not xs:
+        return False
+    if behind:
+        return True
+    return max(xs) >= 0.0 and min(xs) <= 1.0 and max(ys) >= 0.0 and min(ys) <= 1.0
+
+# meshes that should wobble for the chosen scope. linked, hidden and
+# render-disabled meshes are skipped so they don't cost a modifier evaluation
+def targets(scene, view_layer, props):
+    scope = props.wobble_scope
+    if scope == 'COLLECTION':
+        if props.wobble_collection is None:
+            return []
+        objects = props.wobble_collection.all_objects
+    else:
+        objects = scene.objects
+
+    camera = scene.camera
+    if scope == 'CAMERA' and camera is None:
+        return []
+
+    found = []
+    for obj in objects:
+        if obj.type != 'MESH' or obj.library is not None or obj.hide_render:
+            continue
+        if not obj.visible_get(view_layer=view_layer):
+            continue
+        if scope == 'SELECTED' and not obj.select_get(view_layer=view_layer):
+            continue
+        if scope == 'CAMERA' and not in_camera_view(scene, camera, obj):
+            continue
+        found.append(obj)
+    return found
+
+# modifier custom property, set by older versions while their python frustum cull
+# had the modifier switched off
+CULLED = "ps1_culled"
+
+def uncull(objects):
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        for modifier in obj.modifiers:
+            if CULLED in modifier:
+                modifier.show_viewport = modifier.show_render = True
+                del modifier[CULLED]
+
+# half the diagonal field of view of the scene camera, 0 when there's nothing to test
+# against. orthographic cameras wobble everything
+def frustum_angle(scene):
+    camera = scene.camera
+    if camera is None or camera.type != 'CAMERA' or camera.data.type != 'PERSP':
+        return 0.0
+    data = camera.data
+    render = scene.render
+    width = render.resolution_x * render.pixel_aspect_x
+    height = render.resolution_y * render.pixel_aspect_y
+    fit = data.sensor_fit
+    if fit == 'AUTO':
+        fit = 'HORIZONTAL' if width >= height else 'VERTICAL'
+    tan_fit = math.tan(data.angle / 2.0)
+    if fit == 'HORIZONTAL':
+        tan_x, tan_y = tan_fit, tan_fit * height / width
+    else:
+        tan_x, tan_y = tan_fit * width / height, tan_fit
+    # lens shift moves the frame by a fraction of its larger side
+    tan_large = max(tan_x, tan_y)
+    tan_x += abs(data.shift_x) * 2.0 * tan_large
+    tan_y += abs(data.shift_y) * 2.0 * tan_large
+    return math.atan(math.hypot(tan_x, tan_y))
+
+# the camera's field of view goes into the group as a value, changing the lens needs
+# the wobble set up again (or the option toggled)
+def set_frustum(scene, props):
+    node = get_value_node(FRUSTUM_ANGLE)
+    if node is None:
+        return
+    angle = frustum_angle(scene) if props.frustum_cull else 0.0
+    if abs(node.outputs[0].default_value - angle) > 1e-6:
+        node.outputs[0].default_value = angle
+
+# attach to the targets, detach from anything that dropped out of scope
+def sync(scene, view_layer, props):
+    group = ensure_group(props)
+    set_frustum(scene, props)
+    wanted = targets(scene, view_layer, props)
+    added = attach(wanted, group)
+    wanted = set(wanted)
+    removed = detach([obj for obj in scene.objects if obj not in wanted], group)
+    return added, removed
+
+@persistent
+def invalidate_cache(*args):
+    _cache.clear()
+
+HANDLERS = (
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
+
+def register():
+    for handlers in HANDLERS:
+        if invalidate_cache not in handlers:
+            handlers.append(invalidate_cache)
+
+def unregister():
+    for handlers in HANDLERS:
+        if invalidate_cache in handlers:
+            handlers.remove(invalidate_cache)
+    _cache.clear()
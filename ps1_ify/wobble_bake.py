@@ -0,0 +1,292 @@
+# wobble baking
+# evaluates the "Wobble" modifier once per frame, keeps the per-vertex offsets as
+# float16 in an .npz next to the .blend and plays them back through a shape key,
+# so playback and render don't evaluate the geometry nodes any more.
+# changing Speed/Strength/Grid Size, the scope or which objects wobble throws the
+# bake away.
+# playback isn't free: a frame change handler writes the frame's coordinates into the
+# shape key of every baked mesh (a foreach_set plus a mesh update, so roughly a copy
+# of the vertex positions per mesh and frame). that's far cheaper than evaluating the
+# node group but it still grows with the baked vertex count, and frames that show the
+# same offsets as the last one (held frames with Render On, past the baked range)
+# are skipped.
+import os
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from ps1_ify import wobble
+
+SHAPE_KEY = "PS1 Wobble"
+
+# scene custom property describing the bake
+META = "ps1_wobble_bake"
+
+# mesh custom property, set when the Basis key was only added for the bake
+OWN_BASIS = "ps1_wobble_basis"
+
+# scene session_uid -> object name -> [base coordinates, offsets per frame, first frame,
+# coordinate buffer, index of the offsets in the shape key]
+_baked = {}
+
+
+def cache_path(scene):
+    folder = bpy.path.abspath("//") or bpy.app.tempdir
+    return os.path.join(folder, "ps1_wobble_%s.npz" % bpy.path.clean_name(scene.name))
+
+def is_wobble(modifier, group):
+    return modifier.type == 'NODES' and modifier.node_group == group
+
+def settings_of(props):
+    return [props.speed, props.strength, props.grid_size, props.render_on]
+
+def scope_of(props):
+    collection = props.wobble_collection
+    return [props.wobble_scope, collection.name if collection is not None and props.wobble_scope == 'COLLECTION' else ""]
+
+# the scene's meshes that carry the wobble, sorted by name
+def wobbling(scene, group):
+    if group is None:
+        return []
+    return sorted(
+        (obj for obj in scene.objects if obj.type == 'MESH' and any(is_wobble(m, group) for m in obj.modifiers)),
+        key=lambda obj: obj.name,
+    )
+
+# mutes every shape key but the Basis, returns the muted keys and the objects that
+# had their active key pinned (that shows the key even when it's muted)
+def mute_shape_keys(objects):
+    muted = []
+    pinned = []
+    for obj in objects:
+        if obj.show_only_shape_key:
+            obj.show_only_shape_key = False
+            pinned.append(obj)
+        keys = obj.data.shape_keys
+        if keys is None:
+            continue
+        for block in keys.key_blocks:
+            if block != keys.reference_key and not block.mute:
+                block.mute = True
+                muted.append(block)
+    return muted, pinned
+
+def bake(context, frame_start, frame_end):
+    scene = context.scene
+    group = wobble.get_group()
+    if group is None:
+        return 0
+    clear(scene)
+
+    objects = wobbling(scene, group)
+    frames = range(frame_start, frame_end + 1)
+
+    data = {}
+    for obj in objects:
+        base = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", base)
+        data[obj.name] = (base, np.empty((len(frames), base.size), dtype=np.float16))
+
+    # only the wobble should move vertices while baking
+    muted = []
+    for obj in objects:
+        for modifier in obj.modifiers:
+            if modifier.show_viewport and not is_wobble(modifier, group):
+                modifier.show_viewport = False
+                muted.append(modifier)
+    # the shape keys too, base is the Basis shape. offsets taken against the key mix
+    # would be added on top of the keys again in playback and freeze animated keys
+    muted_keys, pinned = mute_shape_keys(objects)
+
+    current = scene.frame_current
+    co = None
+    try:
+        for i, frame in enumerate(frames):
+            scene.frame_set(frame)
+            depsgraph = context.evaluated_depsgraph_get()
+            for obj in objects:
+                if obj.name not in data:
+                    continue
+                base, offsets = data[obj.name]
+                evaluated = obj.evaluated_get(depsgraph)
+                mesh = evaluated.to_mesh()
+                try:
+                    if len(mesh.vertices) * 3 != base.size:
+                        # something changed the topology, can't be stored as offsets
+                        print("PS1-ify: not baking wobble on %s, vertex count changes" % obj.name)
+                        del data[obj.name]
+                        continue
+                    if co is None or co.size != base.size:
+                        co = np.empty(base.size, dtype=np.float32)
+                    mesh.vertices.foreach_get("co", co)
+                    offsets[i] = co - base
+                finally:
+                    evaluated.to_mesh_clear()
+    finally:
+        for modifier in muted:
+            modifier.show_viewport = True
+        for block in muted_keys:
+            block.mute = False
+        for obj in pinned:
+            obj.show_only_shape_key = True
+        scene.frame_set(current)
+
+    save(scene, data, frame_start, frame_end, [obj.name for obj in objects])
+    start_playback(scene, data, frame_start)
+    return len(data)
+
+def save(scene, data, frame_start, frame_end, targets):
+    filepath = cache_path(scene)
+    names = list(data)
+    arrays = {}
+    for i, name in enumerate(names):
+        arrays["base_%d" % i] = data[name][0]
+        arrays["offsets_%d" % i] = data[name][1]
+    np.savez(filepath, **arrays)
+    scene[META] = {
+        "file": filepath,
+        "objects": names,
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "settings": settings_of(scene.placeholder),
+        "scope": scope_of(scene.placeholder),
+        "targets": targets,
+    }
+
+def load(scene):
+    meta = scene.get(META)
+    if meta is None or not os.path.isfile(meta["file"]):
+        return False
+    with np.load(meta["file"]) as arrays:
+        data = {
+            name: (arrays["base_%d" % i], arrays["offsets_%d" % i])
+            for i, name in enumerate(meta["objects"])
+        }
+    start_playback(scene, data, meta["frame_start"])
+    return True
+
+def start_playback(scene, data, frame_start):
+    group = wobble.get_group()
+    baked = _baked.setdefault(scene.session_uid, {})
+    for name, (base, offsets) in data.items():
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            continue
+        if obj.data.shape_keys is None:
+            obj.shape_key_add(name="Basis", from_mix=False)
+            obj.data[OWN_BASIS] = True
+        key = obj.data.shape_keys.key_blocks.get(SHAPE_KEY)
+        if key is None:
+            key = obj.shape_key_add(name=SHAPE_KEY, from_mix=False)
+        key.value = 1.0
+        for modifier in obj.modifiers:
+            if is_wobble(modifier, group):
+                modifier.show_viewport = False
+                modifier.show_render = False
+        baked[name] = [base, offsets, frame_start, np.empty_like(base), None]
+    update_frame(scene)
+
+def clear(scene):
+    group = wobble.get_group()
+    meta = scene.get(META)
+    names = list(meta["objects"]) if meta else list(_baked.get(scene.session_uid, ()))
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.type != 'MESH':
+            continue
+        keys = obj.data.shape_keys
+        if keys is not None:
+            key = keys.key_blocks.get(SHAPE_KEY)
+            if key is not None:
+                obj.shape_key_remove(key)
+            if obj.data.get(OWN_BASIS):
+                obj.shape_key_clear()
+                del obj.data[OWN_BASIS]
+        for modifier in obj.modifiers:
+            if is_wobble(modifier, group):
+                modifier.show_viewport = True
+                modifier.show_render = True
+    if meta:
+        if os.path.isfile(meta["file"]):
+            os.remove(meta["file"])
+        del scene[META]
+    _baked.pop(scene.session_uid, None)
+
+def is_baked(scene):
+    return META in scene
+
+# a bake only holds for the settings, scope and objects it was made with. bakes
+# from before the scope and targets were stored count as stale too
+def is_stale(scene):
+    meta = scene.get(META)
+    if meta is None:
+        return False
+    props = scene.placeholder
+    return (
+        list(meta["settings"]) != settings_of(props)
+        or list(meta.get("scope", ())) != scope_of(props)
+        or list(meta.get("targets", ())) != [obj.name for obj in wobbling(scene, wobble.get_group())]
+    )
+
+def invalidate(scene):
+    if is_stale(scene):
+        clear(scene)
+
+def update_frame(scene):
+    for name, entry in _baked.get(scene.session_uid, {}).items():
+        base, offsets, first, co, shown = entry
+        index = min(max(scene.frame_current - first, 0), len(offsets) - 1)
+        if index == shown:
+            continue
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.data.shape_keys is None:
+            continue
+        key = obj.data.shape_keys.key_blocks.get(SHAPE_KEY)
+        if key is None:
+            continue
+        np.add(base, offsets[index], out=co)
+        key.data.foreach_set("co", co)
+        obj.data.update()
+        entry[4] = index
+
+@persistent
+def on_frame_change(scene, depsgraph=None):
+    if _baked:
+        update_frame(scene)
+
+@persistent
+def on_load(*args):
+    _baked.clear()
+    for scene in bpy.data.scenes:
+        invalidate(scene)
+        if META in scene:
+            load(scene)
+
+# undo puts back whatever the shape key held then, write the frame again
+@persistent
+def on_undo(*args):
+    for baked in _baked.values():
+        for entry in baked.values():
+            entry[4] = None
+    for scene in bpy.data.scenes:
+        if scene.session_uid in _baked:
+            update_frame(scene)
+
+HANDLERS = (
+    (bpy.app.handlers.frame_change_pre, on_frame_change),
+    (bpy.app.handlers.load_post, on_load),
+    (bpy.app.handlers.undo_post, on_undo),
+    (bpy.app.handlers.redo_post, on_undo),
+)
+
+def register():
+    for handlers, function in HANDLERS:
+        if function not in handlers:
+            handlers.append(function)
+
+def unregister():
+    for handlers, function in HANDLERS:
+        if function in handlers:
+            handlers.remove(function)
+    _baked.clear()
@@ -0,0 +1,5 @@
+# the tests import ps1_ify from the repo, outside blender only the bpy-free modules load
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
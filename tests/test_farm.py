@@ -0,0 +1,108 @@
+# frame ranges, chunking and resuming, with a fake blender that writes the frames
+import os
+import stat
+import sys
+
+import numpy as np
+import pytest
+
+from ps1_ify import farm, image
+
+# stands in for blender -b file.blend --python batch.py -- --frames a-b --output path.
+# FAKE_BLENDER_FAIL exits with an error after writing the frames
+FAKE_BLENDER = '''#!%s
+import os, sys
+sys.path.insert(0, %r)
+import numpy as np
+from ps1_ify import farm, image
+args = sys.argv[sys.argv.index("--") + 1:]
+start, end = farm.parse_frames(args[args.index("--frames") + 1])[0]
+output = args[args.index("--output") + 1]
+for frame in range(start, end + 1):
+    path = farm.frame_path(output, frame) + ".png"
+    if "--overwrite" in args or not os.path.exists(path):
+        image.write_image(path, np.full((4, 4, 3), frame, dtype=np.uint8))
+sys.exit(int(os.environ.get("FAKE_BLENDER_FAIL", "0")))
+'''
+
+
+def test_parse_frames_and_expand():
+    assert farm.parse_frames("1-3, 7,10-11") == [(1, 3), (7, 7), (10, 11)]
+    assert farm.expand(farm.parse_frames("3-5,1-4")) == [1, 2, 3, 4, 5]
+    with pytest.raises(ValueError):
+        farm.parse_frames("5-1")
+
+@pytest.mark.parametrize("output, frame, expected", [
+    ("/tmp/shot_####", 7, "/tmp/shot_0007"),
+    ("/tmp/shot_##_final", 7, "/tmp/shot_07_final"),
+    ("/tmp/shot_#_v#", 12, "/tmp/shot_#_v12"),
+    ("/tmp/render_", 42, "/tmp/render_0042"),
+    ("/tmp/##/shot", 3, "/tmp/##/shot0003"),
+])
+def test_frame_path(output, frame, expected):
+    assert farm.frame_path(output, frame) == expected
+
+def test_chunks():
+    assert farm.chunks([1, 2, 3, 4, 5], 2) == [(1, 2), (3, 4), (5, 5)]
+    # gaps start a new chunk
+    assert farm.chunks([1, 2, 5, 6, 7, 9], 10) == [(1, 2), (5, 7), (9, 9)]
+    assert farm.chunks([], 4) == []
+
+def write_frame(path, value=0):
+    image.write_image(path, np.full((4, 4, 3), value, dtype=np.uint8))
+
+def test_resume_skips_decoding_frames_only(tmp_path):
+    pytest.importorskip("imageio")
+    output = str(tmp_path / "render_")
+    write_frame(output + "0001.png")
+    with open(output + "0002.png", "wb") as f:
+        f.write(b"\x89PNG cut short")
+    # other files next to the frames aren't frames
+    for name in ("render_0003.txt", "render_0003.json", "render_0004"):
+        (tmp_path / name).write_text("notes")
+    job = farm.Job("blender", str(tmp_path / "shot.blend"), "PS1_max", [1, 2, 3, 4], output)
+    assert job.pending(job.frames) == [2, 3, 4]
+    # nothing gets deleted, the unreadable frame is rendered over
+    assert sorted(os.listdir(tmp_path)) == ["render_0001.png", "render_0002.png", "render_0003.json", "render_0003.txt", "render_0004"]
+
+def test_extension_from_the_file_format(tmp_path):
+    pytest.importorskip("imageio")
+    output = str(tmp_path / "shot_##")
+    write_frame(output.replace("##", "01") + ".png")
+    assert farm.Job("blender", "x.blend", "PS1_max", [1], output, extension=".png").pending([1]) == []
+    assert farm.Job("blender", "x.blend", "PS1_max", [1], output, extension=".exr").pending([1]) == [1]
+
+def fake_blender(tmp_path):
+    path = tmp_path / "blender"
+    path.write_text(FAKE_BLENDER % (sys.executable, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+def test_run_renders_pending_frames_over_bad_files(tmp_path):
+    pytest.importorskip("imageio")
+    output = str(tmp_path / "out" / "shot_####")
+    os.makedirs(tmp_path / "out")
+    write_frame(farm.frame_path(output, 2) + ".png", 2)
+    with open(farm.frame_path(output, 3) + ".png", "wb") as f:
+        f.write(b"cut short")
+    job = farm.Job(fake_blender(tmp_path), str(tmp_path / "shot.blend"), "PS1_max", [1, 2, 3, 4, 5], output, workers=2, chunk_size=2)
+    assert job.run()
+    assert job.done == 5 and job.failed == [] and job.errors == []
+    assert image.read_image(farm.frame_path(output, 3) + ".png")[0, 0, 0] == 3
+
+def test_run_reports_a_crash(tmp_path, monkeypatch):
+    pytest.importorskip("imageio")
+    monkeypatch.setenv("FAKE_BLENDER_FAIL", "3")
+    output = str(tmp_path / "shot_####")
+    job = farm.Job(fake_blender(tmp_path), str(tmp_path / "shot.blend"), "PS1_max", [1, 2, 3], output, workers=1, retries=1)
+    # every frame decodes, but blender exiting with an error is still a failure
+    assert not job.run()
+    assert job.finished and job.error is None
+    assert len(job.errors) == 1 and "exited with code 3" in job.errors[0]
+    # the last frame written before the crash isn't trusted
+    assert job.failed == [3]
+
+def test_run_records_a_missing_blender(tmp_path):
+    job = farm.Job(str(tmp_path / "no_blender"), str(tmp_path / "shot.blend"), "PS1_max", [1], str(tmp_path / "shot_####"))
+    assert not job.run()
+    assert job.finished and job.error
@@ -0,0 +1,94 @@
+# the numpy chain against golden frames checked in under golden/, made with
+# numpy.save from the frames below. a change to any of them is a change of the look
+import os
+
+import numpy as np
+import pytest
+
+from ps1_ify import image
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+COMPOSITOR = {"mute": frozenset(), "scale": 0.5, "levels": 32, "dither": False}
+DITHERED = dict(COMPOSITOR, dither=True)
+
+
+def frame_8bit():
+    pixels = (np.arange(8 * 8 * 4, dtype=np.uint32).reshape(8, 8, 4) * 37 % 256).astype(np.uint8)
+    pixels[..., 3] = 255
+    return pixels
+
+def frame_float():
+    return image.to_float(frame_8bit())
+
+def golden(name):
+    return np.load(os.path.join(GOLDEN, name + ".npy"))
+
+@pytest.mark.parametrize("name, pixels", [
+    ("process_8bit", frame_8bit),
+    ("process_float", frame_float),
+])
+def test_process_matches_golden(name, pixels):
+    out = image.process(pixels(), COMPOSITOR)
+    expected = golden(name)
+    assert out.dtype == expected.dtype
+    assert np.array_equal(out, expected)
+
+def test_dither_matches_golden():
+    assert np.array_equal(image.process(frame_8bit(), DITHERED), golden("process_dither"))
+
+def test_quantize_rgb555_matches_golden():
+    assert np.array_equal(image.quantize_rgb555(frame_8bit()), golden("rgb555"))
+
+def test_process_by_hand():
+    pixels = np.zeros((2, 2, 4), dtype=np.float32)
+    pixels[..., 0] = ((0.1, 0.2), (0.3, 0.4))
+    pixels[..., 3] = 1.0
+    out = image.process(pixels, dict(COMPOSITOR, levels=4))
+    # the 2x2 block averages to 0.25, posterized to floor(0.25 * 4) / 4, scaled back up
+    assert np.array_equal(out[..., 0], np.full((2, 2), 0.25, dtype=np.float32))
+    assert np.array_equal(out[..., 3], np.ones((2, 2), dtype=np.float32))
+
+def test_process_keeps_shape_and_alpha():
+    pixels = frame_8bit()[:7, :5]
+    pixels[..., 3] = 128
+    out = image.process(pixels, COMPOSITOR)
+    assert out.shape == pixels.shape
+    assert (out[..., 3] == 128).all()
+
+def test_process_grey():
+    out = image.process(frame_8bit()[..., 0], COMPOSITOR)
+    assert np.array_equal(out, golden("process_8bit")[..., 0])
+
+def test_muted_chain_is_identity():
+    compositor = dict(COMPOSITOR, mute=frozenset(("scale_down", "pixelate", "posterize", "scale_up")))
+    assert np.array_equal(image.process(frame_8bit(), compositor), frame_8bit())
+
+def test_quantize_rgb555_by_hand():
+    pixels = np.zeros((4, 4, 4), dtype=np.uint8)
+    pixels[..., :3] = 255
+    pixels[0, 0, :3] = 0
+    out = image.quantize_rgb555(pixels)
+    # black and white survive 5 bits, expanded back as (q << 3) | (q >> 2)
+    assert (out[0, 0, :3] == 0).all()
+    assert (out[1:, :, :3] == 255).all()
+    assert np.array_equal(out[..., 3], pixels[..., 3])
+
+def test_quantize_rgb555_needs_8bit():
+    with pytest.raises(ValueError):
+        image.quantize_rgb555(frame_float())
+
+def test_sequence_verifies_against_golden_files(tmp_path):
+    pytest.importorskip("imageio")
+    source = tmp_path / "source"
+    golden_dir = tmp_path / "golden"
+    source.mkdir()
+    golden_dir.mkdir()
+    for i in range(3):
+        image.write_image(str(source / ("frame_%04d.png" % i)), frame_8bit())
+        image.write_image(str(golden_dir / ("frame_%04d.png" % i)), golden("process_8bit"))
+    frames = image.list_frames(str(source))
+    assert image.process_sequence(frames, str(tmp_path / "out"), COMPOSITOR, workers=1) == 3
+    assert image.verify(str(tmp_path / "out"), str(golden_dir)) == []
+    image.write_image(str(golden_dir / "frame_0001.png"), frame_8bit())
+    assert image.verify(str(tmp_path / "out"), str(golden_dir)) == ["frame_0001.png"]
@@ -0,0 +1,109 @@
+# palette PNGs are read back with a few lines of zlib, so the writer is checked
+# without an image library
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from ps1_ify import palette
+
+
+def read_png(filepath):
+    with open(filepath, "rb") as f:
+        data = f.read()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks = {}
+    offset = 8
+    while offset < len(data):
+        length, = struct.unpack(">I", data[offset:offset + 4])
+        kind = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(kind + body) & 0xFFFFFFFF
+        chunks[kind] = chunks.get(kind, b"") + body
+        offset += 12 + length
+    width, height, depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, color_type) == (8, 3)
+    rows = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, width + 1)
+    assert (rows[:, 0] == 0).all()
+    colors = np.frombuffer(chunks[b"PLTE"], dtype=np.uint8).reshape(-1, 3)
+    alpha = np.frombuffer(chunks[b"tRNS"], dtype=np.uint8) if b"tRNS" in chunks else np.full(len(colors), 255, dtype=np.uint8)
+    rgba = np.concatenate((colors, alpha[:, np.newaxis]), axis=1)
+    return rgba[rows[:, 1:]]
+
+def posterized_frame(seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = (rng.integers(0, 4, size=(16, 12, 4)) * 85).astype(np.uint8)
+    pixels[..., 3] = 255
+    return pixels
+
+def test_write_indexed_round_trip(tmp_path):
+    pixels = posterized_frame()
+    filepath = str(tmp_path / "frame.png")
+    used = palette.write_indexed(filepath, pixels)
+    assert len(used) == len(np.unique(palette.pack(pixels)))
+    assert np.array_equal(read_png(filepath), pixels)
+
+def test_write_indexed_alpha_and_float(tmp_path):
+    pixels = posterized_frame()
+    pixels[0, :, 3] = 0
+    filepath = str(tmp_path / "frame.png")
+    palette.write_indexed(filepath, pixels.astype(np.float32) / 255)
+    assert np.array_equal(read_png(filepath), pixels)
+
+def test_to_rgba8_channels():
+    grey = np.array([[0, 128]], dtype=np.uint8)
+    assert palette.to_rgba8(grey).tolist() == [[[0, 0, 0, 255], [128, 128, 128, 255]]]
+    grey_alpha = np.array([[[10, 20]]], dtype=np.uint8)
+    assert palette.to_rgba8(grey_alpha).tolist() == [[[10, 10, 10, 20]]]
+    deep = np.array([[[65535, 0, 256]]], dtype=np.uint16)
+    assert palette.to_rgba8(deep).tolist() == [[[255, 0, 1, 255]]]
+
+def test_shared_palette_keeps_indices():
+    shared = palette.Palette()
+    first = posterized_frame(0)
+    indices = shared.index(first)
+    colors = shared.colors.copy()
+    again = shared.index(posterized_frame(1))
+    # colours are only appended, so the first frame's indices still mean the same
+    assert np.array_equal(shared.colors[:len(colors)], colors)
+    assert np.array_equal(shared.index(first), indices)
+    assert np.array_equal(palette.unpack(shared.colors[again.ravel()]), posterized_frame(1).reshape(-1, 4))
+
+def test_index_overflow_maps_to_nearest():
+    # 300 colours, more than a palette holds
+    i = np.arange(300)
+    pixels = np.empty((1, 300, 4), dtype=np.uint8)
+    pixels[0, :, 0] = i % 150
+    pixels[0, :, 1] = i // 150 * 255
+    pixels[0, :, 2] = 0
+    pixels[0, :, 3] = 255
+    full = palette.Palette()
+    indices = full.index(pixels)
+    assert len(full) == palette.MAX_COLORS
+    source = pixels[0].astype(int)
+    entries = palette.unpack(full.colors).astype(int)
+    picked = entries[indices.ravel()]
+    distances = ((source[:, np.newaxis, :] - entries[np.newaxis, :, :]) ** 2).sum(axis=2)
+    # colours in the palette map to themselves, the rest to their nearest entry
+    assert np.array_equal(((source - picked) ** 2).sum(axis=1), distances.min(axis=1))
+    assert (distances.min(axis=1) == 0).sum() == palette.MAX_COLORS
+    # a full palette doesn't grow
+    full.index(np.full((2, 2, 4), 7, dtype=np.uint8))
+    assert len(full) == palette.MAX_COLORS
+
+def test_exact_index_refuses_overflow(tmp_path):
+    pixels = np.zeros((1, 300, 4), dtype=np.uint8)
+    pixels[0, :, 0] = np.arange(300) % 256
+    pixels[0, :, 1] = np.arange(300) // 256
+    pixels[0, :, 3] = 255
+    shared = palette.Palette()
+    shared.index(posterized_frame(0))
+    colors = shared.colors.copy()
+    path = str(tmp_path / "frame.png")
+    assert palette.write_indexed(path, pixels, shared, exact=True) is None
+    assert not os.path.exists(path)
+    # the palette is left as it was for the next frame
+    assert np.array_equal(shared.colors, colors)
+    assert shared.index(posterized_frame(0), exact=True) is not None
@@ -0,0 +1,125 @@
+# preset compiling and the writes it produces, on plain objects instead of a scene
+import types
+
+import pytest
+
+from ps1_ify import presets
+
+
+def scene():
+    return types.SimpleNamespace(
+        render=types.SimpleNamespace(resolution_x=1920, resolution_y=1080, engine='CYCLES'),
+        eevee=types.SimpleNamespace(use_gtao=True),
+    )
+
+# settings as compiled writes, ("render",) -> (("resolution_x", 320),)
+def grouped(settings):
+    owners = {}
+    for path, value in settings.items():
+        owner, _, attr = path.rpartition(".")
+        owners.setdefault(tuple(owner.split(".")), []).append((attr, value))
+    return tuple((owner, tuple(values)) for owner, values in owners.items())
+
+def writes(preset):
+    return {".".join(owner + (attr,)): value for owner, values in preset["writes"] for attr, value in values}
+
+def test_builtin_presets_compile():
+    for name, preset in presets.BUILTIN_PRESETS.items():
+        compiled = presets.compile_preset(name, presets.resolve(name, presets.BUILTIN_PRESETS))
+        assert compiled["name"] == name
+        assert compiled["family"] in presets.FAMILIES
+        assert set(compiled["compositor"]["mute"]) <= set(presets.COMPOSITOR_NODES)
+
+def test_compile_merges_base_settings_in_order():
+    compiled = presets.compile_preset("Test", {
+        "settings": {"render.resolution_x": 320, "view_settings.look": 'None'},
+        "compositor": {"levels": 32},
+    })
+    found = writes(compiled)
+    assert found["render.resolution_x"] == 320
+    assert found["render.engine"] == presets.BASE_SETTINGS["render.engine"]
+    # the base view transform is written before the preset's look
+    names = list(found)
+    assert names.index("view_settings.view_transform") < names.index("view_settings.look")
+    assert compiled["family"] == "PS1"
+    assert compiled["compositor"]["levels"] == 32
+    assert compiled["compositor"]["scale"] == presets.BASE_COMPOSITOR["scale"]
+
+def test_compile_groups_writes_per_owner():
+    compiled = presets.compile_preset("Test", {"settings": {"render.resolution_x": 320, "render.resolution_y": 240}})
+    owners = [owner for owner, values in compiled["writes"]]
+    assert len(owners) == len(set(owners))
+
+def test_compile_cpu_block():
+    assert presets.compile_preset("Test", {})["cpu_writes"] is None
+    compiled = presets.compile_preset("Test", {"settings": {"cycles.samples": 128}, "cpu": {"cycles.samples": 16}})
+    assert writes(compiled)["cycles.samples"] == 128
+    assert writes(dict(compiled, writes=compiled["cpu_writes"]))["cycles.samples"] == 16
+
+@pytest.mark.parametrize("preset", [
+    {"family": "N64"},
+    {"compositor": {"mute": ["blur"]}},
+])
+def test_compile_rejects_unknown_values(preset):
+    with pytest.raises(ValueError):
+        presets.compile_preset("Test", preset)
+
+def test_compile_rejects_unknown_shading():
+    with pytest.raises(ValueError):
+        presets.compile_preset("Test", {"materials": {"shading": "PHONG"}})
+
+def test_resolve_inherits():
+    table = {
+        "Base": {"family": "XBOX", "settings": {"render.resolution_x": 640, "render.resolution_y": 480}, "compositor": {"levels": 64}},
+        "Child": {"inherits": "Base", "settings": {"render.resolution_x": 320}},
+    }
+    resolved = presets.resolve("Child", table)
+    assert resolved["family"] == "XBOX"
+    assert resolved["settings"] == {"render.resolution_x": 320, "render.resolution_y": 480}
+    assert resolved["compositor"] == {"levels": 64}
+    # the parent is left alone
+    assert table["Base"]["settings"]["render.resolution_x"] == 640
+
+@pytest.mark.parametrize("table", [
+    {"Child": {"inherits": "Missing"}},
+    {"A": {"inherits": "B"}, "B": {"inherits": "A"}, "Child": {"inherits": "A"}},
+])
+def test_resolve_rejects_unknown_and_circular(table):
+    with pytest.raises(ValueError):
+        presets.resolve("Child", table)
+
+def test_load_user_presets(tmp_path):
+    (tmp_path / "consoles.toml").write_text('[Dreamcast]\nfamily = "XBOX"\ninherits = "Xbox"\n[Dreamcast.settings]\n"render.resolution_x" = 640\n')
+    (tmp_path / "broken.json").write_text("{")
+    try:
+        registry = presets.load(str(tmp_path))
+        assert writes(registry["Dreamcast"])["render.resolution_x"] == 640
+        assert registry["Dreamcast"]["family"] == "XBOX"
+        assert "Dreamcast" in [name for name, label, description in presets.enum_items("XBOX")]
+    finally:
+        presets.load(str(tmp_path / "missing"))
+
+def test_apply_settings_only_writes_changes():
+    target = scene()
+    preset = {"writes": grouped({"render.resolution_x": 320, "render.engine": 'CYCLES', "eevee.use_gtao": True})}
+    assert presets.apply_settings(target, preset) == 1
+    assert target.render.resolution_x == 320
+    assert presets.apply_settings(target, preset) == 0
+
+def test_override():
+    preset = {"writes": grouped({"render.resolution_x": 320})}
+    overridden = presets.override(preset, {"render.resolution_x": 160, "render.resolution_y": 120})
+    assert writes(overridden) == {"render.resolution_x": 160}
+
+def test_extend():
+    preset = {"writes": grouped({"render.resolution_x": 320})}
+    extended = presets.extend(preset, {"render.resolution_y": 120})
+    assert writes(extended) == {"render.resolution_x": 320, "render.resolution_y": 120}
+
+def test_snapshot_puts_values_back():
+    target = scene()
+    preset = {"writes": grouped({"render.resolution_x": 320, "eevee.use_gtao": False})}
+    saved = presets.snapshot(target, preset)
+    presets.apply_settings(target, preset)
+    presets.apply_settings(target, saved)
+    assert (target.render.resolution_x, target.eevee.use_gtao) == (1920, True)